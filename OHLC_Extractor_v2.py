@@ -1,9 +1,38 @@
 import os
-import time
 import re
-from datetime import datetime
-import pandas as pd
-import yfinance as yf
+import argparse
+import threading
+import warnings
+from datetime import date, datetime
+from functools import partial
+from itertools import chain
+
+from fetch_engine import (
+    DEFAULT_BACKOFF, DEFAULT_RATE, DEFAULT_RETRIES, DEFAULT_WORKERS, FetchResult, create_session, iter_fetch,
+    iter_fetch_batched, split_fallbacks, with_batch_fallback, with_fallback
+)
+from analysis_store import DEFAULT_RESULTS_STORE_PATH, AnalysisStore, adjustment_version
+from checkpoint import CheckpointJournal
+from compact_frame import company_dtype, compact_ohlc
+from corporate_actions import adjust_prices, extract_actions, unsplit
+from interval_kernels import interval_stats, parse_month_day, summarise_interval_changes, summarise_interval_stats
+from interval_sweep import calendar_days, interval_grid, summarise_sweep, sweep_intervals
+from lazy_imports import lazy_import
+from ohlc_cache import DEFAULT_CACHE_PATH, DEFAULT_RAW_CACHE_PATH, OHLCCache
+from output_engines import ANALYSIS_WRITERS, DATA_WRITERS, format_output_frame, open_writers, safe_name
+from parallel_analysis import ShardedAnalysis, parallel_interval_stats, parallel_sweep
+from pipeline import stream_outputs
+from run_metrics import RunMetrics, profiled
+from timeframes import resample_frame
+from universe import load_universe
+
+# pandas and yfinance are only imported once the fetch and analysis paths need them.
+pd = lazy_import('pandas')
+yf = lazy_import('yfinance')
+
+# history(raise_errors=True) is the only per-call way to have yfinance raise a failed
+# request instead of returning an empty frame; newer releases flag it as deprecated.
+warnings.filterwarnings('ignore', message="'raise_errors' deprecated", category=DeprecationWarning)
 
 # --- Global Configuration & Setup ---
 
@@ -24,33 +53,340 @@ TICKERS = {
 }
 
 
+REQUIRED_COLS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
 # --- Core Functions ---
 
-def fetch_stock_data_yfinance(ticker, company_name, start_date, end_date):
+def fetch_stock_data_yfinance(ticker, company_name, start_date, end_date, session=None, raise_errors=False,
+                              ticker_factory=None, auto_adjust=True):
     """
     Fetches historical OHLCV data for a single stock using yfinance.
+    With raise_errors=True, request failures are raised so the caller can retry them.
+    A range in which Yahoo has no bars is not a failure and returns None either way.
+    `ticker_factory` replaces yf.Ticker, e.g. with the offline benchmark provider.
+    With auto_adjust=False the unadjusted bars come with Dividends and Stock Splits columns.
     """
     print(f"Fetching data for {company_name} ({ticker})...")
     try:
-        stock = yf.Ticker(ticker)
-        data = stock.history(start=start_date, end=end_date, auto_adjust=True)
+        stock = (ticker_factory or yf.Ticker)(ticker, session=session)
+        data = stock.history(start=start_date, end=end_date, auto_adjust=auto_adjust, actions=not auto_adjust,
+                             raise_errors=True)
 
         if data.empty:
             print(f"  - No data found for {company_name} for the given period.")
             return None
 
-        required_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-        if not all(col in data.columns for col in required_cols):
+        if not all(col in data.columns for col in REQUIRED_COLS):
             print(f"  - Error: Missing one of the required columns for {company_name}")
             return None
 
         return data.reset_index()
 
     except Exception as e:
+        if no_prices(e):
+            print(f"  - No data found for {company_name} for the given period.")
+            return None
+        if raise_errors:
+            raise
         print(f"  - An unexpected error occurred for {company_name}: {e}")
         return None
 
 
+def no_prices(error):
+    """
+    True when a history error only says that Yahoo has no bars for the range (a
+    holiday, pre-listing or delisted period). That is an answer, not a failure.
+    """
+    message = str(error)
+    return 'no price data found' in message and 'status_code' not in message
+
+
+_DOWNLOAD_LOCK = threading.Lock()
+
+
+def download_with_errors(symbols, **options):
+    """
+    Runs yf.download and also returns its per-ticker errors as {symbol: message}.
+    yf.download logs a failed ticker and leaves it out of the frame instead of
+    raising. Newer yfinance keeps those errors on a per-call context; older
+    releases keep them in the module-level yfinance.shared._ERRORS, so those
+    downloads are serialized.
+    """
+    context = getattr(yf.multi, '_DownloadCtx', None)
+    if context is not None:
+        ctx = context()
+        wide = yf.multi._download_impl(ctx, symbols, **options)
+        return wide, dict(ctx.errors)
+    with _DOWNLOAD_LOCK:
+        wide = yf.download(symbols, **options)
+        return wide, dict(yf.shared._ERRORS)
+
+
+def download_batch(tickers, start_date, end_date, session=None, auto_adjust=True):
+    """
+    Fetches historical OHLCV data for a group of stocks with a single bulk download.
+    Splits the wide (ticker, field) result back into one frame per company, shaped
+    like the output of fetch_stock_data_yfinance. Returns {company: DataFrame or None}
+    and the {company: error} of the tickers whose request failed.
+    """
+    symbols = list(tickers.values())
+    print(f"Fetching batch of {len(symbols)} tickers ({symbols[0]} ... {symbols[-1]})...")
+    try:
+        wide, errors = download_with_errors(symbols, start=start_date, end=end_date, auto_adjust=auto_adjust,
+                                            actions=not auto_adjust, group_by='ticker', ignore_tz=False,
+                                            threads=False, progress=False, session=session)
+    except Exception as e:
+        return {company: None for company in tickers}, {company: str(e) for company in tickers}
+
+    errors = {symbol.upper(): error for symbol, error in errors.items() if not no_prices(error)}
+    available = set() if wide is None or wide.empty else set(wide.columns.get_level_values(0))
+    results, failed = {}, {}
+    for company, ticker in tickers.items():
+        results[company] = None
+        if ticker.upper() in errors:
+            failed[company] = errors[ticker.upper()]
+            continue
+        if ticker not in available:
+            print(f"  - No data found for {company} for the given period.")
+            continue
+
+        data = wide[ticker]
+        if not all(col in data.columns for col in REQUIRED_COLS):
+            print(f"  - Error: Missing one of the required columns for {company}")
+            continue
+
+        # The bulk frame is indexed by the union of all dates; drop rows this symbol did not trade.
+        data = data.dropna(subset=REQUIRED_COLS, how='all')
+        if data.empty:
+            print(f"  - No data found for {company} for the given period.")
+            continue
+
+        data.columns.name = None
+        results[company] = data.reset_index()
+    return results, failed
+
+
+def report_failures(failed, total, raise_errors):
+    """
+    Raises the {company: error} failures of a batch of `total` tickers with
+    raise_errors=True, so the caller can retry the batch, and prints them otherwise.
+    """
+    if failed and raise_errors:
+        company, error = next(iter(failed.items()))
+        raise RuntimeError(f"{len(failed)} of {total} tickers failed, e.g. {company}: {error}")
+    for company, error in failed.items():
+        print(f"  - An unexpected error occurred for {company}: {error}")
+
+
+def fetch_stock_data_batch(tickers, start_date, end_date, session=None, raise_errors=False, auto_adjust=True):
+    """
+    Returns {company: DataFrame or None} for a group of stocks (see download_batch).
+    With raise_errors=True, a batch in which any ticker failed is raised so the caller can retry it.
+    """
+    results, failed = download_batch(tickers, start_date, end_date, session, auto_adjust)
+    report_failures(failed, len(tickers), raise_errors)
+    return results
+
+
+def fetch_stock_data_cached(ticker, company_name, start_date, end_date, cache, session=None, raise_errors=False):
+    """
+    Serves a single stock from the local OHLC cache, downloading only the date
+    ranges the cache has not covered yet for this ticker. A range whose request
+    failed stays uncovered, so the retry or the next run fetches it again.
+    """
+    for gap_start, gap_end in cache.missing_ranges(ticker, start_date, end_date):
+        try:
+            data = fetch_stock_data_yfinance(ticker, company_name, gap_start, gap_end, session, raise_errors=True)
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"  - An unexpected error occurred for {company_name}: {e}")
+            continue
+        cache.store(ticker, data, gap_start, gap_end)
+    return cache.load(ticker, start_date, end_date)
+
+
+def fetch_stock_data_batch_cached(tickers, start_date, end_date, cache, session=None, raise_errors=False):
+    """
+    Batched counterpart of fetch_stock_data_cached(). Symbols missing the same
+    date range are downloaded together in one bulk request.
+    """
+    by_gap = {}
+    for company, ticker in tickers.items():
+        for gap in cache.missing_ranges(ticker, start_date, end_date):
+            by_gap.setdefault(gap, {})[company] = ticker
+
+    failed = {}
+    for (gap_start, gap_end), group in by_gap.items():
+        fetched, errors = download_batch(group, gap_start, gap_end, session)
+        for company, ticker in group.items():
+            if company not in errors:
+                cache.store(ticker, fetched[company], gap_start, gap_end)
+        failed.update(errors)
+    # The failed ranges stay uncovered; the bars that did arrive are kept, so a retry only fetches the rest.
+    report_failures(failed, len(tickers), raise_errors)
+
+    return {company: cache.load(ticker, start_date, end_date) for company, ticker in tickers.items()}
+
+
+# --- Local Adjustment ---
+# With --adjust local the cache holds unadjusted bars and corporate actions (see
+# corporate_actions.py). The cache is always extended up to today, so every run
+# fetches only the days since the previous one, and with them any new dividend
+# or split, while the years of stored bars never need re-downloading.
+
+def store_raw(cache, ticker, fetched):
+    """
+    Stores unadjusted responses, given as (gap_start, gap_end, data) tuples.
+    Yahoo's bars and dividends are split-adjusted even when unadjusted, so they
+    are un-split with every split known for the ticker before being stored.
+    """
+    known = pd.concat([cache.load_actions(ticker)] + [extract_actions(data) for _, _, data in fetched],
+                      ignore_index=True)
+    for gap_start, gap_end, data in fetched:
+        if data is not None:
+            data = unsplit(data, known)
+            cache.store_actions(ticker, extract_actions(data))
+        cache.store(ticker, data, gap_start, gap_end)
+
+
+def load_adjusted(cache, ticker, start_date, end_date):
+    """
+    Loads the cached unadjusted bars of [start_date, end_date) and adjusts them
+    with the stored actions. Later bars are read too, since a dividend after the
+    range needs the close of the day before it.
+    """
+    raw = cache.load(ticker, start_date, date.max)
+    if raw is None:
+        return None
+    adjusted = adjust_prices(raw, cache.load_actions(ticker))
+    adjusted = adjusted[adjusted['Date'].dt.tz_localize(None) < pd.Timestamp(end_date)].reset_index(drop=True)
+    return adjusted if not adjusted.empty else None
+
+
+def fetch_stock_data_raw_cached(ticker, company_name, start_date, end_date, cache, session=None, raise_errors=False):
+    """
+    --adjust local counterpart of fetch_stock_data_cached(). If any range fails,
+    none of the ranges are stored: a split in the failed range would be missing
+    from the splits the other ranges are un-split with.
+    """
+    fetched = []
+    for gap_start, gap_end in cache.missing_ranges(ticker, start_date, datetime.now()):
+        try:
+            data = fetch_stock_data_yfinance(ticker, company_name, gap_start, gap_end, session, raise_errors=True,
+                                             auto_adjust=False)
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"  - An unexpected error occurred for {company_name}: {e}")
+            return load_adjusted(cache, ticker, start_date, end_date)
+        fetched.append((gap_start, gap_end, data))
+    store_raw(cache, ticker, fetched)
+    return load_adjusted(cache, ticker, start_date, end_date)
+
+
+def fetch_stock_data_batch_raw_cached(tickers, start_date, end_date, cache, session=None, raise_errors=False):
+    """
+    --adjust local counterpart of fetch_stock_data_batch_cached(). A ticker with
+    a failed range has none of its ranges stored (see fetch_stock_data_raw_cached).
+    """
+    by_gap = {}
+    for company, ticker in tickers.items():
+        for gap in cache.missing_ranges(ticker, start_date, datetime.now()):
+            by_gap.setdefault(gap, {})[company] = ticker
+
+    fetched, failed = {}, {}
+    for (gap_start, gap_end), group in by_gap.items():
+        batch, errors = download_batch(group, gap_start, gap_end, session, auto_adjust=False)
+        for company in group:
+            if company not in errors:
+                fetched.setdefault(company, []).append((gap_start, gap_end, batch[company]))
+        failed.update(errors)
+    for company, responses in fetched.items():
+        if company not in failed:
+            store_raw(cache, tickers[company], responses)
+    report_failures(failed, len(tickers), raise_errors)
+
+    return {company: load_adjusted(cache, ticker, start_date, end_date) for company, ticker in tickers.items()}
+
+
+def _from_cache(cache, company, candidates, start_date, end_date):
+    """
+    Returns a FetchResult if the cache can answer for this company without the
+    network, trying the fallback ticker when the primary is cached as empty.
+    A raw-price cache must reach today, so that no new corporate action is missed.
+    """
+    raw = cache.prices == 'raw'
+    for ticker in candidates:
+        if cache.missing_ranges(ticker, start_date, datetime.now() if raw else end_date):
+            return None
+        data = load_adjusted(cache, ticker, start_date, end_date) if raw else cache.load(ticker, start_date, end_date)
+        if data is not None:
+            return FetchResult(company, ticker, data, 0, 0.0, None, 'cache')
+    return FetchResult(company, candidates[0], None, 0, 0.0, None, 'cache')
+
+
+def fetch_results(tickers, start_date, end_date, args, cache=None):
+    """
+    Yields a FetchResult per company, using bulk downloads when a batch size
+    above 1 is configured and one request per ticker otherwise. With a cache,
+    tickers that are already fully cached are served without touching the network;
+    a raw-price cache (--adjust local) is adjusted locally.
+    `tickers` maps each company to a ticker or to a (ticker, fallback) pair.
+    """
+    tickers, fallbacks = split_fallbacks(tickers)
+    if cache is not None:
+        pending = {}
+        for company, ticker in tickers.items():
+            candidates = [ticker] + ([fallbacks[company]] if company in fallbacks else [])
+            result = _from_cache(cache, company, candidates, start_date, end_date)
+            if result is None:
+                pending[company] = ticker
+            else:
+                yield result
+        print(f"{len(tickers) - len(pending)} tickers served from cache, {len(pending)} need fetching.")
+        tickers = pending
+    if not tickers:
+        return
+
+    session = create_session()
+    options = dict(max_workers=args.workers, rate=args.rate, retries=args.retries, backoff=args.backoff)
+    raw = cache is not None and cache.prices == 'raw'
+    if args.batch_size > 1:
+        batch_fn = fetch_stock_data_batch_raw_cached if raw else fetch_stock_data_batch_cached
+        batch_fn = fetch_stock_data_batch if cache is None else partial(batch_fn, cache=cache)
+        batch_fn = partial(batch_fn, start_date=start_date, end_date=end_date, session=session, raise_errors=True)
+        batch_fn = with_batch_fallback(batch_fn, fallbacks)
+        yield from iter_fetch_batched(tickers, batch_fn, chunk_size=args.batch_size, **options)
+        return
+
+    fetch_fn = fetch_stock_data_raw_cached if raw else fetch_stock_data_cached
+    fetch_fn = fetch_stock_data_yfinance if cache is None else partial(fetch_fn, cache=cache)
+    fetch_fn = partial(fetch_fn, start_date=start_date, end_date=end_date, session=session, raise_errors=True)
+    yield from iter_fetch(tickers, with_fallback(fetch_fn, fallbacks), **options)
+
+
+def select_tickers(args):
+    """
+    Returns the tickers for this run: the built-in TICKERS list, or the listing
+    universe filtered by the --universe options.
+    """
+    if not args.universe:
+        return TICKERS
+
+    exchanges = ('NSE', 'BSE') if args.universe == 'all' else (args.universe.upper(),)
+    universe = load_universe()
+    tickers = universe.select(
+        exchanges=exchanges,
+        series=[s for s in args.series.split(',') if s] or None,
+        groups=[g for g in args.bse_groups.split(',') if g] or None,
+        active_only=not args.include_inactive,
+    )
+    print(f"Selected {len(tickers)} of {len(universe)} listed companies from the {args.universe.upper()} universe.")
+    return tickers
+
+
 def save_data_csv(df, file_name, save_separate, output_folder):
     """
     Saves the DataFrame to a CSV file(s) inside the specified output folder.
@@ -63,19 +399,12 @@ def save_data_csv(df, file_name, save_separate, output_folder):
     # The directory is now created in main(), so we just use it.
 
     # --- Prepare the entire DataFrame for saving ---
-    df_to_process = df.copy()
-    numeric_cols = ['Open', 'High', 'Low', 'Close']
-    df_to_process[numeric_cols] = df_to_process[numeric_cols].round(2)
-    df_to_process['Date'] = pd.to_datetime(df_to_process['Date']).dt.date
-    output_cols = ['Date', 'Year', 'Company', 'Open', 'High', 'Low', 'Close', 'Volume']
-    df_to_process = df_to_process.reindex(columns=output_cols)
+    df_to_process = format_output_frame(df)
 
     if save_separate == 'y':
         print(f"\nSaving separate CSV files in '{output_folder}'...")
-        for company_name, company_df in df_to_process.groupby('Company'):
-            # Create a filesystem-safe name for the company
-            safe_company_name = re.sub(r'\W+', '', company_name.replace(' ', '_'))
-            separate_file_name = f"{file_name}_{safe_company_name}.csv"
+        for company_name, company_df in df_to_process.groupby('Company', observed=True):
+            separate_file_name = f"{file_name}_{safe_name(company_name)}.csv"
             csv_path = os.path.join(output_folder, separate_file_name)
 
             try:
@@ -94,95 +423,174 @@ def save_data_csv(df, file_name, save_separate, output_folder):
             print(f"\nError saving CSV file: {e}")
 
 
-def save_analysis(pivot_df, agg_results, file_name, output_folder):
+def save_data(df, file_name, save_separate, output_folder, formats=('csv',)):
+    """
+    Saves the DataFrame in every requested output format. CSV goes through
+    save_data_csv(); the other formats are written one company at a time.
+    """
+    if 'csv' in formats:
+        save_data_csv(df, file_name, save_separate, output_folder)
+
+    other_formats = [fmt for fmt in formats if fmt != 'csv']
+    if not other_formats or df.empty:
+        return
+    print(f"\nSaving {', '.join(other_formats)} output in '{output_folder}'...")
+    writer = open_writers(other_formats, file_name, save_separate, output_folder)
+    for company, company_df in df.groupby('Company', sort=True, observed=True):
+        writer.write(company, company_df)
+    writer.close()
+
+
+def save_analysis(pivot_df, agg_results, file_name, output_folder, formats=('txt',), stats_df=None):
     """
-    Saves the analysis results to a text file inside a 'data' folder.
+    Saves the analysis results as a text and/or markdown report inside the output folder.
+    With the per-(Company, Year) `stats_df`, the reports also get the per-company
+    statistics table and the full table is saved as <name>_interval_stats.csv.
     """
     if pivot_df is None or agg_results is None:
         print("No analysis results to save.")
         return
 
+    summary_df = summarise_interval_stats(stats_df) if stats_df is not None else None
     # The directory is now created in main()
-    analysis_path = os.path.join(output_folder, f"{file_name}_analysis.txt")
+    for fmt in formats:
+        suffix, write_report = ANALYSIS_WRITERS[fmt]
+        analysis_path = os.path.join(output_folder, f"{file_name}{suffix}")
+        try:
+            print(f"\nSaving analysis to {analysis_path}...")
+            write_report(pivot_df, agg_results, analysis_path, summary_df)
+            print("Analysis file saved successfully.")
+        except Exception as e:
+            print(f"\nError saving analysis file: {e}")
+
+    if stats_df is not None:
+        stats_path = os.path.join(output_folder, f"{file_name}_interval_stats.csv")
+        try:
+            print(f"\nSaving interval statistics to {stats_path}...")
+            stats_df.to_csv(stats_path, index=False, float_format="%.4f")
+            print("Interval statistics saved successfully.")
+        except Exception as e:
+            print(f"\nError saving interval statistics: {e}")
+
+
+def save_sweep(sweep_df, file_name, output_folder):
+    """
+    Saves the tidy interval sweep table and its per-company ranking as CSV files.
+    """
+    if sweep_df is None or sweep_df.empty:
+        print("No interval sweep results to save.")
+        return
 
+    sweep_path = os.path.join(output_folder, f"{file_name}_interval_sweep.csv")
+    summary_path = os.path.join(output_folder, f"{file_name}_interval_sweep_summary.csv")
     try:
-        print(f"\nSaving analysis to {analysis_path}...")
-        with open(analysis_path, 'w') as f:
-            f.write("--- Interval Performance Analysis ---\n\n")
-            f.write("Percentage Change (%) within Interval per Year:\n")
-            f.write(pivot_df.to_string(float_format="%.2f%%"))
-            f.write("\n\n--- Aggregate Results ---\n\n")
-            f.write(agg_results.to_string(index=False, float_format="%.2f%%"))
-        print("Analysis file saved successfully.")
+        print(f"\nSaving interval sweep to {sweep_path}...")
+        sweep_df.to_csv(sweep_path, index=False, float_format="%.4f")
+        summarise_sweep(sweep_df).to_csv(summary_path, index=False, float_format="%.4f")
+        print("Interval sweep saved successfully.")
     except Exception as e:
-        print(f"\nError saving analysis file: {e}")
+        print(f"\nError saving interval sweep: {e}")
+
 
+def parse_intervals(value):
+    """
+    Parses 'MM-DD,MM-DD;MM-DD,MM-DD;...' into a list of interval tuples.
+    """
+    date_pattern = re.compile(r'^\d{2}-\d{2}$')
+    intervals = []
+    for part in value.split(';'):
+        if not part.strip():
+            continue
+        start, end = [d.strip() for d in part.split(',')]
+        if not date_pattern.match(start) or not date_pattern.match(end):
+            raise ValueError("Format must be MM-DD.")
+        datetime.strptime(f"2024-{start}", "%Y-%m-%d")
+        datetime.strptime(f"2024-{end}", "%Y-%m-%d")
+        if start > end:
+            raise ValueError(f"Start date of interval cannot be after end date: {part}")
+        intervals.append((start, end))
+    return intervals
+
+
+def parse_interval(value):
+    """
+    Parses a single 'MM-DD,MM-DD' interval into a (start, end) tuple.
+    """
+    intervals = parse_intervals(value)
+    if len(intervals) != 1:
+        raise ValueError("Expected exactly one 'MM-DD,MM-DD' interval.")
+    return intervals[0]
 
-def perform_interval_analysis(full_df, interval):
+
+def perform_interval_analysis(full_df, interval, workers=1, store=None, symbols=None, analysis=None):
     """
-    Performs and displays interval-based performance analysis.
+    Performs and displays interval-based performance analysis, on a process
+    pool of `workers` processes when more than one is given, or on the pool of
+    `analysis`, an open ShardedAnalysis of `full_df`. With a results
+    `store` (see analysis_store), only the results it does not hold yet are computed;
+    `symbols` maps company names to the ticker symbols it is keyed by.
     Returns the results as DataFrames for saving.
     """
-    print("\n--- Interval Performance Analysis ---")
-    results = []
-    interval_start, interval_end = interval
+    compute = partial(parallel_interval_stats, workers=workers) if workers > 1 else interval_stats
+    if store is None:
+        if analysis is not None:
+            return report_interval_analysis(parallel_interval_stats(full_df, interval, analysis=analysis))
+        return report_interval_analysis(compute(full_df, interval))
+    # The store computes only a subset of full_df, which `analysis` does not cover.
+    results_df = store.interval_stats(full_df, interval, symbols, compute)
+    report_results_store(store)
+    return report_interval_analysis(results_df)
 
-    for (company, year), group in full_df.groupby(['Company', 'Year']):
-        start_date_str = f"{year}-{interval_start}"
-        end_date_str = f"{year}-{interval_end}"
-        interval_df = group[(group['Date'] >= start_date_str) & (group['Date'] <= end_date_str)]
 
-        if len(interval_df) < 2:
-            continue
+def report_results_store(store):
+    """
+    Prints and resets how many company-years the results store served since the last report.
+    """
+    print(f"\nInterval results: {store.reused} company-years reused from the results store, "
+          f"{store.computed} computed.")
+    store.reused = store.computed = 0
 
-        open_first_day = interval_df.iloc[0]['Open']
-        close_last_day = interval_df.iloc[-1]['Close']
-        if pd.isna(open_first_day) or open_first_day == 0:
-            continue
-        
-        pct_change = ((close_last_day - open_first_day) / open_first_day) * 100
-        results.append({'Company': company, 'Year': year, 'Pct_Change': pct_change})
 
-    if not results:
+def report_interval_analysis(results_df):
+    """
+    Displays the interval analysis for precomputed per-(Company, Year) results
+    (from interval_stats()) and returns the pivot, aggregate and statistics
+    DataFrames for saving.
+    """
+    print("\n--- Interval Performance Analysis ---")
+    if results_df is None or results_df.empty:
         print("Could not compute analysis. Not enough data in the specified intervals.")
-        return None, None
+        return None, None, None
 
-    results_df = pd.DataFrame(results)
-    pivot_df = results_df.pivot(index='Year', columns='Company', values='Pct_Change')
+    pivot_df, agg_results = summarise_interval_changes(results_df)
     print("\nPercentage Change (%) within Interval per Year:")
     print(pivot_df.to_string(float_format="%.2f%%"))
 
     print("\n--- Aggregate Results ---")
-    agg_results = results_df.groupby('Company')['Pct_Change'].agg(['mean']).reset_index()
-    agg_results.rename(columns={'mean': 'Avg_Pct_Change'}, inplace=True)
-    agg_results['Trend'] = agg_results['Avg_Pct_Change'].apply(lambda x: "Increased" if x > 0 else "Decreased")
     print(agg_results.to_string(index=False, float_format="%.2f%%"))
-    
-    return pivot_df, agg_results
 
+    print("\n--- Interval Statistics ---")
+    print(summarise_interval_stats(results_df).to_string(index=False, float_format="%.2f"))
+
+    return pivot_df, agg_results, results_df
 
-def get_user_input():
+
+def ask_interval():
     """
-    Prompts the user for input parameters and validates them.
+    Prompts for the ('MM-DD','MM-DD') analysis interval until it is valid.
     """
-    # Interval validation
-    date_pattern = re.compile(r'^\d{2}-\d{2}$')
     while True:
         try:
             interval_str = input("Enter interval ('MM-DD','MM-DD') [e.g., 10-01,10-15]: ").strip()
-            start, end = [d.strip() for d in interval_str.split(',')]
-            if not date_pattern.match(start) or not date_pattern.match(end):
-                raise ValueError("Format must be MM-DD.")
-            datetime.strptime(f"2024-{start}", "%Y-%m-%d")
-            datetime.strptime(f"2024-{end}", "%Y-%m-%d")
-            if start > end:
-                raise ValueError("Start date of interval cannot be after end date.")
-            interval = (start, end)
-            break
+            return parse_interval(interval_str)
         except (ValueError, IndexError) as e:
             print(f"Invalid input. Please use 'MM-DD,MM-DD' format. Error: {e}")
 
-    # Past years validation
+
+def ask_past_years():
+    """
+    Prompts for the number of past years to fetch until it is a positive number.
+    """
     while True:
         try:
             past_years = int(input("Enter number of past years to fetch (e.g., 5): ").strip())
@@ -190,88 +598,434 @@ def get_user_input():
             print("Please enter a positive number.")
         except ValueError:
             print("Invalid input. Please enter a whole number.")
-    
-    # File name validation
+    return past_years
+
+
+def ask_file_name():
+    """
+    Prompts for the base name of the output files until it is not empty.
+    """
     while True:
         file_name = input("Enter the base name for output files (e.g., indian_stock_data): ").strip()
         if file_name: break
         print("File name cannot be empty.")
-    
-    # Separate files validation
+    return file_name
+
+
+def ask_save_separate():
+    """
+    Prompts whether a separate file should be saved for each stock.
+    """
     while True:
         save_separate = input("\nSave a separate file for each stock? (y/n): ").lower().strip()
         if save_separate in ['y', 'n']:
             break
         print("Invalid input. Please enter 'y' or 'n'.")
+    return save_separate
+
 
+def get_user_input(args=None):
+    """
+    Prompts the user for input parameters and validates them.
+    Parameters already given on the command line are not asked for again.
+    """
+    interval = args.interval if args is not None and args.interval else ask_interval()
+    past_years = args.years if args is not None and args.years else ask_past_years()
+    file_name = args.file_name if args is not None and args.file_name else ask_file_name()
+    save_separate = args.separate if args is not None and args.separate else ask_save_separate()
     return interval, past_years, file_name, save_separate
 
 
-def main():
+def parse_formats(choices):
     """
-    Main function to orchestrate the data fetching, processing, and analysis.
+    Returns an argparse type that accepts a comma-separated subset of `choices`.
     """
-    print("--- Indian Stock Market Data Fetcher & Analyzer (Yahoo Finance) ---")
-    interval, past_years, file_name, save_separate = get_user_input()
+    def parse(value):
+        formats = [fmt.strip().lower() for fmt in value.split(',') if fmt.strip()]
+        unknown = [fmt for fmt in formats if fmt not in choices]
+        if not formats or unknown:
+            raise argparse.ArgumentTypeError(f"choose one or more of: {', '.join(choices)}")
+        return formats
+    return parse
+
+
+def ask_for_analysis(answer=None):
+    """
+    Asks whether the interval performance analysis should be shown and saved,
+    unless the answer was already given on the command line.
+    """
+    if answer is not None:
+        return answer == 'y'
+    while True:
+        do_analysis = input("\nDo you want interval performance analysis? (y/n): ").lower().strip()
+        if do_analysis in ['y', 'n']: break
+        print("Invalid input.")
+    return do_analysis == 'y'
+
+
+def build_parser(description="Indian Stock Market Data Fetcher & Analyzer (Yahoo Finance)", report_options=True):
+    """
+    Builds the command-line parser. Every prompt can be answered up front with
+    an option, which makes the run non-interactive. With report_options=False
+    only the fetch and output options are added (used by the batch runner).
+    """
+    parser = argparse.ArgumentParser(description=description)
+    if report_options:
+        add_report_options(parser)
+    add_fetch_options(parser)
+    add_download_options(parser)
+    add_selection_options(parser)
+    add_output_options(parser)
+    add_analysis_options(parser)
+    return parser
+
+
+def add_report_options(parser):
+    """
+    Adds the options that answer the interactive prompts of a single report.
+    """
+    parser.add_argument("--interval", type=parse_interval,
+                        help="Analysis interval 'MM-DD,MM-DD' (prompted for if omitted).")
+    parser.add_argument("--years", type=int,
+                        help="Number of past years to fetch (prompted for if omitted).")
+    parser.add_argument("--file-name",
+                        help="Base name for output files (prompted for if omitted).")
+    parser.add_argument("--separate", choices=['y', 'n'],
+                        help="Save a separate file for each stock (prompted for if omitted).")
+    parser.add_argument("--analysis", choices=['y', 'n'],
+                        help="Run the interval performance analysis (prompted for if omitted).")
+    parser.add_argument("--sweep", type=parse_intervals, default=[],
+                        help="Also analyse these intervals in one pass, e.g. '01-01,01-31;10-01,10-15'.")
+    parser.add_argument("--sweep-step", type=int, default=0,
+                        help="Also analyse every start/end pair on a grid of days this many days apart.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Filter, write and analyse each ticker as it arrives instead of holding all data in memory.")
+    parser.add_argument("--resume", metavar="RUN_DIR",
+                        help="Resume an interrupted run from its data/run_<timestamp> folder, "
+                             "fetching only the tickers that are missing or failed.")
+
+
+def add_fetch_options(parser):
+    """
+    Adds the options that pace the requests sent to Yahoo.
+    """
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Number of tickers fetched concurrently (default: {DEFAULT_WORKERS}).")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"Maximum requests per second across all workers (default: {DEFAULT_RATE}).")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help=f"Retries per ticker after a failed request (default: {DEFAULT_RETRIES}).")
+    parser.add_argument("--backoff", type=float, default=DEFAULT_BACKOFF,
+                        help=f"Base delay in seconds for the jittered retry backoff (default: {DEFAULT_BACKOFF}).")
+
+
+def add_download_options(parser):
+    """
+    Adds the options that choose how price history is downloaded and cached.
+    """
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help="Download tickers in bulk groups of this size (default: one request per ticker).")
+    parser.add_argument("--cache",
+                        help=f"Local OHLC cache file; only missing date ranges are downloaded "
+                             f"(default: {DEFAULT_CACHE_PATH}, or {DEFAULT_RAW_CACHE_PATH} with --adjust local).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore the local cache and download the full history for every ticker.")
+    parser.add_argument("--adjust", choices=['yahoo', 'local'], default='yahoo',
+                        help="'yahoo' stores Yahoo's adjusted prices; 'local' stores unadjusted prices plus dividends "
+                             "and splits and adjusts them locally, so a new corporate action never forces a "
+                             "re-download (default: yahoo).")
+
+
+def add_selection_options(parser):
+    """
+    Adds the options that select the tickers.
+    """
+    parser.add_argument("--universe", choices=['nse', 'bse', 'all'],
+                        help="Fetch the listed universe from data/equity_listings instead of the built-in TICKERS.")
+    parser.add_argument("--series", default="EQ",
+                        help="Comma-separated NSE series to include with --universe (default: EQ; empty for all).")
+    parser.add_argument("--bse-groups", default="",
+                        help="Comma-separated BSE groups to include with --universe, e.g. 'A,B' (default: all).")
+    parser.add_argument("--include-inactive", action="store_true",
+                        help="Include BSE listings whose status is not Active.")
+
+
+def add_output_options(parser):
+    """
+    Adds the options that choose the output formats of a report.
+    """
+    parser.add_argument("--format", type=parse_formats(list(DATA_WRITERS)), default=['csv'],
+                        help=f"Comma-separated raw data output formats: {', '.join(DATA_WRITERS)} (default: csv).")
+    parser.add_argument("--timeframe", choices=['1d', '1wk', '1mo'], default='1d',
+                        help="Bar size of the saved interval data; weekly and monthly bars are built locally from "
+                             "the daily bars of each year's window (default: 1d).")
+    parser.add_argument("--report", type=parse_formats(list(ANALYSIS_WRITERS)), default=['txt'],
+                        help=f"Comma-separated analysis report formats: {', '.join(ANALYSIS_WRITERS)} (default: txt).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the run with cProfile and save profile.pstats in the run folder.")
+
+
+def add_analysis_options(parser):
+    """
+    Adds the options that tune how the interval results are computed and kept.
+    """
+    parser.add_argument("--price-dtype", choices=['float64', 'float32'], default='float64',
+                        help="In-memory price precision; float32 halves price memory (default: float64).")
+    parser.add_argument("--results-store", metavar="PATH",
+                        help="Keep the per-(symbol, year) interval results in this SQLite file and compute only the "
+                             "ones that are missing or whose prices changed, e.g. "
+                             f"{DEFAULT_RESULTS_STORE_PATH} (default: off).")
+    parser.add_argument("--analysis-workers", type=int, default=1,
+                        help="Processes used for the interval analysis and sweep; the data is shared with them "
+                             "through shared memory (default: 1, in-process).")
+
+
+def parse_args(argv=None):
+    """
+    Parses the command-line options.
+    """
+    args = build_parser().parse_args(argv)
+    if args.years is not None and args.years <= 0:
+        build_parser().error("--years must be a positive number.")
+    if args.analysis_workers < 1:
+        build_parser().error("--analysis-workers must be at least 1.")
+    if args.adjust == 'local' and args.no_cache:
+        build_parser().error("--adjust local keeps unadjusted prices in the cache and cannot be used with --no-cache.")
+    return args
+
 
-    # --- NEW: Create a unique, timestamped folder for this run ---
+def open_cache(args):
+    """
+    Opens the OHLC cache selected by --cache/--adjust, or returns None with --no-cache.
+    """
+    if args.no_cache:
+        return None
+    try:
+        if args.adjust == 'local':
+            return OHLCCache(args.cache or DEFAULT_RAW_CACHE_PATH, prices='raw')
+        return OHLCCache(args.cache or DEFAULT_CACHE_PATH)
+    except ValueError as e:
+        build_parser().error(str(e))
+
+
+def open_results_store(args):
+    """
+    Opens the interval results store given with --results-store, or returns None.
+    """
+    if not args.results_store:
+        return None
+    return AnalysisStore(args.results_store, adjustment=adjustment_version(args.adjust))
+
+
+def create_output_folder():
+    """
+    Creates a unique, timestamped folder for this run and returns its path.
+    """
     run_timestamp = datetime.now().strftime('%Y-%m-%d_%H%M%S')
     output_folder_path = os.path.join("data", f"run_{run_timestamp}")
     os.makedirs(output_folder_path, exist_ok=True)
     print(f"\nAll output files will be saved in: '{output_folder_path}'")
-    # -----------------------------------------------------------------
-
-    current_year = datetime.now().year
-    start_date_dt = datetime(current_year - past_years, 1, 1)
-    end_date_dt = datetime(current_year, 1, 1)
+    return output_folder_path
 
-    print(f"\nConfiguration:")
-    print(f" - Data Period: {start_date_dt.strftime('%Y-%m-%d')} to {end_date_dt.strftime('%Y-%m-%d')}")
-    print(f" - Analysis Interval: {interval[0]} to {interval[1]}")
-    print("-" * 20)
 
+def build_full_df(results, tickers, current_year, price_dtype='float64'):
+    """
+    Collects the fetched frames into one compact long frame sorted by Company
+    and Date, without the current (incomplete) year. Returns None if nothing was fetched.
+    """
+    # Each ticker is compacted as it arrives (categorical Company, int16 Year and MonthDay).
+    companies = company_dtype(tickers)
     all_stocks_data = []
-    
-    for company, ticker in TICKERS.items():
-        data = fetch_stock_data_yfinance(ticker, company, start_date_dt, end_date_dt)
-        
+    for result in results:
+        data = result.data
         if data is not None:
-            data['Company'] = company
-            data['Year'] = data['Date'].dt.year
-            all_stocks_data.append(data)
-        time.sleep(1)
+            data['Company'] = result.company
+            all_stocks_data.append(compact_ohlc(data, companies, price_dtype))
 
     if not all_stocks_data:
-        print("\nCould not fetch data for any stocks. Exiting.")
-        return
+        return None
 
     full_df = pd.concat(all_stocks_data, ignore_index=True)
     full_df = full_df[full_df['Year'] < current_year].copy()
     full_df.sort_values(by=['Company', 'Date'], inplace=True)
+    return full_df
 
+
+def write_run_outputs(full_df, interval, file_name, save_separate, output_folder, do_analysis, args, sweep=(),
+                      metrics=None, store=None, symbols=None):
+    """
+    Filters the data to the interval, runs the optional analysis and sweep,
+    and saves every output of one report. Stage timings go to `metrics` when given,
+    and `store`/`symbols` are passed on to perform_interval_analysis().
+    With --analysis-workers, the analysis and the sweep share one process pool.
+    """
+    metrics = metrics or RunMetrics()
     print(f"\nFiltering all data to the interval: {interval[0]} to {interval[1]} for each year...")
-    full_df['MonthDay'] = full_df['Date'].dt.strftime('%m-%d')
-    interval_df = full_df[
-        (full_df['MonthDay'] >= interval[0]) & (full_df['MonthDay'] <= interval[1])
-    ].copy()
-    interval_df.drop(columns=['MonthDay'], inplace=True)
-    
-    pivot_df, agg_results = None, None
-    while True:
-        do_analysis = input("\nDo you want interval performance analysis? (y/n): ").lower().strip()
-        if do_analysis in ['y', 'n']: break
-        print("Invalid input.")
+    with metrics.stage('filter'):
+        interval_df = full_df[
+            (full_df['MonthDay'] >= parse_month_day(interval[0])) & (full_df['MonthDay'] <= parse_month_day(interval[1]))
+        ]
+
+    analysis = None
+    if args.analysis_workers > 1 and ((do_analysis and store is None) or sweep):
+        with metrics.stage('analysis'):
+            analysis = ShardedAnalysis(full_df, args.analysis_workers)
+    try:
+        pivot_df, agg_results, stats_df = None, None, None
+        if do_analysis:
+            with metrics.stage('analysis'):
+                pivot_df, agg_results, stats_df = perform_interval_analysis(full_df, interval, args.analysis_workers,
+                                                                            store, symbols, analysis)
+
+        # --- MODIFIED: Pass the new output folder path to the save functions ---
+        with metrics.stage('save'):
+            save_data(resample_frame(interval_df, args.timeframe), file_name, save_separate, output_folder,
+                      args.format)
+
+            if pivot_df is not None:
+                save_analysis(pivot_df, agg_results, file_name, output_folder, args.report, stats_df)
+
+        if sweep:
+            print(f"\nSweeping {len(sweep)} intervals over the fetched data...")
+            with metrics.stage('analysis'):
+                if analysis is not None:
+                    sweep_df = parallel_sweep(full_df, sweep, analysis=analysis)
+                else:
+                    sweep_df = sweep_intervals(full_df, sweep)
+            with metrics.stage('save'):
+                save_sweep(sweep_df, file_name, output_folder)
+    finally:
+        if analysis is not None:
+            analysis.shutdown()
+
+
+def resume_settings(args):
+    """
+    Loads the saved settings of the run folder given with --resume and applies
+    them to `args`, so the resumed run produces the same outputs.
+    Returns the settings.
+    """
+    try:
+        settings = CheckpointJournal(args.resume).load_settings()
+    except ValueError as e:
+        build_parser().error(str(e))
+    args.interval = tuple(settings['interval'])
+    args.years = settings['years']
+    args.file_name = settings['file_name']
+    args.separate = settings['separate']
+    args.analysis = args.analysis or settings['analysis']
+    args.sweep = [tuple(interval) for interval in settings['sweep']]
+    args.sweep_step = 0
+    args.stream = settings['stream']
+    args.format = settings['format']
+    args.report = settings['report']
+    args.adjust = settings.get('adjust', 'yahoo')
+    args.timeframe = settings.get('timeframe', '1d')
+    args.price_dtype = settings.get('price_dtype', 'float64')
+    return settings
+
+
+def main(argv=None):
+    """
+    Main function to orchestrate the data fetching, processing, and analysis.
+    """
+    args = parse_args(argv)
+    metrics = RunMetrics()
+    print("--- Indian Stock Market Data Fetcher & Analyzer (Yahoo Finance) ---")
+    settings = resume_settings(args) if args.resume else None
+    with metrics.stage('input'):
+        interval, past_years, file_name, save_separate = get_user_input(args)
+    cache = open_cache(args)
+    store = open_results_store(args)
+
+    if settings:
+        output_folder_path = args.resume
+        print(f"\nResuming the run in '{output_folder_path}'")
+    else:
+        output_folder_path = create_output_folder()
+    journal = CheckpointJournal(output_folder_path)
+
+    current_year = settings['current_year'] if settings else datetime.now().year
+    start_date_dt = datetime(current_year - past_years, 1, 1)
+    end_date_dt = datetime(current_year, 1, 1)
+
+    print(f"\nConfiguration:")
+    print(f" - Data Period: {start_date_dt.strftime('%Y-%m-%d')} to {end_date_dt.strftime('%Y-%m-%d')}")
+    print(f" - Analysis Interval: {interval[0]} to {interval[1]}")
+    print(f" - Concurrency: {args.workers} workers, at most {args.rate} requests/sec")
+    if args.batch_size > 1:
+        print(f" - Batched Downloads: {args.batch_size} tickers per request")
+    print("-" * 20)
+
+    # metrics.json is written even when the run fails or is interrupted part-way.
+    with profiled(output_folder_path, args.profile), metrics.recorded_to(output_folder_path, args=vars(args)):
+        sweep = list(args.sweep)
+        if args.sweep_step > 0:
+            sweep += interval_grid(calendar_days(args.sweep_step))
+
+        if settings:
+            tickers = settings['tickers']
+        else:
+            with metrics.stage('input'):
+                tickers = select_tickers(args)
+            journal.save_settings(
+                interval=interval, years=past_years, file_name=file_name, separate=save_separate,
+                current_year=current_year, tickers=tickers, analysis=args.analysis, sweep=sweep,
+                stream=args.stream, format=args.format, report=args.report, adjust=args.adjust,
+                timeframe=args.timeframe, price_dtype=args.price_dtype,
+            )
+
+        # Tickers completed by an earlier attempt of this run are read back from the checkpoint.
+        done = journal.completed()
+        pending = {company: ticker for company, ticker in tickers.items() if company not in done}
+        if settings:
+            print(f"{len(done)} tickers restored from the checkpoint, {len(pending)} left to fetch.")
+
+        # One pooled session is shared by all workers; the rate limiter replaces the old fixed sleep.
+        results = chain(journal.replay(done),
+                        journal.record(fetch_results(pending, start_date_dt, end_date_dt, args, cache)))
+        results = metrics.track_fetches(results)
+
+        if args.stream:
+            print(f"\nStreaming each ticker through the interval filter ({interval[0]} to {interval[1]}) as it arrives...")
+            # Filtering, writing and per-ticker analysis are interleaved, so they are timed as one stage.
+            with metrics.stage('stream'):
+                writer = open_writers(args.format, file_name, save_separate, output_folder_path)
+                analyse = partial(store.interval_stats, symbols=tickers) if store is not None else interval_stats
+                companies, results_df, sweep_df = stream_outputs(results, interval, current_year, writer, sweep,
+                                                                 analyse, args.timeframe)
+            if store is not None:
+                report_results_store(store)
+            if not companies:
+                print("\nCould not fetch data for any stocks. Exiting.")
+                return
+
+            if ask_for_analysis(args.analysis):
+                with metrics.stage('analysis'):
+                    pivot_df, agg_results, stats_df = report_interval_analysis(results_df)
+                if pivot_df is not None:
+                    with metrics.stage('save'):
+                        save_analysis(pivot_df, agg_results, file_name, output_folder_path, args.report, stats_df)
+            if sweep:
+                with metrics.stage('save'):
+                    save_sweep(sweep_df, file_name, output_folder_path)
 
-    if do_analysis == 'y':
-        pivot_df, agg_results = perform_interval_analysis(full_df, interval)
+            journal.finish()
+            print("\nProgram finished successfully.")
+            return
 
-    # --- MODIFIED: Pass the new output folder path to the save functions ---
-    save_data_csv(interval_df, file_name, save_separate, output_folder_path)
+        with metrics.stage('concat'):
+            full_df = build_full_df(results, tickers, current_year, args.price_dtype)
+        if full_df is None:
+            print("\nCould not fetch data for any stocks. Exiting.")
+            return
 
-    if pivot_df is not None:
-        save_analysis(pivot_df, agg_results, file_name, output_folder_path)
+        do_analysis = ask_for_analysis(args.analysis)
+        write_run_outputs(full_df, interval, file_name, save_separate, output_folder_path, do_analysis, args, sweep,
+                          metrics, store, tickers)
 
-    print("\nProgram finished successfully.")
+        journal.finish()
+        print("\nProgram finished successfully.")
 
 
 if __name__ == "__main__":
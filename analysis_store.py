@@ -0,0 +1,201 @@
+import os
+import sqlite3
+import threading
+
+from corporate_actions import ADJUSTMENT_VERSION
+from fetch_engine import split_fallbacks
+from interval_kernels import STAT_COLS, frame_month_day, interval_stats, parse_month_day
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- Incremental Analysis Results ---
+# The interval statistics of a (symbol, year) only depend on that year's bars
+# inside the window, so they are stored per (symbol, year, interval, price
+# adjustment) together with a fingerprint of exactly those bars. A run reuses
+# every stored result whose fingerprint still matches and computes only the
+# rest: newly completed years, new tickers, or years whose prices changed (for
+# example after Yahoo re-adjusted the history for a new dividend).
+
+DEFAULT_RESULTS_STORE_PATH = os.path.join("data", "cache", "analysis_results.sqlite")
+
+# Bump when segment_stats() changes, so every stored result is recomputed.
+RESULTS_VERSION = 1
+
+FINGERPRINT_COLS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    symbol           TEXT NOT NULL,
+    year             INTEGER NOT NULL,
+    interval         TEXT NOT NULL,
+    adjustment       TEXT NOT NULL,
+    fingerprint      INTEGER NOT NULL,
+    pct_change       REAL,
+    high             REAL,
+    low              REAL,
+    range_pct        REAL,
+    max_drawdown_pct REAL,
+    volatility_pct   REAL,
+    volume           REAL,
+    days             INTEGER NOT NULL,
+    PRIMARY KEY (symbol, year, interval, adjustment)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS settings (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def adjustment_version(adjust):
+    """
+    Returns the adjustment key of results computed from `--adjust` prices.
+    """
+    return f"{adjust}-v{ADJUSTMENT_VERSION}"
+
+
+def window_fingerprints(window_df):
+    """
+    Returns a Company/Year/Fingerprint frame with one int64 fingerprint per
+    group of the given window rows. Any change to a bar's date, prices or
+    volume, or an added or removed bar, changes the fingerprint of its group.
+    """
+    # Normalised first, so the same bars hash alike whether they come from Yahoo or the cache.
+    dates = pd.to_datetime(window_df['Date'])
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    bars = window_df[FINGERPRINT_COLS[1:]].astype('float64')
+    bars.insert(0, 'Date', dates.to_numpy().astype('datetime64[D]').astype('int64'))
+    hashes = pd.util.hash_pandas_object(bars, index=False)
+    # A wrapping uint64 sum is order-independent; the Date in every row hash pins down the order.
+    fingerprints = hashes.groupby([window_df['Company'], window_df['Year']], observed=True).sum()
+    # SQLite integers are signed 64-bit.
+    return pd.Series(fingerprints.to_numpy(dtype='uint64').view('int64'), index=fingerprints.index,
+                     name='Fingerprint').reset_index()
+
+
+class AnalysisStore:
+    """
+    SQLite store of per-(symbol, year) interval statistics for one kind of
+    price adjustment (see adjustment_version()). Safe to share between threads.
+    `reused` and `computed` count the company-years served from the store and computed.
+    """
+
+    def __init__(self, path=DEFAULT_RESULTS_STORE_PATH, adjustment=adjustment_version('yahoo')):
+        self.path = path
+        self.adjustment = adjustment
+        self.reused = 0
+        self.computed = 0
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+            row = self._conn.execute("SELECT value FROM settings WHERE key = 'version'").fetchone()
+            if row is None or int(row[0]) != RESULTS_VERSION:
+                self._conn.execute("DELETE FROM results")
+                self._conn.execute("INSERT OR REPLACE INTO settings VALUES ('version', ?)", (str(RESULTS_VERSION),))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def load(self, symbols, interval):
+        """
+        Returns the stored Symbol/Year/Fingerprint/STAT_COLS rows of the symbols
+        (of every symbol if `symbols` is None) for the interval.
+        """
+        label = f"{interval[0]},{interval[1]}"
+        query = (f"SELECT symbol, year, fingerprint, {', '.join(col.lower() for col in STAT_COLS)} FROM results "
+                 f"WHERE interval = ? AND adjustment = ?")
+        frames = []
+        with self._lock:
+            if symbols is None:
+                frames.append(pd.read_sql_query(query, self._conn, params=(label, self.adjustment)))
+            else:
+                symbols = list(symbols)
+                # Stay below SQLite's limit on query parameters.
+                for i in range(0, len(symbols), 500):
+                    chunk = symbols[i:i + 500]
+                    frames.append(pd.read_sql_query(
+                        f"{query} AND symbol IN ({', '.join('?' * len(chunk))})",
+                        self._conn, params=(label, self.adjustment, *chunk)
+                    ))
+        columns = ['Symbol', 'Year', 'Fingerprint'] + STAT_COLS
+        stored = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        stored.columns = columns
+        # Nullable integers, so a left merge cannot turn the fingerprints into (lossy) floats.
+        return stored.astype({'Year': 'int64', 'Fingerprint': 'Int64', 'Days': 'Int64'})
+
+    def save(self, interval, results_df):
+        """
+        Saves Symbol/Year/Fingerprint/STAT_COLS rows for the interval. Years
+        without a result are saved with Days = 0, so they are not recomputed either.
+        """
+        label = f"{interval[0]},{interval[1]}"
+        columns = ['Symbol', 'Year', 'Fingerprint'] + STAT_COLS
+        rows = results_df[columns].astype(object).where(results_df[columns].notna(), None)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?{', ?' * len(STAT_COLS)})",
+                [(symbol, int(year), label, self.adjustment, int(fingerprint), *values)
+                 for symbol, year, fingerprint, *values in rows.itertuples(index=False)]
+            )
+
+    def invalidate(self, symbol=None, interval=None):
+        """
+        Drops stored results for a symbol and/or interval (everything if neither is given).
+        """
+        label = f"{interval[0]},{interval[1]}" if interval else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM results WHERE (? IS NULL OR symbol = ?) AND (? IS NULL OR interval = ?)",
+                (symbol, symbol, label, label)
+            )
+
+    def interval_stats(self, full_df, interval, symbols=None, compute=interval_stats):
+        """
+        Incremental interval_stats(): returns the same frame, computing with
+        `compute` only the (Company, Year) groups whose result is missing or
+        whose window bars changed since it was stored. `symbols` maps company
+        names to ticker symbols or (ticker, fallback) pairs; results are stored
+        under the first ticker, or the company name if it has none.
+        """
+        md = frame_month_day(full_df)
+        window = full_df[(md >= parse_month_day(interval[0])) & (md <= parse_month_day(interval[1]))]
+        if window.empty:
+            return compute(window, interval)
+        groups = window_fingerprints(window)
+        company = groups['Company'].astype(object)
+        groups['Symbol'] = company.map(split_fallbacks(symbols or {})[0]).fillna(company)
+        groups['Year'] = groups['Year'].astype('int64')
+
+        stored = self.load(groups['Symbol'].unique(), interval)
+        merged = groups.merge(stored, on=['Symbol', 'Year'], how='left', suffixes=('', '_stored'))
+        hit = (merged['Fingerprint'] == merged['Fingerprint_stored']).fillna(False).to_numpy(dtype=bool)
+        reused = merged[hit & (merged['Days'] > 0).fillna(False).to_numpy(dtype=bool)]
+        stale = merged.loc[~hit, ['Company', 'Year', 'Symbol', 'Fingerprint']]
+
+        fresh = None
+        if len(stale):
+            in_stale = pd.MultiIndex.from_arrays([window['Company'], window['Year']]).isin(
+                pd.MultiIndex.from_frame(stale[['Company', 'Year']]))
+            fresh = compute(window[in_stale], interval)
+            fresh = fresh.astype({'Company': object, 'Year': 'int64'})
+            computed = stale.astype({'Company': object}).merge(fresh, on=['Company', 'Year'], how='left')
+            computed['Days'] = computed['Days'].fillna(0)
+            self.save(interval, computed)
+        with self._lock:
+            self.reused += len(reused)
+            self.computed += len(stale)
+
+        reused = reused[['Company', 'Year'] + STAT_COLS]
+        frames = [frame for frame in (reused, fresh) if frame is not None and len(frame)]
+        results_df = pd.concat(frames, ignore_index=True) if frames else reused
+        results_df = results_df.astype({'Company': full_df['Company'].dtype, 'Year': full_df['Year'].dtype,
+                                        'Days': 'int64'})
+        return results_df.sort_values(by=['Company', 'Year'], ignore_index=True)
@@ -0,0 +1,207 @@
+import os
+import sys
+from collections import namedtuple
+from datetime import datetime
+
+from OHLC_Extractor_v2 import (
+    build_full_df, build_parser, create_output_folder, fetch_results, open_cache, open_results_store, parse_interval,
+    parse_intervals, select_tickers, write_run_outputs
+)
+from run_metrics import RunMetrics, profiled
+
+# --- Batch Job Runner ---
+# Runs many report specs from one TOML or YAML job file without any prompts.
+# The union of the symbols and the longest history needed by all reports is
+# fetched once, and every report is then cut from the shared in-memory data.
+#
+# Example job file (TOML):
+#
+#     [defaults]
+#     years = 5
+#     separate = "n"
+#
+#     [[report]]
+#     file_name = "october_window"
+#     interval = "10-01,10-15"
+#
+#     [[report]]
+#     file_name = "banks_q1"
+#     interval = "01-01,03-31"
+#     years = 10
+#     tickers = ["Central Bank", "JIOFIN.NS"]
+#     separate = "y"
+
+ReportSpec = namedtuple('ReportSpec', ['file_name', 'interval', 'years', 'tickers', 'separate', 'analysis', 'sweep'])
+
+REPORT_DEFAULTS = {'years': 5, 'tickers': None, 'separate': 'n', 'analysis': 'y', 'sweep': ''}
+
+
+def _yes_no(value):
+    if isinstance(value, bool):
+        return 'y' if value else 'n'
+    value = str(value).lower().strip()
+    if value not in ('y', 'n'):
+        raise ValueError(f"Expected 'y' or 'n', got '{value}'.")
+    return value
+
+
+def read_job_file(path):
+    """
+    Reads a .toml, .yaml or .yml job file into a dictionary.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.toml':
+        import tomllib
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    if extension in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise RuntimeError("YAML job files need the 'PyYAML' package. Install it with: pip install pyyaml")
+        with open(path) as f:
+            return yaml.safe_load(f) or {}
+    raise ValueError(f"Unsupported job file type '{extension}'. Use .toml, .yaml or .yml.")
+
+
+def load_job(path):
+    """
+    Loads and validates the report specs of a job file.
+    """
+    job = read_job_file(path)
+    defaults = {**REPORT_DEFAULTS, **job.get('defaults', {})}
+    reports = job.get('report') or job.get('reports') or []
+    if not reports:
+        raise ValueError(f"Job file '{path}' does not define any [[report]] entries.")
+
+    specs = []
+    for i, entry in enumerate(reports, start=1):
+        entry = {**defaults, **entry}
+        try:
+            if not entry.get('file_name'):
+                raise ValueError("'file_name' is required.")
+            if not entry.get('interval'):
+                raise ValueError("'interval' is required.")
+            years = int(entry['years'])
+            if years <= 0:
+                raise ValueError("'years' must be a positive number.")
+            sweep = entry['sweep']
+            specs.append(ReportSpec(
+                file_name=str(entry['file_name']),
+                interval=parse_interval(entry['interval']),
+                years=years,
+                tickers=list(entry['tickers']) if entry['tickers'] else None,
+                separate=_yes_no(entry['separate']),
+                analysis=_yes_no(entry['analysis']),
+                sweep=parse_intervals(';'.join(sweep) if isinstance(sweep, list) else sweep),
+            ))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid report #{i} in '{path}': {e}")
+
+    names = [spec.file_name for spec in specs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Report file names must be unique; repeated: {', '.join(duplicates)}")
+    return specs
+
+
+def resolve_tickers(spec, tickers):
+    """
+    Returns the subset of the run's tickers that a report asks for. Entries may
+    be company names or ticker symbols, with or without the .NS/.BO suffix.
+    """
+    if not spec.tickers:
+        return dict(tickers)
+
+    lookup = {}
+    for company, value in tickers.items():
+        symbols = value if isinstance(value, (tuple, list)) else (value,)
+        for key in (company, *[s for s in symbols if s]):
+            lookup[key.upper()] = company
+            lookup[key.upper().rsplit('.', 1)[0]] = company
+
+    selected, unknown = {}, []
+    for entry in spec.tickers:
+        company = lookup.get(str(entry).upper())
+        if company is None:
+            unknown.append(str(entry))
+        else:
+            selected[company] = tickers[company]
+    if unknown:
+        print(f" - Report '{spec.file_name}': skipping unknown tickers {', '.join(unknown)}")
+    return selected
+
+
+def run_job(specs, args):
+    """
+    Fetches the union of every report's tickers and years once, then writes each report.
+    """
+    metrics = RunMetrics()
+    with metrics.stage('input'):
+        tickers = select_tickers(args)
+    report_tickers = {spec.file_name: resolve_tickers(spec, tickers) for spec in specs}
+    needed = {}
+    for subset in report_tickers.values():
+        needed.update(subset)
+
+    current_year = datetime.now().year
+    max_years = max(spec.years for spec in specs)
+    start_date_dt = datetime(current_year - max_years, 1, 1)
+    end_date_dt = datetime(current_year, 1, 1)
+
+    print(f"\nBatch job: {len(specs)} reports over {len(needed)} tickers")
+    print(f" - Data Period: {start_date_dt.strftime('%Y-%m-%d')} to {end_date_dt.strftime('%Y-%m-%d')}")
+    print("-" * 20)
+
+    cache = open_cache(args)
+    store = open_results_store(args)
+    output_folder_path = create_output_folder()
+    with profiled(output_folder_path, args.profile), metrics.recorded_to(output_folder_path, job=args.job):
+        results = metrics.track_fetches(fetch_results(needed, start_date_dt, end_date_dt, args, cache))
+        with metrics.stage('concat'):
+            full_df = build_full_df(results, needed, current_year, args.price_dtype)
+        if full_df is None:
+            print("\nCould not fetch data for any stocks. Exiting.")
+            return
+
+        for spec in specs:
+            print(f"\n=== Report '{spec.file_name}': {spec.interval[0]} to {spec.interval[1]}, "
+                  f"last {spec.years} years, {len(report_tickers[spec.file_name])} tickers ===")
+            with metrics.stage('filter'):
+                report_df = full_df[
+                    full_df['Company'].isin(list(report_tickers[spec.file_name])) &
+                    (full_df['Year'] >= current_year - spec.years)
+                ].copy()
+                report_df['Company'] = report_df['Company'].cat.remove_unused_categories()
+            if report_df.empty:
+                print("No data available for this report.")
+                continue
+            write_run_outputs(report_df, spec.interval, spec.file_name, spec.separate, output_folder_path,
+                              spec.analysis == 'y', args, spec.sweep, metrics, store, needed)
+
+        print("\nBatch job finished successfully.")
+
+
+def main(argv=None):
+    """
+    Runs a batch job file. Accepts the same fetch and output options as
+    OHLC_Extractor_v2.py; the report options come from the job file.
+    """
+    parser = build_parser(description="Run many OHLC reports from one job file, sharing a single fetch.",
+                          report_options=False)
+    parser.add_argument("job", help="Path to a .toml or .yaml job file.")
+    args = parser.parse_args(argv)
+    if args.analysis_workers < 1:
+        parser.error("--analysis-workers must be at least 1.")
+    if args.adjust == 'local' and args.no_cache:
+        parser.error("--adjust local keeps unadjusted prices in the cache and cannot be used with --no-cache.")
+    try:
+        specs = load_job(args.job)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    run_job(specs, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compact_frame import company_dtype, compact_ohlc, memory_report  # noqa: E402
+from synthetic import synthetic_universe  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory of the original and compact OHLC frames.")
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--years", type=int, default=20)
+    args = parser.parse_args()
+
+    # The frame main() used to build: string Company, int Year and a '%m-%d' string column.
+    legacy = synthetic_universe(args.companies, args.years)
+    legacy['Company'] = legacy['Company'].astype(object)
+    legacy['MonthDay'] = legacy['Date'].dt.strftime('%m-%d').astype(object)
+    print(f"{len(legacy):,} rows, {args.companies} companies x {args.years} years")
+
+    companies = company_dtype(legacy['Company'].unique())
+    memory_report(legacy, compact_ohlc(legacy, companies), label="float64 prices")
+    memory_report(legacy, compact_ohlc(legacy, companies, price_dtype='float32'), label="float32 prices")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from compact_frame import company_dtype, compact_ohlc  # noqa: E402
+from interval_sweep import IntervalSweep, calendar_days, interval_grid  # noqa: E402
+from parallel_analysis import parallel_sweep  # noqa: E402
+from synthetic import synthetic_universe  # noqa: E402
+
+# --- Sharded Analysis Scaling Benchmark ---
+# Times an interval sweep in-process and on 1..N worker processes over the same
+# synthetic universe and checks that every run returns identical results.
+# Set-up (sorting, shared memory, worker start-up) is included in every timing,
+# as it is in a real run.
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark for the process-pool interval analysis.")
+    parser.add_argument("--companies", type=int, default=500)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--step", type=int, default=14, help="Sweep grid step in days.")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts to time.")
+    args = parser.parse_args()
+
+    full_df = synthetic_universe(args.companies, args.years)
+    full_df = compact_ohlc(full_df, company_dtype(full_df['Company'].unique()))
+    intervals = interval_grid(calendar_days(args.step))
+    print(f"{len(full_df):,} rows, {args.companies} companies x {args.years} years, {len(intervals)} intervals, "
+          f"{os.cpu_count()} CPUs")
+
+    reference, baseline = timed(lambda: IntervalSweep(full_df).sweep(intervals))
+    print(f"in-process:  {baseline * 1000:9.1f} ms")
+    for workers in [int(w) for w in args.workers.split(',')]:
+        result, elapsed = timed(lambda: parallel_sweep(full_df, intervals, workers))
+        pd.testing.assert_frame_equal(result, reference, check_dtype=False)
+        print(f"{workers:2d} workers:  {elapsed * 1000:9.1f} ms  x{baseline / elapsed:.2f}  (identical results)")
+
+
+if __name__ == "__main__":
+    main()
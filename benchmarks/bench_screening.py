@@ -0,0 +1,95 @@
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from interval_kernels import STAT_COLS, summarise_interval_stats  # noqa: E402
+from results_query import ResultsIndex  # noqa: E402
+from universe import LISTINGS_FOLDER, UNIVERSE_CACHE_PATH, latest_listing, load_universe  # noqa: E402
+
+# --- Screening Benchmark ---
+# Times the ResultsIndex queries over synthetic interval results for every
+# NSE-listed symbol in data/equity_listings, and checks each query against
+# the same filter and sort written directly in pandas.
+
+
+def synthetic_stats(symbols, years, seed=0):
+    """
+    Returns random per-(Company, Year) STAT_COLS rows for the symbols.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(symbols) * years
+    stats_df = pd.DataFrame({
+        'Company': np.repeat(symbols, years),
+        'Year': np.tile(np.arange(2026 - years, 2026), len(symbols)),
+    })
+    for col in STAT_COLS:
+        stats_df[col] = rng.normal(1, 5, n) if col != 'Days' else 10
+    # Some years have no result, so companies differ in their number of years.
+    stats_df.loc[rng.random(n) < 0.1, 'Pct_Change'] = np.nan
+    return stats_df
+
+
+def timed(fn, repeat=20):
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark for the interval results screening index.")
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    # The listings are found relative to the repository, wherever the benchmark is run from.
+    folder = os.path.join(ROOT, LISTINGS_FOLDER)
+    universe = load_universe(latest_listing('NSE', folder), latest_listing('BSE', folder),
+                             os.path.join(ROOT, UNIVERSE_CACHE_PATH))
+    symbols = [f"{listing.nse_symbol}.NS" for listing in universe.listings if listing.nse_symbol]
+    stats_df = synthetic_stats(symbols, args.years)
+    summary = summarise_interval_stats(stats_df).rename(columns={'Company': 'Symbol'})
+    # Rounded, so the rankings have ties.
+    summary['Win_Rate'] = summary['Win_Rate'].round(-1)
+    index, build = timed(lambda: ResultsIndex(summary, universe=universe), repeat=3)
+    frame = index.frame
+    print(f"{len(index):,} symbols x {args.years} years; index built in {build * 1000:.1f} ms")
+
+    queries = {
+        'top 20 by Avg_Pct_Change': (
+            dict(top=20),
+            frame[frame['Avg_Pct_Change'].notna()].sort_values('Avg_Pct_Change', ascending=False, kind='stable'),
+        ),
+        'win rate >= 80%, >= 8 years': (
+            dict(top=50, min_win_rate=80, min_years=8),
+            frame[(frame['Win_Rate'] >= 80) & (frame['Years'] >= 8)].sort_values(
+                'Avg_Pct_Change', ascending=False, kind='stable'),
+        ),
+        'top 50 by Win_Rate (ties)': (
+            dict(top=50, sort='Win_Rate'),
+            frame[frame['Win_Rate'].notna()].sort_values('Win_Rate', ascending=False, kind='stable'),
+        ),
+        'EQ series, lowest volatility': (
+            dict(top=20, sort='Avg_Volatility_Pct', ascending=True, series=['EQ'],
+                 ranges={'Avg_Pct_Change': (0, None)}),
+            frame[(frame['NSE_Series'] == 'EQ') & (frame['Avg_Pct_Change'] >= 0)].sort_values(
+                'Avg_Volatility_Pct', kind='stable'),
+        ),
+    }
+    for label, (options, expected) in queries.items():
+        result, elapsed = timed(lambda: index.screen(**options))
+        expected = expected.head(options['top'])
+        # Ties are ranked in row order, like a stable pandas sort in either direction.
+        assert list(result['Symbol']) == list(expected['Symbol']), label
+        print(f"{label:32s} {elapsed * 1000:7.3f} ms  ({len(result)} rows, matches pandas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# --- Startup Budget Check ---
+# Runs the lightweight CLI paths (help and argument validation) under
+# `python -X importtime` and fails with an AssertionError (exit status 1) if one
+# of them imports a heavy dependency or if their imports or wall time exceed the
+# budget. run_benchmarks.py runs it before every benchmark, and it can run on
+# its own in CI or before a commit.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the CLI must not import before it starts fetching or analysing.
+HEAVY_MODULES = ['pandas', 'numpy', 'yfinance', 'curl_cffi', 'pyarrow', 'openpyxl']
+
+CASES = [
+    ('help', ['OHLC_Extractor_v2.py', '--help']),
+    ('batch help', ['batch_runner.py', '--help']),
+    ('invalid years', ['OHLC_Extractor_v2.py', '--years', '0']),
+    ('invalid interval', ['OHLC_Extractor_v2.py', '--interval', '13-01,10-15']),
+]
+
+
+def parse_importtime(stderr):
+    """
+    Parses `-X importtime` output into {module: cumulative microseconds} for
+    the top-level imports and the set of every imported module.
+    """
+    top_level, imported = {}, set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imported.add(name.strip())
+        if not name.startswith('  '):
+            top_level[name.strip()] = int(cumulative)
+    return top_level, imported
+
+
+def run_case(argv):
+    """
+    Runs one CLI invocation and returns (wall seconds, application import ms, imported modules).
+    Interpreter startup (the 'site' import) is not counted as application imports.
+    """
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', *argv], cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    top_level, imported = parse_importtime(proc.stderr)
+    app_ms = sum(us for name, us in top_level.items() if name not in ('site', 'encodings')) / 1000
+    return wall, app_ms, imported
+
+
+def check_startup(import_budget_ms=100, wall_budget_ms=500, repeat=5):
+    """
+    Runs every case `repeat` times and asserts that none of them imports a heavy
+    dependency or exceeds the budgets (compared on the median run).
+    """
+    failures = []
+    for label, argv in CASES:
+        run_case(argv)  # warm the bytecode cache
+        runs = [run_case(argv) for _ in range(repeat)]
+        wall_ms = statistics.median(r[0] for r in runs) * 1000
+        app_ms = statistics.median(r[1] for r in runs)
+        heavy = sorted({name.split('.')[0] for name in runs[0][2]} & set(HEAVY_MODULES))
+
+        problems = []
+        if heavy:
+            problems.append(f"imports {', '.join(heavy)}")
+        if app_ms > import_budget_ms:
+            problems.append(f"imports take {app_ms:.0f} ms > {import_budget_ms:.0f} ms")
+        if wall_ms > wall_budget_ms:
+            problems.append(f"wall time {wall_ms:.0f} ms > {wall_budget_ms:.0f} ms")
+        if problems:
+            failures.append(f"{label}: {'; '.join(problems)}")
+        status = "FAIL: " + "; ".join(problems) if problems else "ok"
+        print(f"{label:<18} wall {wall_ms:6.0f} ms | imports {app_ms:6.1f} ms | {status}")
+
+    assert not failures, "Startup budget exceeded:\n  " + "\n  ".join(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the CLI starts within its startup budget.")
+    parser.add_argument("--import-budget-ms", type=float, default=100,
+                        help="Maximum time spent importing application modules (default: 100 ms).")
+    parser.add_argument("--wall-budget-ms", type=float, default=500,
+                        help="Maximum median wall time of a whole invocation (default: 500 ms).")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the median is compared.")
+    args = parser.parse_args()
+    check_startup(args.import_budget_ms, args.wall_budget_ms, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
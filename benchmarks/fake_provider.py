@@ -0,0 +1,60 @@
+import random
+import threading
+import time
+
+from synthetic import synthetic_history
+
+# --- Fake yfinance Provider ---
+# Offline stand-in for yf.Ticker(...).history(...). Returns deterministic
+# synthetic bars after a configurable latency, and fails or returns no data
+# at configurable rates, so the fetch engine can be measured without Yahoo.
+
+
+class FakeRateLimitError(Exception):
+    pass
+
+
+class FakeProvider:
+    """
+    Factory for FakeTicker objects sharing one latency and failure profile.
+    Pass `provider.Ticker` wherever yf.Ticker is expected.
+    """
+
+    def __init__(self, latency=0.05, jitter=0.0, failure_rate=0.0, empty_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.empty_rate = empty_rate
+        self.calls = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def Ticker(self, symbol, session=None):
+        return FakeTicker(self, symbol)
+
+    def _roll(self):
+        with self._lock:
+            self.calls += 1
+            return self._rng.random(), self._rng.uniform(-self.jitter, self.jitter)
+
+
+class FakeTicker:
+    """
+    Mirrors the part of yf.Ticker used by fetch_stock_data_yfinance.
+    """
+
+    def __init__(self, provider, symbol):
+        self.provider = provider
+        self.ticker = symbol
+
+    def history(self, start=None, end=None, auto_adjust=True, **kwargs):
+        roll, jitter = self.provider._roll()
+        time.sleep(max(0.0, self.provider.latency + jitter))
+        if roll < self.provider.failure_rate:
+            with self.provider._lock:
+                self.provider.failures += 1
+            raise FakeRateLimitError("Too Many Requests. Rate limited. Try after a while.")
+        if roll < self.provider.failure_rate + self.provider.empty_rate:
+            return synthetic_history(self.ticker, start, start)
+        return synthetic_history(self.ticker, start, end)
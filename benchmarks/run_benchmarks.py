@@ -0,0 +1,166 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fetch_engine import iter_fetch  # noqa: E402
+from interval_kernels import interval_stats, summarise_interval_changes  # noqa: E402
+from OHLC_Extractor_v2 import build_full_df, fetch_stock_data_yfinance, save_analysis, save_data  # noqa: E402
+from check_startup import check_startup  # noqa: E402
+from fake_provider import FakeProvider  # noqa: E402
+
+# --- Offline Benchmark Suite ---
+# Measures fetch throughput, analysis time, save time and peak memory against
+# the fake provider, at several universe sizes, and stores the results as JSON
+# so later runs can be compared for regressions. Peak memory is the process
+# high-water mark; --trace-memory adds per-stage tracemalloc peaks, which are
+# more precise but make every stage several times slower.
+
+RESULTS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+TIMED_METRICS = ['fetch_s', 'build_s', 'analysis_s', 'save_s']
+
+
+@contextlib.contextmanager
+def stage(metrics, name, trace_memory=False):
+    """
+    Times a stage (quietly) and records its wall time, plus its peak traced
+    memory when `trace_memory` is set.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        metrics[f"{name}_s"] = round(time.perf_counter() - started, 4)
+        if trace_memory:
+            metrics[f"{name}_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 ** 2, 2)
+            tracemalloc.stop()
+
+
+def peak_rss_mb():
+    """
+    Returns the process's peak resident set size in MB (ru_maxrss is KB on Linux, bytes on macOS).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 ** 2 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_size(size, args):
+    tickers = {f"Company {i:05d}": f"SYM{i:05d}.NS" for i in range(size)}
+    provider = FakeProvider(latency=args.latency, jitter=args.latency / 2, failure_rate=args.failure_rate,
+                            empty_rate=args.empty_rate, seed=size)
+    current_year = args.end_year
+    start, end = datetime(current_year - args.years, 1, 1), datetime(current_year, 1, 1)
+    fetch_fn = partial(fetch_stock_data_yfinance, start_date=start, end_date=end, raise_errors=True,
+                       ticker_factory=provider.Ticker)
+    metrics = {'tickers': size}
+    output_folder = tempfile.mkdtemp(prefix="ohlc_bench_")
+
+    try:
+        with stage(metrics, 'fetch'):
+            results = list(iter_fetch(tickers, fetch_fn, max_workers=args.workers, rate=args.rate,
+                                      retries=args.retries, backoff=0.01))
+        metrics['fetch_tickers_per_s'] = round(size / metrics['fetch_s'], 1)
+        metrics['requests'] = provider.calls
+        metrics['injected_failures'] = provider.failures
+        metrics['failed_tickers'] = sum(1 for r in results if r.error)
+
+        with stage(metrics, 'build', args.trace_memory):
+            full_df = build_full_df(results, tickers, current_year)
+        del results
+        metrics['rows'] = len(full_df)
+
+        with stage(metrics, 'analysis', args.trace_memory):
+            stats_df = interval_stats(full_df, args.interval)
+            pivot_df, agg_results = summarise_interval_changes(stats_df)
+
+        with stage(metrics, 'save', args.trace_memory):
+            save_data(full_df, "bench", 'n', output_folder, args.formats)
+            save_analysis(pivot_df, agg_results, "bench", output_folder, stats_df=stats_df)
+    finally:
+        shutil.rmtree(output_folder, ignore_errors=True)
+    metrics['peak_rss_mb'] = peak_rss_mb()
+    return metrics
+
+
+def compare(results, baseline_path, tolerance):
+    """
+    Prints the timings that regressed by more than `tolerance` against a saved run.
+    Returns True if any did.
+    """
+    with open(baseline_path) as f:
+        baseline = {str(m['tickers']): m for m in json.load(f)['results']}
+    regressed = False
+    for metrics in results:
+        base = baseline.get(str(metrics['tickers']))
+        if not base:
+            continue
+        for key in TIMED_METRICS:
+            if base.get(key) and metrics[key] > base[key] * (1 + tolerance):
+                regressed = True
+                print(f"REGRESSION {metrics['tickers']} tickers, {key}: {base[key]:.3f}s -> {metrics[key]:.3f}s")
+    if not regressed:
+        print(f"No regressions against {baseline_path}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the OHLC extractor.")
+    parser.add_argument("--sizes", default="12,500,7000", help="Comma-separated universe sizes.")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--end-year", type=int, default=datetime.now().year)
+    parser.add_argument("--interval", default="10-01,10-15")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake request latency in seconds.")
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--empty-rate", type=float, default=0.01)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=0, help="Requests/sec limit (0 = unlimited).")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--formats", default="csv", help="Output formats to time, e.g. csv,parquet.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Record per-stage tracemalloc peaks (slow).")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs. the baseline.")
+    parser.add_argument("--skip-startup-check", action="store_true",
+                        help="Do not enforce the CLI startup budget (benchmarks/check_startup.py) first.")
+    args = parser.parse_args()
+    args.interval = tuple(args.interval.split(','))
+    args.formats = args.formats.split(',')
+
+    if not args.skip_startup_check:
+        check_startup()
+
+    results = []
+    for size in [int(s) for s in args.sizes.split(',')]:
+        metrics = run_size(size, args)
+        results.append(metrics)
+        print(f"{size:>6} tickers | fetch {metrics['fetch_s']:7.2f}s ({metrics['fetch_tickers_per_s']:7.1f}/s) | "
+              f"build {metrics['build_s']:6.2f}s | analysis {metrics['analysis_s']:6.2f}s | "
+              f"save {metrics['save_s']:6.2f}s | peak RSS {metrics['peak_rss_mb']:8.1f} MB")
+
+    os.makedirs(RESULTS_FOLDER, exist_ok=True)
+    results_path = os.path.join(RESULTS_FOLDER, f"bench_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json")
+    settings = {k: v for k, v in vars(args).items() if k != 'baseline'}
+    with open(results_path, 'w') as f:
+        json.dump({'settings': settings, 'results': results}, f, indent=2)
+    print(f"Saved results to {results_path}")
+
+    if args.baseline and compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
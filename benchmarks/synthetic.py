@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# --- Synthetic OHLCV Data ---
+# Deterministic stand-in data for benchmarks, shaped like the long per-company
+# frame that main() builds from yfinance history. Every symbol's price path
+# starts at a fixed epoch, so a given (symbol, date) always has the same bar no
+# matter which date range is requested.
+
+EPOCH = "2000-01-03"
+
+
+def _business_days(end):
+    days = np.arange(np.datetime64(EPOCH), np.datetime64(end.date()), dtype='datetime64[D]')
+    return days[np.is_busday(days)]
+
+
+def _seed(symbol):
+    return sum(symbol.encode()) * 7919 + len(symbol)
+
+
+def synthetic_history(symbol, start_date, end_date, tz="Asia/Kolkata"):
+    """
+    Returns a yfinance-like history frame (Date index, OHLCV columns) for one
+    symbol over [start_date, end_date).
+    """
+    end = pd.Timestamp(end_date).tz_localize(None) if pd.Timestamp(end_date).tzinfo else pd.Timestamp(end_date)
+    dates = pd.DatetimeIndex(_business_days(end).astype('datetime64[ns]'), name='Date')
+    n = len(dates)
+    # One random stream per field, so the first n draws do not depend on n.
+    streams = [np.random.default_rng([_seed(symbol), field]) for field in range(5)]
+
+    close = 100 * np.exp(np.cumsum(streams[0].normal(0, 0.02, n)))
+    open_ = close * np.exp(streams[1].normal(0, 0.01, n))
+    high = np.maximum(open_, close) * (1 + streams[2].uniform(0, 0.02, n))
+    low = np.minimum(open_, close) * (1 - streams[3].uniform(0, 0.02, n))
+    volume = streams[4].integers(1_000, 1_000_000, n)
+
+    data = pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=dates)
+    start = pd.Timestamp(start_date)
+    data = data[data.index >= (start.tz_localize(None) if start.tzinfo else start)]
+    data.index = data.index.tz_localize(tz)
+    return data
+
+
+def synthetic_universe(companies, years, end_year=2026):
+    """
+    Returns the long frame main() analyses: one row per company and trading day,
+    with Company and Year columns, sorted by Company and Date.
+    """
+    frames = []
+    for i in range(companies):
+        company = f"Company {i:05d}"
+        data = synthetic_history(company, f"{end_year - years}-01-01", f"{end_year}-01-01").reset_index()
+        data['Company'] = company
+        data['Year'] = data['Date'].dt.year
+        frames.append(data)
+    full_df = pd.concat(frames, ignore_index=True)
+    full_df.sort_values(by=['Company', 'Date'], inplace=True)
+    return full_df
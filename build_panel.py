@@ -0,0 +1,77 @@
+import argparse
+from datetime import datetime
+
+from OHLC_Extractor_v2 import (
+    add_download_options, add_fetch_options, add_selection_options, fetch_results, open_cache, select_tickers,
+)
+from panel_store import DEFAULT_PANEL_PATH, PanelWriter
+from run_metrics import RunMetrics
+from universe import load_universe
+
+# --- Panel Builder ---
+# Fetches the daily history of the selected tickers (through the cache, like
+# any other run) and writes it into a memory-mapped panel folder (see
+# panel_store.py), one ticker at a time straight from the fetch stream.
+# Research code then opens the whole universe instantly:
+#
+#     python build_panel.py data/panel --universe nse --years 10
+#
+#     from panel_store import Panel
+#     from interval_kernels import interval_stats
+#     stats_df = interval_stats(Panel('data/panel'), ('10-01', '10-15'))
+
+
+def build_panel(path, tickers, years, args):
+    """
+    Writes the last `years` complete years of the tickers into a panel at `path`.
+    Symbols are keyed by their Yahoo ticker; the company name and, for universe
+    runs, the ISIN go into the panel index.
+    """
+    current_year = datetime.now().year
+    start_date_dt = datetime(current_year - years, 1, 1)
+    end_date_dt = datetime(current_year, 1, 1)
+    print(f"\nBuilding panel '{path}' for {len(tickers)} tickers")
+    print(f" - Data Period: {start_date_dt.strftime('%Y-%m-%d')} to {end_date_dt.strftime('%Y-%m-%d')}")
+    print("-" * 20)
+
+    universe = load_universe() if args.universe else None
+    cache = open_cache(args)
+    metrics = RunMetrics()
+    missing = []
+    with PanelWriter(path) as writer:
+        for result in metrics.track_fetches(fetch_results(tickers, start_date_dt, end_date_dt, args, cache)):
+            if result.data is None:
+                missing.append(result.company)
+                continue
+            listing = universe.lookup(result.ticker) if universe is not None else None
+            writer.add(result.ticker, result.data, company=result.company, isin=listing.isin if listing else None)
+
+    print(f"\nWrote {writer.rows:,} daily bars of {len(writer.symbols)} symbols to '{path}'.")
+    if missing:
+        more = ' ...' if len(missing) > 10 else ''
+        print(f" - No data for {len(missing)} companies: {', '.join(missing[:10])}{more}")
+    return writer
+
+
+def main(argv=None):
+    """
+    Builds a panel. Accepts the same ticker selection, fetch and download options as OHLC_Extractor_v2.py.
+    """
+    parser = argparse.ArgumentParser(
+        description="Fetch a universe once and store it as a memory-mapped columnar panel.")
+    add_fetch_options(parser)
+    add_download_options(parser)
+    add_selection_options(parser)
+    parser.add_argument("panel", nargs='?', default=DEFAULT_PANEL_PATH,
+                        help=f"Panel folder to (re)write (default: {DEFAULT_PANEL_PATH}).")
+    parser.add_argument("--years", type=int, default=10, help="Number of complete past years to store (default: 10).")
+    args = parser.parse_args(argv)
+    if args.years <= 0:
+        parser.error("--years must be a positive number.")
+    if args.adjust == 'local' and args.no_cache:
+        parser.error("--adjust local keeps unadjusted prices in the cache and cannot be used with --no-cache.")
+    build_panel(args.panel, select_tickers(args), args.years, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import json
+import os
+import shutil
+
+from fetch_engine import FetchResult
+from lazy_imports import lazy_import
+from output_engines import safe_name
+
+pd = lazy_import('pandas')
+
+# --- Checkpoint Journal ---
+# Makes a run resumable. The run settings are saved to run.json, each ticker's
+# outcome is appended to checkpoint.jsonl as soon as it is fetched, and its data
+# is pickled into checkpoint/. Data served by the local OHLC cache is not copied:
+# its entry only points back to the cache. `--resume <run_dir>` reads these back,
+# so only the tickers that are missing or failed are fetched again (and cached
+# ones re-read from the cache). A finished run deletes its checkpoint data and
+# keeps the journal as a record.
+
+SETTINGS_FILE = "run.json"
+JOURNAL_FILE = "checkpoint.jsonl"
+DATA_FOLDER = "checkpoint"
+
+
+class CheckpointJournal:
+    """
+    Per-ticker checkpoint journal kept in a run folder.
+    """
+
+    def __init__(self, run_dir):
+        self.run_dir = run_dir
+        self.settings_path = os.path.join(run_dir, SETTINGS_FILE)
+        self.journal_path = os.path.join(run_dir, JOURNAL_FILE)
+        self.data_folder = os.path.join(run_dir, DATA_FOLDER)
+
+    # --- Run settings ---
+
+    def save_settings(self, **settings):
+        with open(self.settings_path, 'w') as f:
+            json.dump({**settings, 'finished': False}, f, indent=2)
+
+    def load_settings(self):
+        """
+        Returns the saved settings of the run, raising ValueError if the folder
+        is not a resumable run.
+        """
+        if not os.path.exists(self.settings_path):
+            raise ValueError(f"'{self.run_dir}' has no {SETTINGS_FILE}; it was not started with checkpointing.")
+        with open(self.settings_path) as f:
+            settings = json.load(f)
+        if settings.get('finished'):
+            raise ValueError(f"The run in '{self.run_dir}' already finished; there is nothing to resume.")
+        return settings
+
+    # --- Ticker entries ---
+
+    def entries(self):
+        """
+        Returns the latest journal entry of every company. A line cut short by
+        a crash is ignored.
+        """
+        entries = {}
+        if not os.path.exists(self.journal_path):
+            return entries
+        with open(self.journal_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry['company']] = entry
+        return entries
+
+    def completed(self):
+        """
+        Returns the entries that need no refetch: tickers fetched successfully
+        (with their data file present) and tickers that returned no data.
+        Cached tickers are left out, to be read from the cache again.
+        """
+        done = {}
+        for company, entry in self.entries().items():
+            if entry['status'] == 'ok' and os.path.exists(os.path.join(self.run_dir, entry['file'])):
+                done[company] = entry
+            elif entry['status'] == 'empty':
+                done[company] = entry
+        return done
+
+    def replay(self, entries):
+        """
+        Yields a FetchResult for every completed entry, loading saved data from disk.
+        """
+        for company, entry in entries.items():
+            data = pd.read_pickle(os.path.join(self.run_dir, entry['file'])) if entry['file'] else None
+            yield FetchResult(company, entry['ticker'], data, 0, 0.0, None, 'journal')
+
+    def record(self, results):
+        """
+        Passes FetchResults through, first saving each one's data (unless it
+        came from the cache) and appending its outcome to the journal.
+        """
+        os.makedirs(self.data_folder, exist_ok=True)
+        with open(self.journal_path, 'a') as journal:
+            for result in results:
+                file = None
+                if result.data is not None and result.source != 'cache':
+                    file = os.path.join(DATA_FOLDER, f"{safe_name(result.company)}_{safe_name(result.ticker)}.pkl")
+                    result.data.to_pickle(os.path.join(self.run_dir, file))
+                if result.error:
+                    status = 'error'
+                elif result.data is None:
+                    status = 'empty'
+                else:
+                    status = 'cached' if file is None else 'ok'
+                journal.write(json.dumps({
+                    'company': result.company, 'ticker': result.ticker, 'status': status, 'file': file,
+                    'attempts': result.attempts, 'error': result.error,
+                }) + "\n")
+                journal.flush()
+                yield result
+
+    def finish(self):
+        """
+        Marks the run as finished and deletes the checkpointed data.
+        """
+        with open(self.settings_path) as f:
+            settings = json.load(f)
+        settings['finished'] = True
+        with open(self.settings_path, 'w') as f:
+            json.dump(settings, f, indent=2)
+        shutil.rmtree(self.data_folder, ignore_errors=True)
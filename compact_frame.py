@@ -0,0 +1,53 @@
+from interval_kernels import month_day_key
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+# --- Compact OHLC Frame ---
+# Memory-lean layout for the long per-company frame: categorical company codes,
+# int16 year and month-day key (MM * 100 + DD), and optionally float32 prices.
+# The month-day key replaces the '%m-%d' string column, which used to be the
+# most expensive column in the frame.
+
+PRICE_COLS = ['Open', 'High', 'Low', 'Close']
+COMPACT_COLS = ['Date', 'Company', 'Year', 'MonthDay', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def company_dtype(companies):
+    """
+    Returns one categorical dtype for all companies of a run, so per-ticker
+    frames keep their categorical Company column when concatenated.
+    """
+    return pd.CategoricalDtype(sorted(companies))
+
+
+def compact_ohlc(df, companies_dtype=None, price_dtype='float64'):
+    """
+    Returns the frame in the compact layout. Columns that the analysis and
+    output never use (e.g. Dividends, Stock Splits) are dropped.
+    float64 prices keep the CSV output byte-identical; float32 halves the price
+    columns but may change the last rounded digit of a few prices.
+    """
+    compact = df.reindex(columns=[c for c in COMPACT_COLS if c in df.columns or c == 'MonthDay'])
+    compact['Company'] = compact['Company'].astype(companies_dtype or 'category')
+    compact['Year'] = compact['Date'].dt.year.astype('int16')
+    compact['MonthDay'] = month_day_key(compact['Date']).astype('int16')
+    compact[PRICE_COLS] = compact[PRICE_COLS].astype(price_dtype)
+    return compact
+
+
+def memory_usage_mb(df):
+    """
+    Returns the deep memory usage of a DataFrame in megabytes.
+    """
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def memory_report(before, after, label="OHLC frame"):
+    """
+    Prints and returns the memory of a frame before and after compaction.
+    """
+    before_mb, after_mb = memory_usage_mb(before), memory_usage_mb(after)
+    ratio = before_mb / after_mb if after_mb else float('inf')
+    print(f"{label}: {before_mb:,.1f} MB -> {after_mb:,.1f} MB ({ratio:.1f}x smaller)")
+    return {'before_mb': before_mb, 'after_mb': after_mb, 'ratio': ratio}
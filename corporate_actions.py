@@ -0,0 +1,124 @@
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- Corporate Actions ---
+# Local price adjustment. The cache stores unadjusted bars plus the dividends and
+# splits series, and adjusted prices are derived on read with cumulative factors:
+#
+#     adjusted = raw / S(t) * D(t),   adjusted volume = raw volume * S(t)
+#
+# where S(t) is the product of the split ratios after day t and D(t) is the
+# product of (1 - dividend / previous close) over the dividend ex-dates after t,
+# the same method Yahoo uses for its adjusted close. A new dividend or split
+# then only adds a row to the actions series instead of invalidating every
+# stored bar.
+#
+# Yahoo's "unadjusted" history (auto_adjust=False) is still split-adjusted, and
+# so are its dividends, so unsplit() first turns a response into truly raw
+# values using every split known at fetch time.
+
+# Bump when the adjustment method changes, so results derived from adjusted prices are recomputed.
+ADJUSTMENT_VERSION = 1
+
+ACTION_COLS = ['Date', 'Dividends', 'Stock Splits']
+PRICE_COLS = ['Open', 'High', 'Low', 'Close']
+
+
+def extract_actions(data):
+    """
+    Returns the non-zero dividend and split rows of a history frame fetched
+    with actions=True, as a Date/Dividends/Stock Splits frame.
+    """
+    if data is None or data.empty:
+        return pd.DataFrame({'Date': pd.Series(dtype='datetime64[ns]'), 'Dividends': pd.Series(dtype='float64'),
+                             'Stock Splits': pd.Series(dtype='float64')})
+    actions = data.reindex(columns=ACTION_COLS).copy()
+    actions['Date'] = pd.to_datetime(_day_values(actions['Date']))
+    actions[['Dividends', 'Stock Splits']] = actions[['Dividends', 'Stock Splits']].fillna(0.0)
+    has_action = (actions['Dividends'] != 0) | (actions['Stock Splits'] != 0)
+    return actions[has_action].reset_index(drop=True)
+
+
+def _suffix_factor(event_dates, event_factors, dates):
+    """
+    For every day in `dates`, returns the product of the event factors dated strictly after it.
+    """
+    order = np.argsort(event_dates, kind='stable')
+    event_dates, event_factors = event_dates[order], event_factors[order]
+    # suffix[i] = prod(event_factors[i:]), with suffix[len] = 1.
+    suffix = np.append(np.cumprod(event_factors[::-1])[::-1], 1.0)
+    return suffix[np.searchsorted(event_dates, dates, side='right')]
+
+
+def _day_values(values):
+    """
+    Returns tz-naive datetime64[D] values for a Series of (possibly tz-aware) timestamps.
+    """
+    values = pd.to_datetime(values)
+    if values.dt.tz is not None:
+        values = values.dt.tz_localize(None)
+    return values.values.astype('datetime64[D]')
+
+
+def split_factors(dates, actions):
+    """
+    Returns S(t), the product of the split ratios after each date.
+    """
+    splits = actions[actions['Stock Splits'] > 0]
+    if splits.empty:
+        return np.ones(len(dates))
+    return _suffix_factor(_day_values(splits['Date']), splits['Stock Splits'].to_numpy(dtype='float64'),
+                          _day_values(dates))
+
+
+def unsplit(data, actions):
+    """
+    Converts a split-adjusted Yahoo history frame into raw prices, volumes and
+    dividends, given every split known for the symbol (`actions`).
+    """
+    data = data.copy()
+    factor = split_factors(data['Date'], actions)
+    data[PRICE_COLS] = data[PRICE_COLS].mul(factor, axis=0)
+    data['Volume'] = (data['Volume'] / factor).round()
+    if 'Dividends' in data.columns:
+        data['Dividends'] = data['Dividends'] * factor
+    return data
+
+
+def adjust_prices(raw, actions):
+    """
+    Returns a copy of `raw` (Date and OHLCV, sorted by Date, reaching at least
+    to the last action of interest) with split- and dividend-adjusted prices
+    and split-adjusted volume, matching yfinance's auto_adjust=True output.
+    `actions` holds raw dividends and split ratios.
+    """
+    adjusted = raw.copy()
+    if actions is None or actions.empty or raw.empty:
+        return adjusted
+
+    days = _day_values(raw['Date'])
+    split = split_factors(raw['Date'], actions)
+
+    dividends = actions[actions['Dividends'] > 0]
+    dividend = np.ones(len(raw))
+    if not dividends.empty:
+        ex_days = _day_values(dividends['Date'])
+        # The multiplier of an ex-date uses the close of the previous trading day; ex-dates
+        # at or before the first bar cannot affect any bar in the frame.
+        pos = np.searchsorted(days, ex_days, side='left')
+        usable = pos > 0
+        ex_days, pos = ex_days[usable], pos[usable]
+        amounts = dividends['Dividends'].to_numpy(dtype='float64')[usable]
+        # On a day that is also a split ex-date the previous close is on the pre-split basis.
+        same_day_split = split_factors(pd.Series(ex_days - 1), actions) / split_factors(pd.Series(ex_days), actions)
+        prev_close = raw['Close'].to_numpy(dtype='float64')[pos - 1] / same_day_split
+        multipliers = np.where(prev_close > 0, 1.0 - amounts / prev_close, 1.0)
+        dividend = _suffix_factor(ex_days, multipliers, days)
+
+    adjusted[PRICE_COLS] = raw[PRICE_COLS].mul(dividend / split, axis=0)
+    adjusted['Volume'] = (raw['Volume'] * split).round()
+    if not adjusted['Volume'].isna().any():
+        adjusted['Volume'] = adjusted['Volume'].astype('int64')
+    return adjusted
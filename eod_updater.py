@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from functools import partial
+from zoneinfo import ZoneInfo
+
+from analysis_store import DEFAULT_RESULTS_STORE_PATH
+from fetch_engine import split_fallbacks
+from interval_kernels import interval_stats, parse_month_day
+from lazy_imports import lazy_import
+from OHLC_Extractor_v2 import (
+    add_analysis_options, add_download_options, add_fetch_options, add_selection_options, build_full_df,
+    fetch_results, open_cache, open_results_store, parse_intervals, select_tickers,
+)
+from parallel_analysis import parallel_interval_stats
+from run_metrics import RunMetrics
+
+pd = lazy_import('pandas')
+
+# --- End-of-Day Updater ---
+# Keeps the local OHLC cache and the interval results store current without
+# re-running a full report. Every update fetches only the bars since each
+# ticker's last cached day (in bulk batches, grouped by their common gap),
+# then recomputes the stored interval results of just the (symbol, year,
+# interval)s whose window received a new bar; everything else is untouched.
+# The cache holds unadjusted prices (--adjust local): Yahoo's adjusted bars
+# change after every dividend or split, so appending to them would mix two
+# adjustment bases. A new dividend or split re-adjusts every earlier bar
+# locally, so every stored year of that symbol is refreshed.
+#
+#     python eod_updater.py --intervals "10-01,10-15;01-01,01-31"            # once, e.g. from cron
+#     python eod_updater.py --intervals "10-01,10-15" --daemon --at 16:15    # every weekday after close
+#
+# Tickers without any cached bars are bootstrapped with --years of history on
+# their first update. Each update appends a summary line to data/eod_updates.jsonl.
+
+EXCHANGE_TZ = ZoneInfo("Asia/Kolkata")
+DEFAULT_UPDATE_TIME = "16:15"  # NSE and BSE close at 15:30 IST
+UPDATE_LOG_PATH = os.path.join("data", "eod_updates.jsonl")
+
+
+def next_update(at, now=None):
+    """
+    Returns the next weekday datetime (exchange time) at the 'HH:MM' `at`.
+    """
+    now = now or datetime.now(EXCHANGE_TZ)
+    hour, minute = (int(part) for part in at.split(':'))
+    run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    while run_at.weekday() >= 5:
+        run_at += timedelta(days=1)
+    return run_at
+
+
+def affected(new_dates, intervals):
+    """
+    Returns {interval: set of (company, year)} whose window contains at least one new bar.
+    `new_dates` maps each company to the dates of its new bars.
+    """
+    hits = {}
+    for interval in intervals:
+        lo, hi = parse_month_day(interval[0]), parse_month_day(interval[1])
+        hits[interval] = {(company, day.year) for company, days in new_dates.items() for day in days
+                          if lo <= day.month * 100 + day.day <= hi}
+    return hits
+
+
+def new_action(cache, ticker, since):
+    """
+    True when a dividend or split after the day `since` is cached for the ticker.
+    """
+    actions = cache.load_actions(ticker)
+    return bool((actions['Date'].dt.date > since).any())
+
+
+def stored_years(store, companies, tickers, intervals):
+    """
+    Returns {interval: set of (company, year)} of every result stored for the companies.
+    """
+    primary, _ = split_fallbacks({company: tickers[company] for company in companies})
+    by_symbol = {symbol: company for company, symbol in primary.items()}
+    years = {}
+    for interval in intervals:
+        stored = store.load(list(by_symbol), interval)
+        years[interval] = {(by_symbol[symbol], int(year)) for symbol, year in zip(stored['Symbol'], stored['Year'])}
+    return years
+
+
+def bar_days(data):
+    """
+    Returns the exchange-local calendar days of a fetched frame.
+    """
+    return pd.to_datetime(data['Date']).dt.date
+
+
+def run_update(tickers, intervals, years, args, cache, store, log_path=UPDATE_LOG_PATH):
+    """
+    Runs one update over {company: ticker or (ticker, fallback)} and returns its summary dictionary.
+    """
+    started = time.perf_counter()
+    metrics = RunMetrics()
+    today = datetime.now(EXCHANGE_TZ).date()
+    # Today's bar is fetched too; the cache never marks today as covered, so it is refreshed on the next update.
+    end_date_dt = datetime.combine(today + timedelta(days=1), datetime.min.time())
+    primary, fallbacks = split_fallbacks(tickers)
+    before = cache.last_dates(list(primary.values()) + list(fallbacks.values()))
+    last_day = {company: before.get(primary[company]) or before.get(fallbacks.get(company)) for company in tickers}
+
+    # Tickers are updated in groups sharing their last cached day, and only read back from that day on.
+    # Tickers without cached bars are bootstrapped with `years` of history.
+    groups = {}
+    for company, day in last_day.items():
+        groups.setdefault(day or date(today.year - years, 1, 1), {})[company] = tickers[company]
+    new_dates = {}
+    repriced = set()
+    for start, subset in sorted(groups.items()):
+        start_dt = datetime.combine(start, datetime.min.time())
+        for result in metrics.track_fetches(fetch_results(subset, start_dt, end_date_dt, args, cache)):
+            if result.data is None:
+                continue
+            days = bar_days(result.data)
+            last = last_day[result.company]
+            fresh = sorted(set(days[days > last] if last is not None else days))
+            if fresh:
+                new_dates[result.company] = fresh
+                if last is not None and new_action(cache, result.ticker, last):
+                    repriced.add(result.company)
+
+    recomputed = 0
+    if store is not None and intervals and new_dates:
+        with metrics.stage('analysis'):
+            hits = affected(new_dates, intervals)
+            # A new dividend or split changes the adjusted prices of every earlier year.
+            for interval, years in stored_years(store, repriced, tickers, intervals).items():
+                hits[interval] |= years
+            recomputed = recompute(hits, tickers, today, args, cache, store)
+
+    summary = {
+        'date': today.isoformat(),
+        'finished_at': datetime.now().isoformat(timespec='seconds'),
+        'symbols': len(tickers),
+        'updated': len(new_dates),
+        'bootstrapped': sum(last_day[company] is None for company in new_dates),
+        'new_bars': sum(len(days) for days in new_dates.values()),
+        'corporate_actions': len(repriced),
+        'results_recomputed': recomputed,
+        'errors': metrics.fetch_summary()['errors'],
+        'elapsed_s': round(time.perf_counter() - started, 3),
+    }
+    print(f"\nUpdated {summary['updated']} of {summary['symbols']} symbols ({summary['new_bars']} new bars, "
+          f"{summary['bootstrapped']} bootstrapped, {len(repriced)} with a new dividend or split) and recomputed "
+          f"{recomputed} interval results in {summary['elapsed_s']:.1f}s.")
+    if log_path:
+        folder = os.path.dirname(log_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(log_path, 'a') as f:
+            f.write(json.dumps(summary) + "\n")
+    return summary
+
+
+def recompute(hits, tickers, today, args, cache, store):
+    """
+    Refreshes the stored results of the affected (company, year)s of every
+    interval. Only those years are read from the cache, and the store
+    recomputes the groups whose window bars changed, on --analysis-workers
+    processes. Returns the number of results recomputed.
+    """
+    computed_before = store.computed
+    workers = args.analysis_workers
+    compute = partial(parallel_interval_stats, workers=workers) if workers > 1 else interval_stats
+    end_date_dt = datetime.combine(today + timedelta(days=1), datetime.min.time())
+    for interval, groups in hits.items():
+        if not groups:
+            continue
+        companies = {company: tickers[company] for company, _ in groups}
+        start_date_dt = datetime(min(year for _, year in groups), 1, 1)
+        # Everything is cached by now, so this only reads the cache. The current year is kept.
+        full_df = build_full_df(fetch_results(companies, start_date_dt, end_date_dt, args, cache), companies,
+                                today.year + 1, args.price_dtype)
+        if full_df is None:
+            continue
+        keep = pd.MultiIndex.from_arrays([full_df['Company'].astype(object), full_df['Year'].astype('int64')]).isin(
+            list(groups))
+        store.interval_stats(full_df[keep], interval, companies, compute)
+    return store.computed - computed_before
+
+
+def main(argv=None):
+    """
+    Runs one end-of-day update, or one every weekday with --daemon.
+    Accepts the same ticker selection and fetch options as OHLC_Extractor_v2.py.
+    """
+    parser = argparse.ArgumentParser(description="Append the newest daily bars to the local cache and refresh the "
+                                                 "stored interval results they affect.")
+    add_fetch_options(parser)
+    add_download_options(parser)
+    add_selection_options(parser)
+    add_analysis_options(parser)
+    parser.add_argument("--intervals", type=parse_intervals, default=[],
+                        help="Intervals whose stored results are kept current, e.g. '10-01,10-15;01-01,01-31'.")
+    parser.add_argument("--years", type=int, default=10,
+                        help="Years of history fetched for tickers that are not cached yet (default: 10).")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running and update every weekday at --at (exchange time).")
+    parser.add_argument("--at", default=DEFAULT_UPDATE_TIME,
+                        help=f"Daily update time HH:MM in exchange time with --daemon "
+                             f"(default: {DEFAULT_UPDATE_TIME}).")
+    parser.set_defaults(batch_size=100, results_store=DEFAULT_RESULTS_STORE_PATH, adjust='local')
+    args = parser.parse_args(argv)
+    if args.adjust != 'local':
+        parser.error("The updater only appends new bars, so the cache must hold unadjusted prices; "
+                     "Yahoo re-adjusts every earlier bar after a dividend or split. Use --adjust local.")
+    if args.years <= 0:
+        parser.error("--years must be a positive number.")
+    if args.analysis_workers < 1:
+        parser.error("--analysis-workers must be at least 1.")
+    if args.no_cache:
+        parser.error("The updater appends to the local cache and cannot be used with --no-cache.")
+    try:
+        next_update(args.at)
+    except ValueError:
+        parser.error(f"--at must be a time HH:MM, got '{args.at}'.")
+
+    tickers = select_tickers(args)
+    cache = open_cache(args)
+    store = open_results_store(args)
+    if not args.daemon:
+        run_update(tickers, args.intervals, args.years, args, cache, store)
+        return
+
+    while True:
+        run_at = next_update(args.at)
+        print(f"\nNext update at {run_at.strftime('%Y-%m-%d %H:%M %Z')}.")
+        time.sleep(max(0.0, (run_at - datetime.now(EXCHANGE_TZ)).total_seconds()))
+        try:
+            run_update(tickers, args.intervals, args.years, args, cache, store)
+        except Exception as e:
+            # A failed update (e.g. Yahoo being down) is retried at the next scheduled time.
+            print(f"\nUpdate failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
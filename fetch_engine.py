@@ -0,0 +1,218 @@
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# --- Fetch Engine ---
+# Runs many history requests at once on a thread pool. All workers share one
+# pooled HTTP session and one token bucket, so throughput is bounded by the
+# upstream quota instead of a fixed sleep between tickers.
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 2.0        # requests per second, averaged
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0     # seconds, base of the exponential backoff
+MAX_BACKOFF = 30.0
+
+# `source` is 'fetched', 'cache' (served by the local OHLC cache) or 'journal' (replayed by --resume).
+# `batch_size` is the number of companies that shared the attempts of one bulk download.
+FetchResult = namedtuple('FetchResult', ['company', 'ticker', 'data', 'attempts', 'elapsed', 'error', 'source',
+                                         'batch_size'], defaults=('fetched', 1))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    Tokens refill at `rate` per second up to `capacity`; every request takes one
+    token and blocks until one is available.
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("Rate must be a positive number of requests per second.")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        for _ in range(tokens):
+            self._take()
+
+    def _take(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def create_session():
+    """
+    Creates one pooled HTTP session to be shared by every worker.
+    yfinance only accepts curl_cffi sessions, so None (yfinance's own shared
+    session) is returned when curl_cffi is not installed.
+    """
+    try:
+        from curl_cffi import requests as curl_requests
+    except ImportError:
+        return None
+    return curl_requests.Session(impersonate="chrome")
+
+
+def backoff_delay(attempt, base=DEFAULT_BACKOFF, cap=MAX_BACKOFF):
+    """
+    Exponential backoff with full jitter for the given (1-based) attempt number.
+    """
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+def fetch_with_retry(fetch_fn, company, ticker, limiter=None, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """
+    Calls fetch_fn(ticker, company) until it returns without raising or the
+    retries are used up. Returning None (no data) is a final answer, not an error.
+    """
+    started = time.perf_counter()
+    error = None
+    attempt = 0
+    for attempt in range(1, retries + 2):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            data = fetch_fn(ticker, company)
+            return FetchResult(company, ticker, data, attempt, time.perf_counter() - started, None)
+        except Exception as e:
+            error = e
+            if attempt > retries:
+                break
+            delay = backoff_delay(attempt, backoff)
+            print(f"  - Attempt {attempt} failed for {company}: {e}. Retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+    print(f"  - Giving up on {company} after {attempt} attempts: {error}")
+    return FetchResult(company, ticker, None, attempt, time.perf_counter() - started, str(error))
+
+
+def iter_fetch(tickers, fetch_fn, max_workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, burst=None,
+               retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, ordered=False):
+    """
+    Fetches every {company: ticker} pair concurrently and yields a FetchResult
+    per company, as soon as it completes (or in input order if `ordered`).
+    """
+    limiter = TokenBucket(rate, burst) if rate else None
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        futures = [
+            pool.submit(fetch_with_retry, fetch_fn, company, ticker, limiter, retries, backoff)
+            for company, ticker in tickers.items()
+        ]
+        for future in (futures if ordered else as_completed(futures)):
+            yield future.result()
+    finally:
+        # Closing the generator early (or Ctrl-C) drops the queued tickers instead of fetching them all first.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def split_fallbacks(tickers):
+    """
+    Splits {company: ticker or (ticker, fallback)} into a {company: ticker} map
+    and a {company: fallback} map for the companies that have one.
+    """
+    primary, fallbacks = {}, {}
+    for company, value in tickers.items():
+        if isinstance(value, (tuple, list)):
+            primary[company] = value[0]
+            if len(value) > 1 and value[1]:
+                fallbacks[company] = value[1]
+        else:
+            primary[company] = value
+    return primary, fallbacks
+
+
+def with_fallback(fetch_fn, fallbacks):
+    """
+    Wraps a fetch_fn(ticker, company) so that a company with no data under its
+    primary ticker is retried once under its fallback ticker.
+    """
+    if not fallbacks:
+        return fetch_fn
+
+    def fetch(ticker, company):
+        data = fetch_fn(ticker, company)
+        if data is None and company in fallbacks:
+            print(f"  - Trying fallback {fallbacks[company]} for {company}...")
+            data = fetch_fn(fallbacks[company], company)
+        return data
+    return fetch
+
+
+def with_batch_fallback(batch_fn, fallbacks):
+    """
+    Batched counterpart of with_fallback(): the companies of a chunk that came
+    back empty are fetched again as one batch under their fallback tickers.
+    """
+    if not fallbacks:
+        return batch_fn
+
+    def fetch(tickers):
+        results = batch_fn(tickers)
+        retry = {c: fallbacks[c] for c in tickers if results.get(c) is None and c in fallbacks}
+        if retry:
+            print(f"  - Trying {len(retry)} fallback tickers...")
+            results.update(batch_fn(retry))
+        return results
+    return fetch
+
+
+def _chunks(tickers, chunk_size):
+    items = list(tickers.items())
+    for i in range(0, len(items), chunk_size):
+        yield dict(items[i:i + chunk_size])
+
+
+def iter_fetch_batched(tickers, batch_fn, chunk_size=50, max_workers=DEFAULT_WORKERS, rate=DEFAULT_RATE,
+                       burst=None, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, ordered=False):
+    """
+    Like iter_fetch(), but sends groups of `chunk_size` tickers through one
+    batch_fn({company: ticker}) call that returns {company: data}. A chunk is
+    retried as a whole; one FetchResult is still yielded per company. Every
+    symbol of a chunk counts against `rate`.
+    """
+    chunks = list(_chunks(tickers, max(1, chunk_size)))
+    labels = {f"batch {i + 1}/{len(chunks)}": chunk for i, chunk in enumerate(chunks)}
+    limiter = TokenBucket(rate, burst) if rate else None
+
+    def fetch_chunk(chunk, label):
+        # A bulk download still sends one request per symbol, so every symbol takes a token.
+        if limiter is not None:
+            limiter.acquire(len(chunk))
+        return batch_fn(chunk)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        futures = [
+            pool.submit(fetch_with_retry, fetch_chunk, label, chunk, None, retries, backoff)
+            for label, chunk in labels.items()
+        ]
+        for future in (futures if ordered else as_completed(futures)):
+            batch = future.result()
+            for company, ticker in batch.ticker.items():
+                data = batch.data.get(company) if batch.data else None
+                yield FetchResult(company, ticker, data, batch.attempts, batch.elapsed, batch.error,
+                                  batch_size=len(batch.ticker))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_all(tickers, fetch_fn, **options):
+    """
+    Convenience wrapper around iter_fetch() that returns the results in input order.
+    """
+    return list(iter_fetch(tickers, fetch_fn, ordered=True, **options))
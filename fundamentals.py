@@ -0,0 +1,200 @@
+import os
+
+from fetch_engine import DEFAULT_BACKOFF, DEFAULT_RATE, DEFAULT_RETRIES, DEFAULT_WORKERS, iter_fetch
+from lazy_imports import lazy_import
+from metadata_client import MetadataClient
+
+pd = lazy_import('pandas')
+
+# --- Fundamentals Store ---
+# Financial statements, holders and ESG scores of a whole universe in one long,
+# normalised table:
+#
+#     symbol | statement | metric | period | value
+#
+# stored as a single zstd-compressed Parquet file (needs the optional pyarrow
+# package). The harvester requests only the (symbol, statement) pairs that can
+# have a period the store does not already have, so a repeated harvest is cheap.
+# Cross-sectional screens are then local queries, e.g.
+#
+#     FundamentalsStore().latest('financials', ['Total Revenue', 'Net Income'])
+
+DEFAULT_FUNDAMENTALS_PATH = os.path.join("data", "fundamentals.parquet")
+
+STORE_COLS = ['symbol', 'statement', 'metric', 'period', 'value']
+
+# Statement endpoint -> months between two reported periods, or None for holders
+# and ESG scores, which are re-checked once their MetadataClient TTL has passed.
+STATEMENTS = {
+    'financials': 12,
+    'quarterly_financials': 3,
+    'balance_sheet': 12,
+    'quarterly_balance_sheet': 3,
+    'cashflow': 12,
+    'quarterly_cashflow': 3,
+    'major_holders': None,
+    'institutional_holders': None,
+    'mutualfund_holders': None,
+    'sustainability': None,
+}
+
+HOLDER_VALUES = ['Shares', 'Value', 'pctHeld', 'pctChange']
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise RuntimeError("The fundamentals store needs the 'pyarrow' package. Install it with: pip install pyarrow")
+
+
+def _long(metrics, periods, values, symbol, statement):
+    frame = pd.DataFrame({
+        'symbol': symbol,
+        'statement': statement,
+        'metric': pd.Series(metrics, dtype=object).astype(str).to_numpy(),
+        'period': pd.to_datetime(pd.Series(periods)).dt.tz_localize(None).to_numpy() if len(periods) else [],
+        'value': pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='float64'),
+    }, columns=STORE_COLS)
+    return frame[frame['value'].notna()].astype({'period': 'datetime64[ns]'})
+
+
+def normalize(data, symbol, statement, harvested=None):
+    """
+    Turns one wide yfinance frame into STORE_COLS rows. Statements have one
+    column per period; institutional and mutual fund holders become one
+    '<holder> | <field>' metric per numeric field, reported on 'Date Reported';
+    major holders and ESG scores are snapshots dated `harvested`. Values
+    that are not numbers (e.g. the ESG peer group) are dropped.
+    """
+    if data is None or not isinstance(data, pd.DataFrame) or data.empty:
+        return _long([], [], [], symbol, statement)
+    harvested = harvested if harvested is not None else pd.Timestamp.now().normalize()
+
+    if STATEMENTS[statement] is not None:
+        stacked = data.stack(future_stack=True)
+        return _long(stacked.index.get_level_values(0), stacked.index.get_level_values(1), stacked.to_numpy(),
+                     symbol, statement)
+    if statement in ('institutional_holders', 'mutualfund_holders'):
+        fields = [col for col in HOLDER_VALUES if col in data.columns]
+        rows = data.melt(id_vars=['Holder', 'Date Reported'], value_vars=fields, var_name='field')
+        return _long(rows['Holder'].astype(str) + ' | ' + rows['field'], rows['Date Reported'], rows['value'],
+                     symbol, statement)
+    values = data['Value'] if 'Value' in data.columns else data.iloc[:, 0]
+    return _long(data.index, [harvested] * len(data), values.to_numpy(dtype=object), symbol, statement)
+
+
+class FundamentalsStore:
+    """
+    The long fundamentals table in one Parquet file. add() keeps the rows
+    already stored and only adds (symbol, statement, period)s that are new.
+    """
+
+    def __init__(self, path=DEFAULT_FUNDAMENTALS_PATH):
+        _require_pyarrow()
+        self.path = path
+
+    def load(self, statements=None, symbols=None, metrics=None):
+        """
+        Returns the stored rows, optionally limited to some statements, symbols
+        and metrics. The filters are pushed down to the Parquet reader.
+        """
+        if not os.path.exists(self.path):
+            return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in
+                                 zip(STORE_COLS, [object, object, object, 'datetime64[ns]', 'float64'])})
+        filters = [(col, 'in', list(values)) for col, values in
+                   (('statement', statements), ('symbol', symbols), ('metric', metrics)) if values is not None]
+        stored = pd.read_parquet(self.path, filters=filters or None)
+        return stored.astype({col: object for col in STORE_COLS[:3]})
+
+    def latest_periods(self):
+        """
+        Returns {(symbol, statement): newest stored period}.
+        """
+        stored = self.load()
+        if stored.empty:
+            return {}
+        return stored.groupby(['symbol', 'statement'])['period'].max().to_dict()
+
+    def add(self, rows):
+        """
+        Merges new STORE_COLS rows into the file and returns how many were added.
+        """
+        stored = self.load()
+        if len(stored) and len(rows):
+            have = pd.MultiIndex.from_frame(stored[['symbol', 'statement', 'period']]).unique()
+            rows = rows[~pd.MultiIndex.from_frame(rows[['symbol', 'statement', 'period']]).isin(have)]
+        rows = rows.drop_duplicates(subset=['symbol', 'statement', 'metric', 'period'])
+        if rows.empty:
+            return 0
+        merged = pd.concat([stored, rows], ignore_index=True) if len(stored) else rows
+        merged = merged.sort_values(by=['statement', 'symbol', 'metric', 'period'], ignore_index=True)
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # Categorical text columns are dictionary-encoded in the file; replaced atomically.
+        merged = merged.astype({col: 'category' for col in STORE_COLS[:3]})
+        tmp_path = self.path + ".tmp"
+        merged.to_parquet(tmp_path, index=False, compression='zstd')
+        os.replace(tmp_path, self.path)
+        return len(rows)
+
+    def latest(self, statement, metrics, symbols=None):
+        """
+        Returns a symbol x metric frame with the newest value of each metric,
+        the starting point of a cross-sectional screen.
+        """
+        rows = self.load([statement], symbols, metrics)
+        if rows.empty:
+            return pd.DataFrame(columns=list(metrics))
+        newest = rows.sort_values(by='period').groupby(['symbol', 'metric']).tail(1)
+        return newest.pivot(index='symbol', columns='metric', values='value').reindex(columns=list(metrics))
+
+
+def due(statement, newest, today, ttls):
+    """
+    Returns True if Yahoo can have a (symbol, statement) period newer than
+    `newest`: a statement whose next period has ended, or a snapshot older than its TTL.
+    """
+    if newest is None or pd.isna(newest):
+        return True
+    months = STATEMENTS[statement]
+    if months is None:
+        return (today - newest).total_seconds() >= ttls[statement]
+    return newest + pd.DateOffset(months=months) <= today
+
+
+def harvest(symbols, store=None, client=None, statements=tuple(STATEMENTS), max_workers=DEFAULT_WORKERS,
+            rate=DEFAULT_RATE, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """
+    Fetches the statements of every symbol that are due (see due()) on a
+    bounded thread pool with a shared rate limit, one request per (symbol,
+    statement), and adds the normalised rows to the store. Requests go
+    through the MetadataClient, so an interrupted harvest is resumed from
+    its disk cache. Returns a summary dictionary.
+    """
+    store = store or FundamentalsStore()
+    client = client or MetadataClient()
+    today = pd.Timestamp.now().normalize()
+    newest = store.latest_periods()
+    tasks = {
+        f"{symbol} {statement}": (symbol, statement)
+        for symbol in symbols for statement in statements
+        if due(statement, newest.get((symbol, statement)), today, client.ttls)
+    }
+    skipped = len(symbols) * len(statements) - len(tasks)
+    print(f"Harvesting {len(tasks)} statements of {len(symbols)} symbols ({skipped} already up to date)...")
+
+    def fetch(task, label):
+        symbol, statement = task
+        return normalize(client.get(symbol, statement), symbol, statement, today)
+
+    frames, failed = [], []
+    for result in iter_fetch(tasks, fetch, max_workers=max_workers, rate=rate, retries=retries, backoff=backoff):
+        if result.error is not None:
+            failed.append(result.company)
+        elif result.data is not None and len(result.data):
+            frames.append(result.data)
+    added = store.add(pd.concat(frames, ignore_index=True)) if frames else 0
+    print(f"Added {added:,} rows to '{store.path}' ({len(failed)} requests failed).")
+    return {'requested': len(tasks), 'skipped': skipped, 'failed': failed, 'rows_added': added}
@@ -0,0 +1,50 @@
+import argparse
+
+from fetch_engine import split_fallbacks
+from fundamentals import DEFAULT_FUNDAMENTALS_PATH, STATEMENTS, FundamentalsStore, harvest
+from metadata_client import MetadataClient
+from OHLC_Extractor_v2 import add_fetch_options, add_selection_options, select_tickers
+
+# --- Fundamentals Harvester ---
+# Collects the financial statements, holders and ESG scores of the selected
+# tickers into the long fundamentals store (see fundamentals.py):
+#
+#     python harvest_fundamentals.py --universe nse --workers 8 --rate 2
+#     python harvest_fundamentals.py --statements quarterly_financials,major_holders
+#
+# Re-running it only requests the statements that can have a new period.
+
+
+def parse_statements(value):
+    statements = [s.strip() for s in value.split(',') if s.strip()]
+    unknown = [s for s in statements if s not in STATEMENTS]
+    if unknown:
+        raise ValueError(f"Unknown statements {', '.join(unknown)}. Choose from: {', '.join(STATEMENTS)}")
+    return statements
+
+
+def main(argv=None):
+    """
+    Harvests fundamentals. Accepts the same ticker selection and fetch options as OHLC_Extractor_v2.py.
+    """
+    parser = argparse.ArgumentParser(description="Harvest fundamentals and holders into a long, columnar store.")
+    add_fetch_options(parser)
+    add_selection_options(parser)
+    parser.add_argument("store", nargs='?', default=DEFAULT_FUNDAMENTALS_PATH,
+                        help=f"Parquet file of the store (default: {DEFAULT_FUNDAMENTALS_PATH}).")
+    parser.add_argument("--statements", default=','.join(STATEMENTS),
+                        help=f"Comma-separated statements to harvest (default: all of {', '.join(STATEMENTS)}).")
+    args = parser.parse_args(argv)
+    try:
+        statements = parse_statements(args.statements)
+        store = FundamentalsStore(args.store)
+    except (ValueError, RuntimeError) as e:
+        parser.error(str(e))
+
+    tickers, _ = split_fallbacks(select_tickers(args))
+    harvest(sorted(set(tickers.values())), store, MetadataClient(), statements, args.workers, args.rate, args.retries,
+            args.backoff)
+
+
+if __name__ == "__main__":
+    main()
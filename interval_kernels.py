@@ -0,0 +1,245 @@
+from lazy_imports import lazy_import
+from panel_store import Panel
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- Interval Kernels ---
+# Vectorized building blocks for the seasonal interval analysis. A calendar day
+# is encoded as an integer month-day key (MM-DD -> MM * 100 + DD), so an
+# ('MM-DD','MM-DD') window is a plain integer range check on every row.
+
+# Per-(Company, Year) statistics computed by segment_stats().
+STAT_COLS = ['Pct_Change', 'High', 'Low', 'Range_Pct', 'Max_Drawdown_Pct', 'Volatility_Pct', 'Volume', 'Days']
+TRADING_DAYS = 252
+
+
+def parse_month_day(value):
+    """
+    Converts an 'MM-DD' string into its integer month-day key, e.g. '10-01' -> 1001.
+    """
+    month, day = value.split('-')
+    return int(month) * 100 + int(day)
+
+
+def month_day_key(dates):
+    """
+    Returns the integer month-day key for a Series of datetimes.
+    """
+    dates = pd.to_datetime(dates)
+    return dates.dt.month * 100 + dates.dt.day
+
+
+def frame_month_day(df):
+    """
+    Returns the integer month-day key of every row, reusing the compact
+    frame's MonthDay column when it is present.
+    """
+    if 'MonthDay' in df.columns and pd.api.types.is_integer_dtype(df['MonthDay']):
+        return df['MonthDay']
+    return month_day_key(df['Date'])
+
+
+def interval_changes(full_df, interval):
+    """
+    Computes the open-to-close percentage change of every (Company, Year) inside
+    the interval in one pass over the frame. Rows are taken in frame order, so
+    the first Open and last Close are those of the first and last trading day
+    of the window when the frame is sorted by Company and Date.
+    Returns a DataFrame with Company, Year and Pct_Change columns.
+    A Panel is analysed in place, without building a DataFrame of its bars.
+    """
+    if isinstance(full_df, Panel):
+        return interval_stats(full_df, interval)[['Company', 'Year', 'Pct_Change']]
+    start_key, end_key = parse_month_day(interval[0]), parse_month_day(interval[1])
+    md = frame_month_day(full_df)
+    window = full_df.loc[(md >= start_key) & (md <= end_key), ['Company', 'Year', 'Open', 'Close']]
+
+    grouped = window.groupby(['Company', 'Year'], sort=True, observed=True)
+    summary = pd.DataFrame({
+        'Open': grouped['Open'].first(skipna=False),
+        'Close': grouped['Close'].last(skipna=False),
+        'Days': grouped.size(),
+    })
+    summary = summary[(summary['Days'] >= 2) & summary['Open'].notna() & (summary['Open'] != 0)]
+
+    pct_change = ((summary['Close'] - summary['Open']) / summary['Open']) * 100
+    return pct_change.rename('Pct_Change').reset_index()
+
+
+def interval_changes_loop(full_df, interval):
+    """
+    Reference implementation of interval_changes() with one Python iteration
+    per (Company, Year). Kept for validation and benchmarking only.
+    """
+    results = []
+    interval_start, interval_end = interval
+
+    for (company, year), group in full_df.groupby(['Company', 'Year'], observed=True):
+        start_date_str = f"{year}-{interval_start}"
+        end_date_str = f"{year}-{interval_end}"
+        interval_df = group[(group['Date'] >= start_date_str) & (group['Date'] <= end_date_str)]
+
+        if len(interval_df) < 2:
+            continue
+
+        open_first_day = interval_df.iloc[0]['Open']
+        close_last_day = interval_df.iloc[-1]['Close']
+        if pd.isna(open_first_day) or open_first_day == 0:
+            continue
+
+        pct_change = ((close_last_day - open_first_day) / open_first_day) * 100
+        results.append({'Company': company, 'Year': year, 'Pct_Change': pct_change})
+
+    return pd.DataFrame(results, columns=['Company', 'Year', 'Pct_Change'])
+
+
+def summarise_interval_changes(results_df):
+    """
+    Builds the Year x Company pivot and the per-company aggregate table from
+    the long (Company, Year, Pct_Change) results.
+    """
+    pivot_df = results_df.pivot(index='Year', columns='Company', values='Pct_Change')
+    agg_results = results_df.groupby('Company', observed=True)['Pct_Change'].agg(['mean']).reset_index()
+    agg_results.rename(columns={'mean': 'Avg_Pct_Change'}, inplace=True)
+    agg_results['Trend'] = agg_results['Avg_Pct_Change'].apply(lambda x: "Increased" if x > 0 else "Decreased")
+    return pivot_df, agg_results
+
+
+def window_bounds(keys, group_base, start_key, end_key):
+    """
+    Returns the (lo, hi) row range of the window [start_key, end_key] of every
+    group whose key base is `group_base`, using two binary searches per group
+    over the sorted (group, month-day) `keys` (see IntervalSweep).
+    """
+    return (np.searchsorted(keys, group_base + start_key, side='left'),
+            np.searchsorted(keys, group_base + end_key, side='right'))
+
+
+def segment_stats(lo, hi, open_prices, high_prices, low_prices, close_prices, volume):
+    """
+    Computes the interval statistics of every segment of rows [lo, hi) with one
+    grouped NumPy reduction (ufunc.reduceat) per metric. Returns (valid, stats),
+    where stats maps each of STAT_COLS to an array with one value per segment.
+    A segment is valid when it has at least two rows and a usable first Open,
+    the same rule as interval_changes(); invalid segments are NaN.
+
+    - Pct_Change: first Open to last Close.
+    - High, Low, Range_Pct: the window's extremes, and their spread relative to the first Open.
+    - Max_Drawdown_Pct: the deepest fall of Close from its running peak within the window.
+    - Volatility_Pct: annualised realised volatility of the daily log returns within the window.
+    - Volume: total volume traded in the window. Days: trading days in the window.
+    """
+    lo, hi = np.asarray(lo, dtype=np.int64), np.asarray(hi, dtype=np.int64)
+    days = hi - lo
+    first_open = np.where(days > 0, open_prices[np.minimum(lo, max(len(open_prices) - 1, 0))], np.nan)
+    valid = (days >= 2) & ~np.isnan(first_open) & (first_open != 0)
+    stats = {col: np.full(len(lo), np.nan) for col in STAT_COLS}
+    if not valid.any():
+        return valid, stats
+
+    # Gather the rows of the valid segments into contiguous arrays; starts[i] is where segment i begins.
+    lo, days, first_open = lo[valid], days[valid], first_open[valid]
+    starts = np.r_[0, np.cumsum(days)[:-1]]
+    segment = np.repeat(np.arange(len(lo)), days)
+    rows = lo[segment] + np.arange(days.sum()) - starts[segment]
+    close = close_prices[rows].astype(np.float64)
+
+    high = np.fmax.reduceat(high_prices[rows], starts)
+    low = np.fmin.reduceat(low_prices[rows], starts)
+
+    # Running peak per segment: a running maximum over the close ranks, offset by the segment
+    # number so a peak never carries over into the next segment.
+    ranked = np.where(np.isnan(close), -np.inf, close)
+    order = np.argsort(ranked, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    offset = segment * len(close)
+    peak = ranked[order][np.maximum.accumulate(offset + rank) - offset]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(close), prepend=np.nan)
+        returns[starts] = np.nan
+        usable = ~np.isnan(returns)
+        squared = np.add.reduceat(np.where(usable, returns ** 2, 0.0), starts)
+        counts = np.add.reduceat(usable.astype(np.int64), starts)
+
+        stats['Pct_Change'][valid] = ((close[starts + days - 1] - first_open) / first_open) * 100
+        stats['High'][valid] = high
+        stats['Low'][valid] = low
+        stats['Range_Pct'][valid] = ((high - low) / first_open) * 100
+        stats['Max_Drawdown_Pct'][valid] = np.fmin.reduceat(close / peak - 1, starts) * 100
+        stats['Volatility_Pct'][valid] = np.sqrt(TRADING_DAYS * squared / counts) * 100
+    stats['Volume'][valid] = np.add.reduceat(np.nan_to_num(volume[rows].astype(np.float64)), starts)
+    stats['Days'][valid] = days
+    return valid, stats
+
+
+def interval_stats(full_df, interval):
+    """
+    Computes the statistics of every (Company, Year) inside the interval in one
+    pass over the frame. Pct_Change is identical to interval_changes(), and
+    rows are taken in frame order in the same way.
+    Returns a DataFrame with Company, Year and the STAT_COLS columns.
+    A Panel is analysed in place, without building a DataFrame of its bars.
+    """
+    if isinstance(full_df, Panel):
+        groups = full_df.groups()
+        lo, hi = window_bounds(groups.keys, groups.group_base, parse_month_day(interval[0]),
+                               parse_month_day(interval[1]))
+        valid, stats = segment_stats(lo, hi, groups.open, groups.high, groups.low, groups.close, groups.volume)
+        companies = pd.Categorical(groups.companies[valid], dtype=groups.company_dtype)
+        return stats_frame(companies, groups.years[valid], valid, stats).sort_values(
+            by=['Company', 'Year'], ignore_index=True)
+
+    start_key, end_key = parse_month_day(interval[0]), parse_month_day(interval[1])
+    md = frame_month_day(full_df)
+    columns = ['Company', 'Year', 'Open', 'High', 'Low', 'Close', 'Volume']
+    window = full_df.loc[(md >= start_key) & (md <= end_key), columns]
+    # A stable sort makes every group contiguous while keeping its rows in frame order.
+    window = window.sort_values(by=['Company', 'Year'], kind='stable')
+
+    companies, years = window['Company'].to_numpy(), window['Year'].to_numpy()
+    changed = (companies[1:] != companies[:-1]) | (years[1:] != years[:-1])
+    lo = np.r_[0, np.flatnonzero(changed) + 1] if len(window) else np.empty(0, dtype=np.int64)
+    hi = np.r_[lo[1:], len(window)]
+    valid, stats = segment_stats(
+        lo, hi, *(window[col].to_numpy(dtype=np.float64) for col in ['Open', 'High', 'Low', 'Close', 'Volume'])
+    )
+
+    labels = window[['Company', 'Year']].iloc[lo[valid]]
+    return stats_frame(labels['Company'].array, labels['Year'].to_numpy(), valid, stats)
+
+
+def stats_frame(companies, years, valid, stats):
+    """
+    Builds the (Company, Year, STAT_COLS...) frame from the labels of the valid
+    groups and the segment_stats() output for all groups.
+    """
+    results_df = pd.DataFrame({'Company': companies, 'Year': years})
+    for col in STAT_COLS:
+        results_df[col] = stats[col][valid]
+    results_df['Days'] = results_df['Days'].astype('int64')
+    return results_df
+
+
+def summarise_interval_stats(stats_df):
+    """
+    Aggregates the per-(Company, Year) statistics into one row per company:
+    the average, median and standard deviation of the change, the share of
+    years that ended higher (Win_Rate), and the typical range, worst drawdown,
+    volatility and volume of the window.
+    """
+    pct_change = stats_df['Pct_Change']
+    stats_df = stats_df.assign(Win_Rate=((pct_change > 0) * 100.0).where(pct_change.notna()))
+    return stats_df.groupby('Company', observed=True).agg(
+        Years=('Pct_Change', 'count'),
+        Avg_Pct_Change=('Pct_Change', 'mean'),
+        Median_Pct_Change=('Pct_Change', 'median'),
+        Std_Pct_Change=('Pct_Change', 'std'),
+        Win_Rate=('Win_Rate', 'mean'),
+        Avg_Range_Pct=('Range_Pct', 'mean'),
+        Worst_Drawdown_Pct=('Max_Drawdown_Pct', 'min'),
+        Avg_Volatility_Pct=('Volatility_Pct', 'mean'),
+        Avg_Volume=('Volume', 'mean'),
+    ).reset_index()
@@ -0,0 +1,176 @@
+from datetime import date, timedelta
+
+from interval_kernels import frame_month_day, parse_month_day, segment_stats, stats_frame, window_bounds
+from lazy_imports import lazy_import
+from panel_store import Panel
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- Multi-Interval Sweep ---
+# Evaluates many ('MM-DD','MM-DD') windows over data that is already in memory.
+# The frame is sorted once and flattened into one array of (group, month-day)
+# keys, so every window of every (Company, Year) group is two binary searches
+# instead of another pass over the rows.
+
+_KEY_SCALE = 10000  # month-day keys are at most 1231
+
+
+def _calendar_date(month_day):
+    # A leap year, so that 02-29 is a valid grid day.
+    return date(2024, *map(int, month_day.split('-')))
+
+
+def calendar_days(step=7, first="01-01", last="12-31"):
+    """
+    Returns 'MM-DD' days from `first` to `last`, `step` calendar days apart.
+    """
+    day = _calendar_date(first)
+    end = _calendar_date(last)
+    days = []
+    while day <= end:
+        days.append(day.strftime('%m-%d'))
+        day += timedelta(days=step)
+    return days
+
+
+def interval_grid(starts, ends=None, min_days=1):
+    """
+    Returns every (start, end) pair from the given 'MM-DD' lists where the end
+    falls at least `min_days` calendar days after the start.
+    """
+    ends = starts if ends is None else ends
+    intervals = []
+    for start in starts:
+        for end in ends:
+            if (_calendar_date(end) - _calendar_date(start)).days >= max(1, min_days):
+                intervals.append((start, end))
+    return intervals
+
+
+def window_changes(keys, open_prices, close_prices, group_base, start_key, end_key):
+    """
+    Core of the sweep: for the groups whose key base is `group_base`, returns
+    (valid, pct_change) arrays for the window [start_key, end_key] over the
+    sorted `keys`. A group is valid when its window has at least two rows and a
+    usable first Open.
+    """
+    lo, hi = window_bounds(keys, group_base, start_key, end_key)
+    valid = (hi - lo) >= 2
+    first_open = np.where(valid, open_prices[np.minimum(lo, len(open_prices) - 1)], np.nan)
+    last_close = close_prices[np.maximum(hi - 1, 0)]
+    valid &= ~np.isnan(first_open) & (first_open != 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_change = ((last_close - first_open) / first_open) * 100
+    return valid, pct_change
+
+
+class IntervalSweep:
+    """
+    Precomputed per-(Company, Year) arrays for answering many interval queries.
+    Accepts a DataFrame or a Panel; a Panel's price columns are used in place,
+    and its groups (and so the result rows) follow the panel's symbol order.
+    """
+
+    def __init__(self, full_df):
+        if isinstance(full_df, Panel):
+            groups = full_df.groups()
+            for name in ('keys', 'open', 'high', 'low', 'close', 'volume', 'companies', 'years', 'group_starts',
+                         'group_base'):
+                setattr(self, name, getattr(groups, name))
+            return
+        df = full_df.sort_values(by=['Company', 'Date'], kind='stable')
+        groups = df.groupby(['Company', 'Year'], sort=False, observed=True)
+        codes = groups.ngroup().to_numpy(dtype=np.int64)
+
+        self.keys = codes * _KEY_SCALE + frame_month_day(df).to_numpy(dtype=np.int64)
+        self.open = df['Open'].to_numpy(dtype=np.float64)
+        self.close = df['Close'].to_numpy(dtype=np.float64)
+        self.high = df['High'].to_numpy(dtype=np.float64)
+        self.low = df['Low'].to_numpy(dtype=np.float64)
+        self.volume = df['Volume'].to_numpy(dtype=np.float64)
+
+        group_starts = np.r_[0, np.flatnonzero(np.diff(codes)) + 1] if len(codes) else np.empty(0, dtype=np.int64)
+        labels = df[['Company', 'Year']].iloc[group_starts]
+        self.companies = labels['Company'].to_numpy()
+        self.years = labels['Year'].to_numpy()
+        self.group_starts = group_starts
+        self.group_base = np.arange(len(labels), dtype=np.int64) * _KEY_SCALE
+
+    def changes(self, interval):
+        """
+        Returns (Company, Year, Pct_Change) for one interval, matching
+        interval_changes() on the same data.
+        """
+        valid, pct_change = window_changes(self.keys, self.open, self.close, self.group_base,
+                                           parse_month_day(interval[0]), parse_month_day(interval[1]))
+        return pd.DataFrame({
+            'Company': self.companies[valid],
+            'Year': self.years[valid],
+            'Pct_Change': pct_change[valid],
+        })
+
+    def _stats(self, interval):
+        """
+        Returns (valid, stats) from segment_stats() for every group.
+        """
+        lo, hi = window_bounds(self.keys, self.group_base, parse_month_day(interval[0]), parse_month_day(interval[1]))
+        return segment_stats(lo, hi, self.open, self.high, self.low, self.close, self.volume)
+
+    def stats(self, interval):
+        """
+        Returns (Company, Year, STAT_COLS...) for one interval, matching
+        interval_stats() on the same data.
+        """
+        valid, stats = self._stats(interval)
+        return stats_frame(self.companies[valid], self.years[valid], valid, stats)
+
+    def _run(self, intervals):
+        """
+        Evaluates the intervals for all groups. Returns (valid, pct_change)
+        matrices of shape (len(intervals), groups).
+        """
+        shape = (len(intervals), len(self.group_base))
+        valid, pct_change = np.zeros(shape, dtype=bool), np.full(shape, np.nan)
+        for i, (start, end) in enumerate(intervals):
+            valid[i], pct_change[i] = window_changes(self.keys, self.open, self.close, self.group_base,
+                                                     parse_month_day(start), parse_month_day(end))
+        return valid, pct_change
+
+    def sweep(self, intervals):
+        """
+        Returns one tidy table with a row per interval x company x year.
+        """
+        intervals = list(intervals)
+        valid, pct_change = self._run(intervals)
+        interval_idx, group_idx = np.nonzero(valid)
+        starts = np.array([start for start, _ in intervals], dtype=object)
+        ends = np.array([end for _, end in intervals], dtype=object)
+        return pd.DataFrame({
+            'Interval': starts[interval_idx] + ',' + ends[interval_idx],
+            'Start': starts[interval_idx],
+            'End': ends[interval_idx],
+            'Company': self.companies[group_idx],
+            'Year': self.years[group_idx],
+            'Pct_Change': pct_change[interval_idx, group_idx],
+        })
+
+
+def sweep_intervals(full_df, intervals):
+    """
+    Computes the interval analysis for every interval in one pass over the data.
+    """
+    return IntervalSweep(full_df).sweep(intervals)
+
+
+def summarise_sweep(sweep_df):
+    """
+    Ranks the swept windows per company by their average change across years.
+    """
+    pct_change = sweep_df['Pct_Change']
+    sweep_df = sweep_df.assign(Win_Rate=((pct_change > 0) * 100.0).where(pct_change.notna()))
+    summary = sweep_df.groupby(['Interval', 'Company'], observed=True).agg(
+        Avg_Pct_Change=('Pct_Change', 'mean'), Years=('Pct_Change', 'count'), Win_Rate=('Win_Rate', 'mean')
+    ).reset_index()
+    return summary.sort_values(by=['Company', 'Avg_Pct_Change'], ascending=[True, False], ignore_index=True)
@@ -0,0 +1,34 @@
+import importlib
+
+# --- Lazy Imports ---
+# pandas, numpy and yfinance take several hundred milliseconds to import, which
+# `--help`, argument validation and scheduler-driven runs should not pay for.
+# Modules bind them with `pd = lazy_import('pandas')` instead of `import pandas
+# as pd`; the real import happens on first attribute access (and importlib's
+# import lock makes that safe from the fetch worker threads).
+
+
+class LazyModule:
+    """
+    Stand-in for a module that imports it on first attribute access.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Returns a LazyModule for `name`.
+    """
+    return LazyModule(name)
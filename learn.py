@@ -2,9 +2,14 @@
 import json
 
 import pandas as pd
-import yfinance as yf
 
 from learn_utility import display_news_article, print_separation
+from metadata_client import MetadataClient
+from timeframes import BarSource
+
+# Every metadata property below is served from a TTL cache (data/cache/metadata_cache.sqlite),
+# so re-running a cell does not hit Yahoo again. See metadata_client.ENDPOINT_TTLS.
+metadata = MetadataClient()
 
 # %%
 # pd.set_option('display.max_rows', None)
@@ -28,9 +33,12 @@ Example:
     ticker_BSE = yf.Ticker('TCS.BO')
 
 Use `.info` propertyfor getting information about the stock. This returns a dictionary.
+
+Here `metadata.ticker(...)` is used instead of `yf.Ticker(...)`. It behaves the same but caches
+.info, .calendar, the financial statements, actions and holders.
 """
-ticker_NSE = yf.Ticker("TCS.NS")
-ticker_BSE = yf.Ticker("TCS.BO")
+ticker_NSE = metadata.ticker("TCS.NS")
+ticker_BSE = metadata.ticker("TCS.BO")
 
 
 # View all available key in info dictionary
@@ -54,6 +62,7 @@ NOTE:
     - Accessing ticker.info multiple times (as in your loops and print statements) is inefficnet.
     - It triggers a fresh network request each time, which can lead to rate limiting.
     - It is more efficient to store the dictionary in a variable first.
+    - With metadata.ticker(...) repeated accesses are answered from the cache until the TTL expires.
 """
 
 tcs_info = ticker_NSE.info
@@ -112,28 +121,41 @@ Examples:
 - Today's price: Uses period='1d' with small intervals like '1m'.
 - 30-day price: Uses period='1mo' with '1d' intervals.
 - 1-year price: Uses period='1y' with '1d' intervals.
+
+Here `bars.history(...)` is used instead of `ticker.history(...)`. BarSource keeps the bars it fetched and
+builds coarser timeframes from them locally (first open, max high, min low, last close, summed volume),
+so only requests that need finer or longer data than it already has go to Yahoo. See timeframes.py.
 """
 # Initialize Ticker for Wipro
-wipro = yf.Ticker("WIPRO.NS")
+wipro = metadata.ticker("WIPRO.NS")
+bars = BarSource()
 
 print_separation(f"Fetch Historical Data for {wipro.info['longName']}")
 
 # Fetching today's price data (Intraday)
 # Note: 1m interval data is only available for the last 7 days.
-today_df = wipro.history(period="1d", interval="1m")
+today_df = bars.history("WIPRO.NS", period="1d", interval="1m")
 current_price = today_df["Close"].iloc[-1] if not today_df.empty else "N/A"
 print(f"Current Wipro Price (NSE): {current_price}")
 
-# Fetching previous 30 days data
-monthly_df = wipro.history(period="1mo", interval="1d")
-print("\nLast 30 Days High/Low:")
-print(monthly_df[["High", "Low"]].tail())
+# Hourly bars of today, built from the 1-minute bars above (no request)
+hourly_df = bars.history("WIPRO.NS", period="1d", interval="1h")
+print("\nToday's Hourly Bars:")
+print(hourly_df)
 
 # Fetching 1 year data
-yearly_df = wipro.history(period="1y", interval="1d")
+yearly_df = bars.history("WIPRO.NS", period="1y", interval="1d")
 print("\nYearly Data Summary (First 5 rows):")
 print(yearly_df.head())
 
+# Previous 30 days and weekly bars, cut from the yearly data (no request)
+monthly_df = bars.history("WIPRO.NS", period="1mo", interval="1d")
+print("\nLast 30 Days High/Low:")
+print(monthly_df[["High", "Low"]].tail())
+
+weekly_df = bars.history("WIPRO.NS", period="1y", interval="1wk")
+print(f"\n{len(weekly_df)} weekly bars from {bars.fetches} requests to Yahoo")
+
 # %%
 """
 6. FUNDAMENTAL ANALYSES
@@ -141,9 +163,12 @@ Three core financial statements:
     - The Income Statement: <ticker_obj>.financials, and <ticker_obj>.quaterly_financials
     - Balance Sheet: <ticker_obj>.balance_sheet, and <ticker_obj>.quarterly_balance_sheet
     - Cash Flow Statement. <ticker_obj>.cashflow and <ticker_obj>.quarterly_cashflow
+
+To compare these across many companies, harvest_fundamentals.py collects them (and the holders and ESG
+scores of sections 9 and 10) for a whole universe into one long table; see fundamentals.py.
 """
 
-tata_steel = yf.Ticker("TATASTEEL.NS")
+tata_steel = metadata.ticker("TATASTEEL.NS")
 
 # %%
 """
@@ -202,7 +227,7 @@ Stock Splits (increasing the number of shares while lowering the price per share
 - ticker_object.splits -> # Returns only Stock Splits
 """
 
-itc = yf.Ticker("ITC.NS")
+itc = metadata.ticker("ITC.NS")
 print_separation(f"Corporate Actions for {itc.info.get('longName')} are:")
 
 actions = itc.actions
@@ -230,7 +255,7 @@ else:
 - Analyst coverage varies; mid-cap or small-cap Indian stocks may have limited or no data.
 """
 
-sbi = yf.Ticker("SBIN.NS")
+sbi = metadata.ticker("SBIN.NS")
 
 print_separation(f"Analyst Insights for {sbi.info.get('longName')}")
 
@@ -259,7 +284,7 @@ else:
 """
 
 # Initialize Ticker for HDFC Bank
-hdfc = yf.Ticker("HDFCBANK.NS")
+hdfc = metadata.ticker("HDFCBANK.NS")
 
 print_separation(f"Ownership Structure: {hdfc.info.get('longName')}")
 
@@ -287,7 +312,7 @@ if mutual is not None:
 - This data is provided to Yahoo Finance by Sustainalytics.
 """
 
-infy = yf.Ticker("INFY.NS")
+infy = metadata.ticker("INFY.NS")
 
 print_separation(f"Sustainability Data for {infy.info.get('longName')}")
 
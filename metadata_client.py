@@ -0,0 +1,252 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from lazy_imports import lazy_import
+
+yf = lazy_import('yfinance')
+
+# --- Metadata Client ---
+# Every access to a yfinance Ticker property such as .info or .financials is a
+# new network request. MetadataClient answers them from an in-process LRU, then
+# from a SQLite disk cache, and only then from Yahoo. Every endpoint has its own
+# time-to-live: price-related fields like .info expire within minutes, while
+# financial statements and holders change once a quarter.
+
+DEFAULT_METADATA_CACHE_PATH = os.path.join("data", "cache", "metadata_cache.sqlite")
+DEFAULT_MAX_ENTRIES = 512
+
+MINUTE, HOUR, DAY = 60, 60 * 60, 24 * 60 * 60
+
+# Time-to-live in seconds of every cached Ticker property.
+ENDPOINT_TTLS = {
+    'info': 15 * MINUTE,
+    'fast_info': 5 * MINUTE,
+    'news': 30 * MINUTE,
+    'calendar': 12 * HOUR,
+    'actions': DAY,
+    'dividends': DAY,
+    'splits': DAY,
+    'recommendations': DAY,
+    'recommendations_summary': DAY,
+    'analyst_price_targets': DAY,
+    'financials': 7 * DAY,
+    'quarterly_financials': 7 * DAY,
+    'balance_sheet': 7 * DAY,
+    'quarterly_balance_sheet': 7 * DAY,
+    'cashflow': 7 * DAY,
+    'quarterly_cashflow': 7 * DAY,
+    'major_holders': 7 * DAY,
+    'institutional_holders': 7 * DAY,
+    'mutualfund_holders': 7 * DAY,
+    'insider_transactions': 7 * DAY,
+    'sustainability': 30 * DAY,
+}
+
+# yfinance returns an empty frame or dict instead of raising when most property
+# requests fail, so empty answers are only trusted for a short time.
+EMPTY_TTL = 15 * MINUTE
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    symbol     TEXT NOT NULL,
+    endpoint   TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    payload    BLOB NOT NULL,
+    PRIMARY KEY (symbol, endpoint)
+) WITHOUT ROWID;
+"""
+
+
+def is_empty(value):
+    """
+    True for None and for an empty DataFrame, Series, dict or list.
+    """
+    if value is None:
+        return True
+    empty = getattr(value, 'empty', None)
+    if isinstance(empty, bool):
+        return empty
+    return isinstance(value, (dict, list, tuple)) and not value
+
+
+class LRUCache:
+    """
+    Bounded mapping that evicts the least recently used entry when full.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keys(self):
+        return list(self._entries)
+
+    def get(self, key):
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class MetadataClient:
+    """
+    Cached access to yfinance Ticker properties (info, calendar, financial
+    statements, actions, holders, ...). Safe to share between threads.
+    `ttls` overrides ENDPOINT_TTLS per endpoint and `empty_ttl` caps the TTL of
+    empty answers; `path=None` keeps the cache in memory only.
+    """
+
+    def __init__(self, path=DEFAULT_METADATA_CACHE_PATH, ttls=None, max_entries=DEFAULT_MAX_ENTRIES,
+                 session=None, ticker_factory=None, empty_ttl=EMPTY_TTL):
+        self.ttls = {**ENDPOINT_TTLS, **(ttls or {})}
+        self.empty_ttl = empty_ttl
+        self.session = session
+        self.ticker_factory = ticker_factory
+        self.memory = LRUCache(max_entries)
+        self.requests = 0
+        self._tickers = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            folder = os.path.dirname(path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _yf_ticker(self, symbol):
+        with self._lock:
+            if symbol not in self._tickers:
+                self._tickers[symbol] = (self.ticker_factory or yf.Ticker)(symbol, session=self.session)
+            return self._tickers[symbol]
+
+    def _fresh(self, endpoint, entry):
+        fetched_at, value = entry
+        ttl = min(self.ttls[endpoint], self.empty_ttl) if is_empty(value) else self.ttls[endpoint]
+        return time.time() - fetched_at < ttl
+
+    def _load(self, key):
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT fetched_at, payload FROM metadata WHERE symbol = ? AND endpoint = ?", key
+        ).fetchone()
+        return (row[0], pickle.loads(row[1])) if row else None
+
+    def _save(self, key, entry):
+        if self._conn is not None:
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)",
+                                   (*key, entry[0], pickle.dumps(entry[1], protocol=pickle.HIGHEST_PROTOCOL)))
+
+    def get(self, symbol, endpoint, refresh=False):
+        """
+        Returns a Ticker property, from memory or disk while it is within its
+        TTL and from Yahoo otherwise. If Yahoo fails and an expired copy is
+        cached, the expired copy is returned instead of raising. An empty answer
+        expires after `empty_ttl`, and never replaces a cached non-empty copy:
+        that copy is kept for another TTL instead.
+        """
+        if endpoint not in self.ttls:
+            raise ValueError(f"Unknown metadata endpoint '{endpoint}'. Choose from: {', '.join(self.ttls)}")
+        key = (symbol, endpoint)
+        stale = None
+        if not refresh:
+            with self._lock:
+                entry = self.memory.get(key)
+                if entry is None:
+                    entry = self._load(key)
+                    if entry is not None:
+                        self.memory.put(key, entry)
+            if entry is not None and self._fresh(endpoint, entry):
+                return entry[1]
+            stale = entry
+
+        try:
+            value = getattr(self._yf_ticker(symbol), endpoint)
+        except Exception as e:
+            if stale is None:
+                raise
+            print(f"  - Using cached {endpoint} for {symbol} after a failed refresh: {e}")
+            return stale[1]
+        with self._lock:
+            self.requests += 1
+        if is_empty(value) and stale is not None and not is_empty(stale[1]):
+            print(f"  - Using cached {endpoint} for {symbol} after an empty refresh.")
+            value = stale[1]
+
+        entry = (time.time(), value)
+        with self._lock:
+            self.memory.put(key, entry)
+            self._save(key, entry)
+        return value
+
+    def invalidate(self, symbol=None, endpoint=None):
+        """
+        Drops cached entries for a symbol and/or endpoint (everything if neither is given).
+        """
+        with self._lock:
+            if symbol is None and endpoint is None:
+                self.memory.clear()
+            else:
+                for key in self.memory.keys():
+                    if symbol in (None, key[0]) and endpoint in (None, key[1]):
+                        self.memory.discard(key)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "DELETE FROM metadata WHERE (? IS NULL OR symbol = ?) AND (? IS NULL OR endpoint = ?)",
+                        (symbol, symbol, endpoint, endpoint)
+                    )
+
+    def ticker(self, symbol):
+        """
+        Returns a CachedTicker, a drop-in for yf.Ticker(symbol) whose metadata
+        properties go through this client.
+        """
+        return CachedTicker(self, symbol)
+
+
+class CachedTicker:
+    """
+    yf.Ticker look-alike: the properties listed in the client's TTL table are
+    cached, everything else (history(), option chains, ...) is passed through.
+    """
+
+    def __init__(self, client, symbol):
+        self.client = client
+        self.ticker = symbol
+
+    def __getattr__(self, name):
+        if name in self.client.ttls:
+            return self.client.get(self.ticker, name)
+        return getattr(self.client._yf_ticker(self.ticker), name)
+
+    def __repr__(self):
+        return f"CachedTicker('{self.ticker}')"
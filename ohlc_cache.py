@@ -0,0 +1,237 @@
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+# --- Local OHLC Cache ---
+# Daily bars are stored in SQLite keyed by (symbol, date). Every date range that
+# has been requested from Yahoo is recorded in a coverage table, including ranges
+# that returned no bars (holidays, pre-listing years), so a rerun can tell exactly
+# which ranges are still missing and fetch only those.
+
+DEFAULT_CACHE_PATH = os.path.join("data", "cache", "ohlc_cache.sqlite")
+DEFAULT_RAW_CACHE_PATH = os.path.join("data", "cache", "ohlc_raw_cache.sqlite")
+PRICE_COLS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    open   REAL,
+    high   REAL,
+    low    REAL,
+    close  REAL,
+    volume INTEGER,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    symbol TEXT NOT NULL,
+    start  TEXT NOT NULL,
+    end    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_symbol ON coverage (symbol);
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol TEXT PRIMARY KEY,
+    tz     TEXT
+);
+CREATE TABLE IF NOT EXISTS actions (
+    symbol   TEXT NOT NULL,
+    date     TEXT NOT NULL,
+    dividend REAL NOT NULL,
+    split    REAL NOT NULL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS settings (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def _merge_ranges(ranges):
+    """
+    Merges overlapping or touching half-open [start, end) date ranges.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class OHLCCache:
+    """
+    SQLite-backed store of daily OHLCV bars with per-symbol coverage tracking.
+    Safe to share between the fetch engine's worker threads.
+    `prices` is 'adjusted' for Yahoo's auto-adjusted bars or 'raw' for unadjusted
+    bars plus corporate actions; one cache file only ever holds one kind.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, prices='adjusted'):
+        self.path = path
+        self.prices = prices
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute("INSERT OR IGNORE INTO settings VALUES ('prices', ?)", (prices,))
+            stored = self._conn.execute("SELECT value FROM settings WHERE key = 'prices'").fetchone()[0]
+        if stored != prices:
+            self.close()
+            raise ValueError(f"The cache '{path}' holds {stored} prices, not {prices} prices. "
+                             f"Use a different --cache file.")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def coverage(self, symbol):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT start, end FROM coverage WHERE symbol = ? ORDER BY start", (symbol,)
+            ).fetchall()
+        return [(date.fromisoformat(start), date.fromisoformat(end)) for start, end in rows]
+
+    def last_dates(self, symbols):
+        """
+        Returns {symbol: date of its newest cached bar} for the symbols that have bars.
+        """
+        symbols = list(symbols)
+        last = {}
+        with self._lock:
+            # Stay below SQLite's limit on query parameters.
+            for i in range(0, len(symbols), 500):
+                chunk = symbols[i:i + 500]
+                last.update(self._conn.execute(
+                    f"SELECT symbol, MAX(date) FROM bars WHERE symbol IN ({', '.join('?' * len(chunk))}) "
+                    f"GROUP BY symbol", chunk
+                ).fetchall())
+        return {symbol: date.fromisoformat(day) for symbol, day in last.items()}
+
+    def missing_ranges(self, symbol, start_date, end_date):
+        """
+        Returns the [start, end) date ranges within the request that have never been fetched.
+        """
+        start, end = _to_date(start_date), _to_date(end_date)
+        missing = []
+        cursor = start
+        for cov_start, cov_end in self.coverage(symbol):
+            if cov_end <= cursor:
+                continue
+            if cov_start >= end:
+                break
+            if cov_start > cursor:
+                missing.append((cursor, cov_start))
+            cursor = max(cursor, cov_end)
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    def store(self, symbol, data, start_date, end_date):
+        """
+        Saves the bars fetched for [start_date, end_date) and marks that range as covered.
+        `data` may be None or empty when Yahoo had no bars for the range.
+        Today and later dates are never marked as covered, since today's bar is not final yet.
+        Only store genuine answers: a range stored after a failed request is never fetched again.
+        """
+        start = _to_date(start_date)
+        end = min(_to_date(end_date), date.today())
+
+        rows = []
+        tz = None
+        if data is not None and not data.empty:
+            dates = pd.to_datetime(data['Date'])
+            tz = str(dates.dt.tz) if dates.dt.tz is not None else None
+            volume = data['Volume'].astype('float64')
+            rows = [
+                (symbol, day, o, h, l, c, None if pd.isna(v) else int(v))
+                for day, o, h, l, c, v in zip(
+                    dates.dt.strftime('%Y-%m-%d'), data['Open'], data['High'], data['Low'], data['Close'], volume
+                )
+            ]
+
+        with self._lock, self._conn:
+            if rows:
+                self._conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            if tz is not None:
+                self._conn.execute("INSERT OR REPLACE INTO symbols VALUES (?, ?)", (symbol, tz))
+            if start < end:
+                existing = self._conn.execute(
+                    "SELECT start, end FROM coverage WHERE symbol = ?", (symbol,)
+                ).fetchall()
+                ranges = [(date.fromisoformat(s), date.fromisoformat(e)) for s, e in existing]
+                merged = _merge_ranges(ranges + [(start, end)])
+                self._conn.execute("DELETE FROM coverage WHERE symbol = ?", (symbol,))
+                self._conn.executemany(
+                    "INSERT INTO coverage VALUES (?, ?, ?)",
+                    [(symbol, s.isoformat(), e.isoformat()) for s, e in merged]
+                )
+
+    def load(self, symbol, start_date, end_date):
+        """
+        Returns the cached bars for [start_date, end_date) shaped like a yfinance
+        history frame after reset_index(), or None if there are none.
+        """
+        start, end = _to_date(start_date), _to_date(end_date)
+        with self._lock:
+            data = pd.read_sql_query(
+                "SELECT date, open, high, low, close, volume FROM bars "
+                "WHERE symbol = ? AND date >= ? AND date < ? ORDER BY date",
+                self._conn, params=(symbol, start.isoformat(), end.isoformat())
+            )
+            tz_row = self._conn.execute("SELECT tz FROM symbols WHERE symbol = ?", (symbol,)).fetchone()
+        if data.empty:
+            return None
+
+        data.columns = ['Date'] + PRICE_COLS
+        data['Date'] = pd.to_datetime(data['Date'])
+        if tz_row and tz_row[0]:
+            data['Date'] = data['Date'].dt.tz_localize(tz_row[0])
+        if not data['Volume'].isna().any():
+            data['Volume'] = data['Volume'].astype('int64')
+        return data
+
+    def store_actions(self, symbol, actions):
+        """
+        Saves dividends and split ratios (a Date/Dividends/Stock Splits frame).
+        """
+        if actions is None or actions.empty:
+            return
+        rows = [
+            (symbol, day, float(dividend), float(split))
+            for day, dividend, split in zip(
+                pd.to_datetime(actions['Date']).dt.strftime('%Y-%m-%d'), actions['Dividends'], actions['Stock Splits']
+            )
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO actions VALUES (?, ?, ?, ?)", rows)
+
+    def load_actions(self, symbol):
+        """
+        Returns every stored action of a symbol as a Date/Dividends/Stock Splits frame.
+        """
+        with self._lock:
+            actions = pd.read_sql_query(
+                "SELECT date, dividend, split FROM actions WHERE symbol = ? ORDER BY date",
+                self._conn, params=(symbol,)
+            )
+        actions.columns = ['Date', 'Dividends', 'Stock Splits']
+        actions['Date'] = pd.to_datetime(actions['Date'])
+        return actions
@@ -0,0 +1,310 @@
+import os
+import re
+import shutil
+
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+# --- Output Engines ---
+# Shared formatting for the raw OHLC output, plus pluggable writers that accept
+# one company at a time so a run never has to hold the whole universe in memory.
+# Every data writer takes (file_name, save_separate, output_folder) and exposes
+# write(company, df) and close(). Parquet, Feather and XLSX need the optional
+# pyarrow / openpyxl packages, which are only imported when selected.
+
+OUTPUT_COLS = ['Date', 'Year', 'Company', 'Open', 'High', 'Low', 'Close', 'Volume']
+PRICE_COLS = ['Open', 'High', 'Low', 'Close']
+
+
+def safe_name(company_name):
+    """
+    Creates a filesystem-safe name for a company.
+    """
+    return re.sub(r'\W+', '', company_name.replace(' ', '_'))
+
+
+def format_output_frame(df):
+    """
+    Rounds prices, turns timestamps into plain dates and orders the output columns.
+    """
+    df_to_process = df.copy()
+    df_to_process[PRICE_COLS] = df_to_process[PRICE_COLS].round(2)
+    df_to_process['Date'] = pd.to_datetime(df_to_process['Date']).dt.date
+    return df_to_process.reindex(columns=OUTPUT_COLS)
+
+
+class CsvStreamWriter:
+    """
+    Writes CSV output one company at a time.
+    Separate mode writes each company's file as soon as it arrives. Combined mode
+    writes each company to a part file and, on close(), joins the parts in
+    company order, so the result is identical to saving the sorted full frame.
+    """
+
+    def __init__(self, file_name, save_separate, output_folder):
+        self.file_name = file_name
+        self.save_separate = save_separate == 'y'
+        self.output_folder = output_folder
+        self.parts_folder = os.path.join(output_folder, f".{file_name}_parts")
+        self.parts = {}
+        self.rows = 0
+
+    def write(self, company, df):
+        if df.empty:
+            return
+        frame = format_output_frame(df)
+        self.rows += len(frame)
+        if self.save_separate:
+            csv_path = os.path.join(self.output_folder, f"{self.file_name}_{safe_name(company)}.csv")
+            try:
+                frame.to_csv(csv_path, index=False)
+                print(f" - Saved data to {csv_path}")
+            except Exception as e:
+                print(f"\nError saving file {csv_path}: {e}")
+            return
+
+        os.makedirs(self.parts_folder, exist_ok=True)
+        part_path = os.path.join(self.parts_folder, f"{len(self.parts):06d}.csv")
+        frame.to_csv(part_path, index=False, header=False)
+        self.parts[company] = part_path
+
+    def close(self):
+        if self.save_separate:
+            return
+        if not self.parts:
+            print("\nNo data within the specified interval to save.")
+            return
+
+        csv_path = os.path.join(self.output_folder, f"{self.file_name}.csv")
+        try:
+            print(f"\nSaving combined data to {csv_path}...")
+            with open(csv_path, 'w', newline='') as out:
+                out.write(','.join(OUTPUT_COLS) + os.linesep)
+                for company in sorted(self.parts):
+                    with open(self.parts[company], newline='') as part:
+                        shutil.copyfileobj(part, out)
+            print("CSV saved successfully.")
+        except Exception as e:
+            print(f"\nError saving CSV file: {e}")
+        finally:
+            shutil.rmtree(self.parts_folder, ignore_errors=True)
+
+
+def _require(module, fmt):
+    try:
+        return __import__(module, fromlist=['_'])
+    except ImportError:
+        raise RuntimeError(f"The '{fmt}' output format needs the '{module.split('.')[0]}' package. "
+                           f"Install it with: pip install {module.split('.')[0]}")
+
+
+class ParquetWriter:
+    """
+    Writes a zstd-compressed Parquet dataset partitioned as Company=<name>/Year=<year>.
+    """
+
+    def __init__(self, file_name, save_separate, output_folder):
+        self.ds = _require('pyarrow.dataset', 'parquet')
+        self.pa = _require('pyarrow', 'parquet')
+        self.path = os.path.join(output_folder, f"{file_name}_parquet")
+        self.parts = 0
+        self.rows = 0
+
+    def write(self, company, df):
+        if df.empty:
+            return
+        table = self.pa.Table.from_pandas(format_output_frame(df), preserve_index=False)
+        self.ds.write_dataset(
+            table, self.path, format='parquet', partitioning=['Company', 'Year'], partitioning_flavor='hive',
+            basename_template=f"part-{self.parts}-{{i}}.parquet", existing_data_behavior='overwrite_or_ignore',
+            file_options=self.ds.ParquetFileFormat().make_write_options(compression='zstd'),
+        )
+        self.parts += 1
+        self.rows += len(df)
+
+    def close(self):
+        if self.parts:
+            print(f"\nSaved Parquet dataset to {self.path}")
+
+
+class FeatherWriter:
+    """
+    Writes one zstd-compressed Feather file per company into <file_name>_feather/.
+    """
+
+    def __init__(self, file_name, save_separate, output_folder):
+        self.feather = _require('pyarrow.feather', 'feather')
+        self.path = os.path.join(output_folder, f"{file_name}_feather")
+        self.files = 0
+        self.rows = 0
+
+    def write(self, company, df):
+        if df.empty:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        frame = format_output_frame(df).reset_index(drop=True)
+        self.feather.write_feather(frame, os.path.join(self.path, f"{safe_name(company)}.feather"), compression='zstd')
+        self.files += 1
+        self.rows += len(frame)
+
+    def close(self):
+        if self.files:
+            print(f"\nSaved {self.files} Feather files to {self.path}")
+
+
+class XlsxStreamWriter:
+    """
+    Writes XLSX output with openpyxl's write-only (streaming) workbook.
+    Combined mode appends every company to one workbook, starting a new sheet
+    whenever Excel's row limit is reached; separate mode writes one workbook per company.
+    """
+
+    MAX_ROWS = 1_048_576
+
+    def __init__(self, file_name, save_separate, output_folder):
+        self.openpyxl = _require('openpyxl', 'xlsx')
+        self.file_name = file_name
+        self.save_separate = save_separate == 'y'
+        self.output_folder = output_folder
+        self.workbook = None
+        self.sheet = None
+        self.sheet_rows = 0
+        self.rows = 0
+
+    def _new_sheet(self):
+        self.sheet = self.workbook.create_sheet(f"OHLC_{len(self.workbook.worksheets) + 1}"
+                                                if self.workbook.worksheets else "OHLC")
+        self.sheet.append(OUTPUT_COLS)
+        self.sheet_rows = 1
+
+    def _append(self, frame):
+        for row in frame.itertuples(index=False, name=None):
+            if self.sheet_rows >= self.MAX_ROWS:
+                self._new_sheet()
+            self.sheet.append(row)
+            self.sheet_rows += 1
+
+    def write(self, company, df):
+        if df.empty:
+            return
+        frame = format_output_frame(df)
+        self.rows += len(frame)
+        if self.save_separate:
+            xlsx_path = os.path.join(self.output_folder, f"{self.file_name}_{safe_name(company)}.xlsx")
+            self.workbook = self.openpyxl.Workbook(write_only=True)
+            self._new_sheet()
+            self._append(frame)
+            self.workbook.save(xlsx_path)
+            print(f" - Saved data to {xlsx_path}")
+            return
+
+        if self.workbook is None:
+            self.workbook = self.openpyxl.Workbook(write_only=True)
+            self._new_sheet()
+        self._append(frame)
+
+    def close(self):
+        if self.save_separate or self.workbook is None:
+            return
+        xlsx_path = os.path.join(self.output_folder, f"{self.file_name}.xlsx")
+        try:
+            print(f"\nSaving combined data to {xlsx_path}...")
+            self.workbook.save(xlsx_path)
+            print("XLSX saved successfully.")
+        except Exception as e:
+            print(f"\nError saving XLSX file: {e}")
+
+
+DATA_WRITERS = {
+    'csv': CsvStreamWriter,
+    'parquet': ParquetWriter,
+    'feather': FeatherWriter,
+    'xlsx': XlsxStreamWriter,
+}
+
+
+class MultiWriter:
+    """
+    Fans every write out to one writer per selected output format.
+    """
+
+    def __init__(self, writers):
+        self.writers = writers
+
+    def write(self, company, df):
+        for writer in self.writers:
+            writer.write(company, df)
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+
+def open_writers(formats, file_name, save_separate, output_folder):
+    """
+    Creates a MultiWriter for the given output format names.
+    """
+    unknown = [fmt for fmt in formats if fmt not in DATA_WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown output format(s): {', '.join(unknown)}. Choose from: {', '.join(DATA_WRITERS)}")
+    return MultiWriter([DATA_WRITERS[fmt](file_name, save_separate, output_folder) for fmt in formats])
+
+
+def read_output(path, fmt):
+    """
+    Reads a Parquet dataset or Feather folder written by this module back into one DataFrame.
+    """
+    if fmt == 'parquet':
+        return _require('pyarrow.dataset', 'parquet').dataset(path, format='parquet', partitioning='hive') \
+            .to_table().to_pandas()
+    if fmt == 'feather':
+        feather = _require('pyarrow.feather', 'feather')
+        files = sorted(f for f in os.listdir(path) if f.endswith('.feather'))
+        return pd.concat([feather.read_feather(os.path.join(path, f)) for f in files], ignore_index=True)
+    return pd.read_csv(path)
+
+
+# --- Analysis Reports ---
+
+def _markdown_table(df, index=True, float_format="%.2f%%"):
+    if index:
+        df = df.reset_index()
+    cells = [[float_format % v if isinstance(v, float) and not pd.isna(v) else ('' if pd.isna(v) else str(v))
+              for v in row] for row in df.itertuples(index=False, name=None)]
+    lines = ["| " + " | ".join(str(c) for c in df.columns) + " |",
+             "|" + "|".join("---" for _ in df.columns) + "|"]
+    lines += ["| " + " | ".join(row) + " |" for row in cells]
+    return "\n".join(lines)
+
+
+def write_analysis_txt(pivot_df, agg_results, path, stats_df=None):
+    with open(path, 'w') as f:
+        f.write("--- Interval Performance Analysis ---\n\n")
+        f.write("Percentage Change (%) within Interval per Year:\n")
+        f.write(pivot_df.to_string(float_format="%.2f%%"))
+        f.write("\n\n--- Aggregate Results ---\n\n")
+        f.write(agg_results.to_string(index=False, float_format="%.2f%%"))
+        if stats_df is not None:
+            f.write("\n\n--- Interval Statistics ---\n\n")
+            f.write(stats_df.to_string(index=False, float_format="%.2f"))
+
+
+def write_analysis_markdown(pivot_df, agg_results, path, stats_df=None):
+    with open(path, 'w') as f:
+        f.write("# Interval Performance Analysis\n\n")
+        f.write("## Percentage Change (%) within Interval per Year\n\n")
+        # One row per company keeps the table readable for wide universes.
+        f.write(_markdown_table(pivot_df.T))
+        f.write("\n\n## Aggregate Results\n\n")
+        f.write(_markdown_table(agg_results, index=False))
+        if stats_df is not None:
+            f.write("\n\n## Interval Statistics\n\n")
+            f.write(_markdown_table(stats_df, index=False, float_format="%.2f"))
+        f.write("\n")
+
+
+ANALYSIS_WRITERS = {
+    'txt': ('_analysis.txt', write_analysis_txt),
+    'md': ('_analysis.md', write_analysis_markdown),
+}
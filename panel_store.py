@@ -0,0 +1,249 @@
+import json
+import os
+import shutil
+
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- Columnar Panel Store ---
+# Daily bars of a whole universe in one folder, one flat binary file per field:
+#
+#     data/panel/date.bin  open.bin  high.bin  low.bin  close.bin  volume.bin  index.json
+#
+# Every symbol's bars are one contiguous, date-sorted run of rows, and
+# index.json maps the symbol to its (offset, length) plus the listing details
+# (company name, ISIN, time zone). Panel opens the files as read-only memory
+# maps, so loading is instant and slicing a symbol or a date range is a view
+# into the page cache rather than a parsed copy.
+
+DEFAULT_PANEL_PATH = os.path.join("data", "panel")
+INDEX_FILE = "index.json"
+BUILD_FOLDER = ".building"
+PANEL_VERSION = 1
+
+# Field name -> (source column, on-disk dtype). Dates are tz-naive exchange-local days.
+FIELDS = {
+    'date': ('Date', '<M8[D]'),
+    'open': ('Open', '<f8'),
+    'high': ('High', '<f8'),
+    'low': ('Low', '<f8'),
+    'close': ('Close', '<f8'),
+    'volume': ('Volume', '<f8'),
+}
+
+_KEY_SCALE = 10000  # month-day keys are at most 1231
+
+
+def _local_days(dates):
+    """
+    Returns the exchange-local calendar days of a Series of (possibly tz-aware) timestamps.
+    """
+    dates = pd.to_datetime(dates)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.to_numpy().astype('datetime64[D]')
+
+
+class PanelWriter:
+    """
+    Appends one symbol at a time to a new panel folder, so a universe can be
+    written straight from the fetch stream without concatenating it in memory.
+    The files are built in a .building subfolder and only replace the previous
+    panel when close() succeeds, so a failed rebuild leaves the old panel intact.
+    """
+
+    def __init__(self, path=DEFAULT_PANEL_PATH):
+        self.path = path
+        self._build_path = os.path.join(path, BUILD_FOLDER)
+        # A leftover .building folder is an interrupted build.
+        shutil.rmtree(self._build_path, ignore_errors=True)
+        os.makedirs(self._build_path)
+        self.rows = 0
+        self.symbols = {}
+        self._companies = {}
+        self._files = {field: open(os.path.join(self._build_path, f"{field}.bin"), 'wb') for field in FIELDS}
+
+    def add(self, symbol, data, company=None, isin=None):
+        """
+        Appends the bars of one symbol (a yfinance history frame after reset_index()).
+        The analysis labels its results by company, so company names must be unique.
+        """
+        company = company or symbol
+        if symbol in self.symbols:
+            raise ValueError(f"Symbol '{symbol}' is already in the panel.")
+        if company in self._companies:
+            raise ValueError(f"Company '{company}' is already in the panel as '{self._companies[company]}'.")
+        if data is None or data.empty:
+            return
+        data = data.sort_values(by='Date')
+        dates = pd.to_datetime(data['Date'])
+        for field, (column, dtype) in FIELDS.items():
+            values = _local_days(dates) if field == 'date' else data[column].to_numpy(dtype='float64')
+            self._files[field].write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        self.symbols[symbol] = {
+            'offset': self.rows,
+            'length': len(data),
+            'company': company,
+            'isin': isin,
+            'tz': str(dates.dt.tz) if dates.dt.tz is not None else None,
+        }
+        self._companies[company] = symbol
+        self.rows += len(data)
+
+    def _close_files(self):
+        for f in self._files.values():
+            f.close()
+
+    def close(self):
+        """
+        Finishes the panel by writing its index and swapping the new files in.
+        """
+        self._close_files()
+        index = {
+            'version': PANEL_VERSION,
+            'rows': self.rows,
+            'fields': {field: dtype for field, (_, dtype) in FIELDS.items()},
+            'symbols': self.symbols,
+        }
+        with open(os.path.join(self._build_path, INDEX_FILE), 'w') as f:
+            json.dump(index, f)
+        # The old index goes first and the new one last, so a reader opening the folder
+        # mid-swap finds no index rather than a mix of old and new files.
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        for field in FIELDS:
+            os.replace(os.path.join(self._build_path, f"{field}.bin"), os.path.join(self.path, f"{field}.bin"))
+        os.replace(os.path.join(self._build_path, INDEX_FILE), index_path)
+        os.rmdir(self._build_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A failed build is discarded and the previous panel is kept.
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_files()
+            shutil.rmtree(self._build_path, ignore_errors=True)
+
+
+class PanelGroups:
+    """
+    The per-(symbol, year) layout the interval analysis works on (see
+    IntervalSweep): sorted (group, month-day) keys, the price columns, and the
+    Company/Year label of every group. The price columns are the panel's memory maps.
+    """
+
+    def __init__(self, panel):
+        order = sorted(panel.symbols, key=lambda symbol: panel.index[symbol]['offset'])
+        lengths = np.array([panel.index[symbol]['length'] for symbol in order], dtype=np.int64)
+        symbol_ids = np.repeat(np.arange(len(order)), lengths)
+
+        dates = panel.columns['date']
+        years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+        months = dates.astype('datetime64[M]')
+        month_day = (months.astype(np.int64) % 12 + 1) * 100 + (dates - months).astype(np.int64) + 1
+
+        changed = (symbol_ids[1:] != symbol_ids[:-1]) | (years[1:] != years[:-1])
+        codes = np.r_[0, np.cumsum(changed)] if len(dates) else np.empty(0, dtype=np.int64)
+        self.keys = codes * _KEY_SCALE + month_day
+        self.open = panel.columns['open']
+        self.high = panel.columns['high']
+        self.low = panel.columns['low']
+        self.close = panel.columns['close']
+        self.volume = panel.columns['volume']
+
+        self.group_starts = np.r_[0, np.flatnonzero(changed) + 1] if len(dates) else np.empty(0, dtype=np.int64)
+        names = np.array([panel.index[symbol]['company'] for symbol in order], dtype=object)
+        self.companies = names[symbol_ids[self.group_starts]]
+        self.years = years[self.group_starts].astype(np.int16)
+        self.group_base = np.arange(len(self.group_starts), dtype=np.int64) * _KEY_SCALE
+        self.company_dtype = pd.CategoricalDtype(sorted(set(names)))
+
+
+class Panel:
+    """
+    Read-only, memory-mapped view of a panel folder written by PanelWriter.
+    """
+
+    def __init__(self, path=DEFAULT_PANEL_PATH):
+        self.path = path
+        index_path = os.path.join(path, INDEX_FILE)
+        if not os.path.exists(index_path):
+            raise ValueError(f"'{path}' is not a finished panel (no {INDEX_FILE}).")
+        with open(index_path) as f:
+            meta = json.load(f)
+        if meta.get('version') != PANEL_VERSION:
+            raise ValueError(f"The panel '{path}' has version {meta.get('version')}, expected {PANEL_VERSION}.")
+        self.index = meta['symbols']
+        self.rows = meta['rows']
+        self.columns = {
+            field: np.memmap(os.path.join(path, f"{field}.bin"), dtype=dtype, mode='r', shape=(self.rows,))
+            if self.rows else np.empty(0, dtype=dtype)
+            for field, dtype in meta['fields'].items()
+        }
+        self._groups = None
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    @property
+    def symbols(self):
+        return list(self.index)
+
+    def groups(self):
+        """
+        Returns the PanelGroups of the whole panel, built on first use.
+        """
+        if self._groups is None:
+            self._groups = PanelGroups(self)
+        return self._groups
+
+    def slice(self, symbol, start=None, end=None):
+        """
+        Returns {field: array} for one symbol's bars on days in [start, end).
+        The arrays are views into the memory-mapped files; nothing is copied.
+        """
+        entry = self.index[symbol]
+        lo, hi = entry['offset'], entry['offset'] + entry['length']
+        dates = self.columns['date'][lo:hi]
+        if start is not None:
+            lo += int(np.searchsorted(dates, np.datetime64(pd.Timestamp(start).date(), 'D'), side='left'))
+        if end is not None:
+            hi = entry['offset'] + int(np.searchsorted(dates, np.datetime64(pd.Timestamp(end).date(), 'D'),
+                                                       side='left'))
+        return {field: column[lo:max(lo, hi)] for field, column in self.columns.items()}
+
+    def frame(self, symbols=None, start=None, end=None):
+        """
+        Copies the selected symbols and days into a DataFrame in the compact
+        layout (see compact_frame.py), for code that needs a DataFrame.
+        """
+        symbols = self.symbols if symbols is None else list(symbols)
+        companies = pd.CategoricalDtype(sorted({self.index[symbol]['company'] for symbol in symbols}))
+        frames = []
+        for symbol in symbols:
+            bars = self.slice(symbol, start, end)
+            if not len(bars['date']):
+                continue
+            frame = pd.DataFrame({column: np.array(bars[field]) for field, (column, _) in FIELDS.items()})
+            frame['Date'] = frame['Date'].astype('datetime64[ns]')
+            frame.insert(1, 'Company', pd.Categorical([self.index[symbol]['company']] * len(frame),
+                                                      dtype=companies))
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=['Date', 'Company', 'Year', 'MonthDay', 'Open', 'High', 'Low', 'Close',
+                                         'Volume'])
+        full_df = pd.concat(frames, ignore_index=True)
+        if not full_df['Volume'].isna().any():
+            full_df['Volume'] = full_df['Volume'].astype('int64')
+        full_df.insert(2, 'Year', full_df['Date'].dt.year.astype('int16'))
+        full_df.insert(3, 'MonthDay', (full_df['Date'].dt.month * 100 + full_df['Date'].dt.day).astype('int16'))
+        return full_df.sort_values(by=['Company', 'Date'], kind='stable', ignore_index=True)
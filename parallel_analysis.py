@@ -0,0 +1,228 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from interval_kernels import STAT_COLS, parse_month_day, segment_stats, window_bounds
+from interval_sweep import IntervalSweep, window_changes
+from lazy_imports import lazy_import
+from panel_store import Panel
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- Sharded Analysis ---
+# Spreads the interval analysis over a process pool. The sorted month-day keys
+# and the OHLCV columns are copied once into shared memory, and every
+# worker reads them in place for its shard of companies, so no DataFrame is
+# ever pickled. Workers write their results into a shared (interval x group)
+# output matrix as well, leaving only tiny task descriptions to send around.
+
+DEFAULT_ANALYSIS_WORKERS = os.cpu_count() or 1
+
+_worker_arrays = {}
+
+
+def _to_shared(array):
+    """
+    Copies a NumPy array into a new shared memory block. Returns (block, spec),
+    where spec is the picklable (name, shape, dtype) description of the array.
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    # Pool workers share the parent's resource tracker, so the parent's unlink()
+    # is the only cleanup a block needs.
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _init_worker(specs):
+    for key, spec in specs.items():
+        _worker_arrays[key] = _attach(spec)
+
+
+def _shard(group_range, row_range):
+    """
+    Returns the worker's views of the shared inputs for groups [g0, g1), whose rows are [r0, r1).
+    """
+    (g0, g1), (r0, r1) = group_range, row_range
+    rows = {key: array[r0:r1] for key, (_, array) in _worker_arrays.items() if key != 'group_base'}
+    return rows, _worker_arrays['group_base'][1][g0:g1]
+
+
+def _analyse_shard(group_range, row_range, windows, outputs):
+    """
+    Worker task: evaluates every (start_key, end_key) window for one shard and
+    writes (valid, pct_change) into the shared outputs.
+    """
+    g0, g1 = group_range
+    rows, group_base = _shard(group_range, row_range)
+    (valid_block, valid_out), (pct_block, pct_out) = _attach(outputs[0]), _attach(outputs[1])
+    try:
+        for i, (start_key, end_key) in enumerate(windows):
+            valid, pct_change = window_changes(rows['keys'], rows['open'], rows['close'], group_base,
+                                               start_key, end_key)
+            valid_out[i, g0:g1] = valid
+            pct_out[i, g0:g1] = pct_change
+    finally:
+        del valid_out, pct_out
+        valid_block.close()
+        pct_block.close()
+    return g1 - g0
+
+
+def _stats_shard(group_range, row_range, window, output):
+    """
+    Worker task: computes segment_stats() of one window for one shard and
+    writes it into the shared (STAT_COLS x group) output.
+    """
+    g0, g1 = group_range
+    rows, group_base = _shard(group_range, row_range)
+    lo, hi = window_bounds(rows['keys'], group_base, *window)
+    _, stats = segment_stats(lo, hi, rows['open'], rows['high'], rows['low'], rows['close'], rows['volume'])
+    block, out = _attach(output)
+    try:
+        for i, col in enumerate(STAT_COLS):
+            out[i, g0:g1] = stats[col]
+    finally:
+        del out
+        block.close()
+    return g1 - g0
+
+
+class ShardedAnalysis(IntervalSweep):
+    """
+    IntervalSweep whose queries run on a process pool, sharded by company.
+    Use as a context manager (or call shutdown()) to stop the pool and release
+    the shared memory.
+    """
+
+    def __init__(self, full_df, workers=DEFAULT_ANALYSIS_WORKERS, shards_per_worker=4):
+        super().__init__(full_df)
+        self.workers = max(1, workers)
+        self.shards = self._plan_shards(self.workers * shards_per_worker)
+        self._blocks = []
+        self._pool = None
+        self._inputs = {}
+        for key, array in (('keys', self.keys), ('open', self.open), ('high', self.high), ('low', self.low),
+                           ('close', self.close), ('volume', self.volume), ('group_base', self.group_base)):
+            block, spec = _to_shared(np.ascontiguousarray(array))
+            self._blocks.append(block)
+            self._inputs[key] = spec
+
+    def _plan_shards(self, count):
+        """
+        Splits the groups into about `count` shards of similar row counts, never
+        splitting a company across shards. Returns [((g0, g1), (r0, r1)), ...].
+        """
+        n_groups, n_rows = len(self.group_base), len(self.keys)
+        if not n_groups:
+            return []
+        company_starts = np.r_[0, np.flatnonzero(self.companies[1:] != self.companies[:-1]) + 1]
+        row_starts = np.r_[self.group_starts, n_rows]
+        target = n_rows / max(1, count)
+        shards, g0 = [], 0
+        for g in list(company_starts[1:]) + [n_groups]:
+            if row_starts[g] - row_starts[g0] >= target or g == n_groups:
+                shards.append(((int(g0), int(g)), (int(row_starts[g0]), int(row_starts[g]))))
+                g0 = g
+        return shards
+
+    def _get_pool(self):
+        if self._pool is None:
+            # The pool lives as long as this object, so a run's analysis and sweep share its workers.
+            self._pool = ProcessPoolExecutor(max_workers=min(self.workers, len(self.shards)),
+                                             initializer=_init_worker, initargs=(self._inputs,))
+        return self._pool
+
+    def _stats(self, interval):
+        """
+        Same (valid, stats) as IntervalSweep._stats(), filled in by the pool.
+        """
+        if not self.shards:
+            return super()._stats(interval)
+        window = (parse_month_day(interval[0]), parse_month_day(interval[1]))
+        pool = self._get_pool()
+        block, spec = _to_shared(np.full((len(STAT_COLS), len(self.group_base)), np.nan))
+        try:
+            futures = [pool.submit(_stats_shard, groups, rows, window, spec) for groups, rows in self.shards]
+            for future in futures:
+                future.result()
+            out = np.ndarray((len(STAT_COLS), len(self.group_base)), dtype=np.float64, buffer=block.buf).copy()
+        finally:
+            block.close()
+            block.unlink()
+        stats = dict(zip(STAT_COLS, out))
+        return ~np.isnan(stats['Days']), stats
+
+    def _run(self, intervals):
+        """
+        Same matrices as IntervalSweep._run(), filled in by the pool.
+        """
+        windows = [(parse_month_day(start), parse_month_day(end)) for start, end in intervals]
+        shape = (len(windows), len(self.group_base))
+        if not self.shards or not windows:
+            return super()._run(intervals)
+
+        pool = self._get_pool()
+        valid_block, valid_spec = _to_shared(np.zeros(shape, dtype=bool))
+        pct_block, pct_spec = _to_shared(np.full(shape, np.nan))
+        try:
+            futures = [pool.submit(_analyse_shard, groups, rows, windows, (valid_spec, pct_spec))
+                       for groups, rows in self.shards]
+            for future in futures:
+                future.result()
+            valid = np.ndarray(shape, dtype=bool, buffer=valid_block.buf).copy()
+            pct_change = np.ndarray(shape, dtype=np.float64, buffer=pct_block.buf).copy()
+        finally:
+            for block in (pct_block, valid_block):
+                block.close()
+                block.unlink()
+        return valid, pct_change
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def parallel_interval_stats(full_df, interval, workers=DEFAULT_ANALYSIS_WORKERS, analysis=None):
+    """
+    Sharded counterpart of interval_stats(): returns the same
+    (Company, Year, STAT_COLS...) frame. Runs on `analysis`, an open
+    ShardedAnalysis of `full_df`, when given, instead of starting a new pool.
+    """
+    if analysis is None:
+        with ShardedAnalysis(full_df, workers) as analysis:
+            return parallel_interval_stats(full_df, interval, workers, analysis)
+    stats_df = analysis.stats(interval)
+    if isinstance(full_df, Panel):
+        stats_df['Company'] = stats_df['Company'].astype(full_df.groups().company_dtype)
+        return stats_df.sort_values(by=['Company', 'Year'], ignore_index=True)
+    stats_df['Company'] = stats_df['Company'].astype(full_df['Company'].dtype)
+    return stats_df
+
+
+def parallel_sweep(full_df, intervals, workers=DEFAULT_ANALYSIS_WORKERS, analysis=None):
+    """
+    Sharded counterpart of sweep_intervals(). Runs on `analysis` when given,
+    as parallel_interval_stats() does.
+    """
+    if analysis is None:
+        with ShardedAnalysis(full_df, workers) as analysis:
+            return analysis.sweep(intervals)
+    return analysis.sweep(intervals)
@@ -0,0 +1,93 @@
+from interval_kernels import frame_month_day, interval_stats, parse_month_day
+from interval_sweep import IntervalSweep
+from lazy_imports import lazy_import
+from timeframes import resample_frame
+
+pd = lazy_import('pandas')
+
+# --- Streaming Pipeline ---
+# Moves each ticker through filter -> round -> write as soon as it is fetched and
+# keeps only the small per-(Company, Year) analysis rows, so peak memory is
+# roughly that of one ticker instead of the whole universe.
+
+
+def prepare_company_frame(data, company, current_year):
+    """
+    Adds the Company and Year columns to one ticker's history and drops the
+    current, incomplete year.
+    """
+    data['Company'] = company
+    data['Year'] = data['Date'].dt.year
+    data = data[data['Year'] < current_year]
+    return data.sort_values(by='Date')
+
+
+def filter_to_interval(df, interval):
+    """
+    Keeps the rows whose calendar day falls inside the ('MM-DD','MM-DD') interval.
+    """
+    md = frame_month_day(df)
+    return df[(md >= parse_month_day(interval[0])) & (md <= parse_month_day(interval[1]))]
+
+
+class StreamingRun:
+    """
+    Consumes one company at a time: writes its interval rows (as `timeframe`
+    bars) and accumulates its interval analysis (and optional sweep) results.
+    """
+
+    def __init__(self, interval, current_year, writer, sweep=(), analyse=interval_stats, timeframe='1d'):
+        self.interval = interval
+        self.timeframe = timeframe
+        self.analyse = analyse
+        self.current_year = current_year
+        self.writer = writer
+        self.sweep = list(sweep)
+        self.companies = 0
+        self._changes = []
+        self._sweeps = []
+
+    def add(self, company, data):
+        company_df = prepare_company_frame(data, company, self.current_year)
+        if company_df.empty:
+            return
+        self.companies += 1
+
+        self.writer.write(company, resample_frame(filter_to_interval(company_df, self.interval), self.timeframe))
+        self._changes.append(self.analyse(company_df, self.interval))
+        if self.sweep:
+            self._sweeps.append(IntervalSweep(company_df).sweep(self.sweep))
+
+    def finish(self):
+        """
+        Closes the writer and returns the accumulated (results_df, sweep_df).
+        """
+        self.writer.close()
+        results_df = pd.concat(self._changes, ignore_index=True) if self._changes else None
+        if results_df is not None:
+            results_df = results_df.sort_values(by=['Company', 'Year'], ignore_index=True)
+
+        sweep_df = None
+        if self._sweeps:
+            order = {f"{start},{end}": i for i, (start, end) in enumerate(self.sweep)}
+            sweep_df = pd.concat(self._sweeps, ignore_index=True)
+            sweep_df = sweep_df.sort_values(
+                by=['Interval', 'Company', 'Year'], key=lambda col: col.map(order) if col.name == 'Interval' else col,
+                ignore_index=True
+            )
+        return results_df, sweep_df
+
+
+def stream_outputs(results, interval, current_year, writer, sweep=(), analyse=interval_stats, timeframe='1d'):
+    """
+    Runs a StreamingRun over an iterable of FetchResults, sending the interval
+    rows to `writer` (see output_engines.open_writers). `analyse` computes the
+    interval results of each company (interval_stats() or a results store's)
+    and `timeframe` the bar size of the written rows. Returns (companies processed, results_df, sweep_df).
+    """
+    run = StreamingRun(interval, current_year, writer, sweep, analyse, timeframe)
+    for result in results:
+        if result.data is not None:
+            run.add(result.company, result.data)
+    results_df, sweep_df = run.finish()
+    return run.companies, results_df, sweep_df
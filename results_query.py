@@ -0,0 +1,158 @@
+from datetime import datetime
+
+from interval_kernels import summarise_interval_stats
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- Interval Results Screening ---
+# Ranks and filters the per-symbol interval summaries (summarise_interval_stats)
+# of a whole universe in process. Every numeric column is argsorted once when
+# the index is built, so a top-N query walks a precomputed order and a range
+# filter (e.g. Win_Rate >= 80) is two binary searches on the sorted values.
+# Listing attributes from the NSE/BSE files are categorical codes, so
+# attribute filters are integer comparisons. A query over the ~2,000 NSE
+# symbols takes about a millisecond (benchmarks/bench_screening.py).
+#
+#     index = ResultsIndex.from_store(AnalysisStore(), ('10-01', '10-15'), universe=load_universe())
+#     index.screen(top=20, min_years=5, min_win_rate=80, series=['EQ'])
+
+NUMERIC_COLS = ['Years', 'Avg_Pct_Change', 'Median_Pct_Change', 'Std_Pct_Change', 'Win_Rate', 'Avg_Range_Pct',
+                'Worst_Drawdown_Pct', 'Avg_Volatility_Pct', 'Avg_Volume']
+
+# Result column -> Listing field (see universe.py).
+LISTING_COLS = {
+    'ISIN': 'isin',
+    'Name': 'name',
+    'NSE_Series': 'nse_series',
+    'BSE_Group': 'bse_group',
+    'BSE_Status': 'bse_status',
+}
+
+
+def _listing_attributes(keys, universe):
+    """
+    Returns LISTING_COLS for every key (ticker, symbol, ISIN or company name).
+    """
+    by_name = {listing.name: listing for listing in universe.listings}
+    rows = []
+    for key in keys:
+        listing = universe.lookup(str(key)) or by_name.get(str(key))
+        rows.append([getattr(listing, field) if listing else None for field in LISTING_COLS.values()])
+    return pd.DataFrame(rows, columns=list(LISTING_COLS))
+
+
+class ResultsIndex:
+    """
+    Sorted indexes over one summary row per symbol (or company). Build it with
+    from_store() or from_stats() and query it with where() and screen().
+    """
+
+    def __init__(self, summary_df, key='Symbol', universe=None):
+        frame = summary_df.reset_index(drop=True)
+        if universe is not None:
+            frame = pd.concat([frame, _listing_attributes(frame[key], universe)], axis=1)
+        self.key = key
+        self.frame = frame
+        self.columns = {}
+        self._order = {}
+        self._descending = {}
+        self._sorted = {}
+        for col in [c for c in NUMERIC_COLS if c in frame.columns]:
+            values = frame[col].to_numpy(dtype='float64', na_value=np.nan)
+            order = np.argsort(values, kind='stable')  # NaNs sort last
+            self.columns[col] = values
+            self._order[col] = order
+            # Sorted separately rather than reversed, so ties keep the row order (by key) both ways.
+            self._descending[col] = np.argsort(-values, kind='stable')
+            self._sorted[col] = values[order]
+        self._codes = {}
+        for col in [c for c in LISTING_COLS if c in frame.columns]:
+            self._codes[col] = pd.Categorical(frame[col].astype(object))
+        # The exchange is that of the ticker (.NS or .BO), so it is only known for ticker keys.
+        if key == 'Symbol':
+            suffix = frame[key].astype(str).str.extract(r'\.(NS|BO)$', expand=False)
+            self._codes['Exchange'] = pd.Categorical(suffix.map({'NS': 'NSE', 'BO': 'BSE'}))
+
+    def __len__(self):
+        return len(self.frame)
+
+    @classmethod
+    def from_stats(cls, stats_df, universe=None):
+        """
+        Builds the index from per-(Company, Year) interval_stats() rows, keyed by Company.
+        """
+        return cls(summarise_interval_stats(stats_df), key='Company', universe=universe)
+
+    @classmethod
+    def from_store(cls, store, interval, years=None, include_current_year=False, universe=None):
+        """
+        Builds the index from every symbol in an AnalysisStore for the interval,
+        keyed by Symbol. Only complete years are used unless `include_current_year`,
+        and only the last `years` of them if given.
+        """
+        stored = store.load(None, interval)
+        current_year = datetime.now().year
+        last_year = current_year if include_current_year else current_year - 1
+        keep = (stored['Days'] > 0).fillna(False) & (stored['Year'] <= last_year)
+        if years:
+            keep &= stored['Year'] > last_year - years
+        stats_df = stored[keep.to_numpy(dtype=bool)].rename(columns={'Symbol': 'Company'})
+        summary = summarise_interval_stats(stats_df).rename(columns={'Company': 'Symbol'})
+        return cls(summary, key='Symbol', universe=universe)
+
+    def where(self, col, low=None, high=None):
+        """
+        Returns the boolean row mask of low <= col <= high (either bound may be None).
+        """
+        ordered = self._sorted[col]
+        start = 0 if low is None else int(np.searchsorted(ordered, low, side='left'))
+        # NaNs sort last and never match.
+        end = int(np.searchsorted(ordered, np.inf, side='right')) if high is None else \
+            int(np.searchsorted(ordered, high, side='right'))
+        mask = np.zeros(len(self.frame), dtype=bool)
+        mask[self._order[col][start:max(start, end)]] = True
+        return mask
+
+    def is_in(self, col, values):
+        """
+        Returns the boolean row mask of rows whose listing attribute `col` is one of `values`.
+        """
+        codes = self._codes[col]
+        wanted = [i for i, category in enumerate(codes.categories) if category in set(values)]
+        return np.isin(codes.codes, wanted)
+
+    def screen(self, sort='Avg_Pct_Change', top=20, ascending=False, min_years=None, min_win_rate=None, ranges=None,
+               exchanges=None, series=None, groups=None, mask=None):
+        """
+        Returns the `top` rows by `sort` (highest first unless `ascending`) that pass
+        every filter: at least `min_years` years, a Win_Rate of at least `min_win_rate`
+        percent, `ranges` as {col: (low, high)}, listing exchanges ('NSE'/'BSE'),
+        NSE series and BSE groups, and an optional precomputed boolean `mask`.
+        Ties are ranked in key order. top=None returns every passing row.
+        """
+        passing = np.ones(len(self.frame), dtype=bool) if mask is None else mask.copy()
+        ranges = dict(ranges or {})
+        if min_years is not None:
+            ranges['Years'] = (min_years, None)
+        if min_win_rate is not None:
+            ranges['Win_Rate'] = (min_win_rate, None)
+        for col, (low, high) in ranges.items():
+            passing &= self.where(col, low, high)
+        for col, values in (('Exchange', exchanges), ('NSE_Series', series), ('BSE_Group', groups)):
+            if values:
+                if col == 'Exchange' and col not in self._codes:
+                    raise ValueError("Filtering by Exchange needs an index keyed by ticker Symbol.")
+                if col not in self._codes:
+                    raise ValueError(f"Filtering by {col} needs the listing attributes (pass a universe).")
+                passing &= self.is_in(col, [value.upper() for value in values])
+
+        order = self._order[sort] if ascending else self._descending[sort]
+        valid = order[:int(np.searchsorted(self._sorted[sort], np.inf, side='right'))]
+        picked = valid[passing[valid]]
+        if top is not None:
+            picked = picked[:top]
+        result = self.frame.iloc[picked].reset_index(drop=True)
+        result.insert(0, 'Rank', np.arange(1, len(result) + 1))
+        return result
@@ -0,0 +1,167 @@
+import cProfile
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# --- Run Metrics ---
+# Machine-readable instrumentation for one run: wall and CPU time per stage,
+# per-ticker fetch latency, retry/empty/error counts, rows fetched and bytes
+# written. Stages may nest (the fetch generator is consumed inside the concat
+# stage), so each stage records its own time without that of nested stages.
+
+METRICS_FILE = "metrics.json"
+PROFILE_FILE = "profile.pstats"
+
+# Upper bounds (seconds) of the fetch latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 5, 10, 30]
+
+
+class RunMetrics:
+    """
+    Collects stage timings and fetch statistics and writes them to metrics.json.
+    CPU time is process CPU time, so it includes the fetch worker threads.
+    """
+
+    def __init__(self, slowest=20):
+        self.started_at = time.time()
+        self.stages = {}
+        self.tickers = {}
+        self.slowest = slowest
+        self._open = []
+
+    def _add(self, name, wall, cpu):
+        stage = self.stages.setdefault(name, {'wall_s': 0.0, 'cpu_s': 0.0, 'calls': 0})
+        stage['wall_s'] += wall
+        stage['cpu_s'] += cpu
+        stage['calls'] += 1
+        if self._open:
+            self._open[-1][0] += wall
+            self._open[-1][1] += cpu
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Times the enclosed block as stage `name`; repeated stages accumulate.
+        """
+        nested = [0.0, 0.0]
+        self._open.append(nested)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self._open.pop()
+            self._add(name, time.perf_counter() - wall - nested[0], time.process_time() - cpu - nested[1])
+            if self._open:
+                # _add() credited the outer stage with our self time only; add the nested time too.
+                self._open[-1][0] += nested[0]
+                self._open[-1][1] += nested[1]
+
+    def track_fetches(self, results, name='fetch'):
+        """
+        Wraps an iterable of FetchResults, timing the wait for each one as stage
+        `name` and recording its latency and outcome.
+        """
+        iterator = iter(results)
+        while True:
+            with self.stage(name):
+                result = next(iterator, None)
+            if result is None:
+                return
+            self.record_fetch(result)
+            yield result
+
+    def record_fetch(self, result):
+        if result.error:
+            status = 'error'
+        elif result.data is None:
+            status = 'empty'
+        else:
+            status = 'ok'
+        self.tickers[result.company] = {
+            'ticker': result.ticker,
+            'status': status,
+            'source': result.source,
+            'attempts': result.attempts,
+            'batch_size': result.batch_size,
+            'latency_s': round(result.elapsed, 4),
+            'rows': 0 if result.data is None else len(result.data),
+        }
+
+    def fetch_summary(self):
+        fetched = [t for t in self.tickers.values() if t['source'] == 'fetched']
+        counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        for ticker in fetched:
+            counts[sum(ticker['latency_s'] > bound for bound in LATENCY_BUCKETS)] += 1
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        slowest = sorted(fetched, key=lambda t: t['latency_s'], reverse=True)[:self.slowest]
+        return {
+            'tickers': len(self.tickers),
+            'from_cache': sum(t['source'] == 'cache' for t in self.tickers.values()),
+            'from_journal': sum(t['source'] == 'journal' for t in self.tickers.values()),
+            'ok': sum(t['status'] == 'ok' for t in self.tickers.values()),
+            'empty': sum(t['status'] == 'empty' for t in self.tickers.values()),
+            'errors': sum(t['status'] == 'error' for t in self.tickers.values()),
+            # Every company of a bulk download carries the attempts of its whole chunk.
+            'retries': round(sum(max(t['attempts'] - 1, 0) / t['batch_size'] for t in fetched)),
+            'rows': sum(t['rows'] for t in self.tickers.values()),
+            'latency_histogram': dict(zip(labels, counts)),
+            'slowest': [{'ticker': t['ticker'], 'latency_s': t['latency_s'], 'attempts': t['attempts']}
+                        for t in slowest],
+        }
+
+    def write(self, output_folder, **extra):
+        """
+        Writes metrics.json into the run folder, including the total size of
+        every file written there. Returns the path.
+        """
+        bytes_written = 0
+        for root, _, files in os.walk(output_folder):
+            bytes_written += sum(os.path.getsize(os.path.join(root, f)) for f in files if f != METRICS_FILE)
+
+        stages = {name: {'wall_s': round(s['wall_s'], 4), 'cpu_s': round(s['cpu_s'], 4), 'calls': s['calls']}
+                  for name, s in self.stages.items()}
+        metrics = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            'total_wall_s': round(time.time() - self.started_at, 4),
+            **extra,
+            'stages': stages,
+            'fetch': self.fetch_summary(),
+            'bytes_written': bytes_written,
+            'per_ticker': self.tickers,
+        }
+        path = os.path.join(output_folder, METRICS_FILE)
+        with open(path, 'w') as f:
+            json.dump(metrics, f, indent=2, default=str)
+        return path
+
+    @contextmanager
+    def recorded_to(self, output_folder, **extra):
+        """
+        Writes metrics.json into `output_folder` when the enclosed block ends,
+        whether it finished, failed or was interrupted.
+        """
+        try:
+            yield self
+        finally:
+            print(f"\nSaved run metrics to {self.write(output_folder, **extra)}")
+
+
+@contextmanager
+def profiled(output_folder, enabled=True):
+    """
+    Runs the enclosed block under cProfile and dumps the stats to
+    profile.pstats in the run folder (view with `python -m pstats`).
+    """
+    if not enabled:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = os.path.join(output_folder, PROFILE_FILE)
+        profiler.dump_stats(path)
+        print(f"\nSaved profile to {path}")
@@ -0,0 +1,120 @@
+import argparse
+import os
+import re
+import sys
+
+from analysis_store import DEFAULT_RESULTS_STORE_PATH, AnalysisStore, adjustment_version
+from lazy_imports import lazy_import
+from OHLC_Extractor_v2 import parse_interval
+from results_query import NUMERIC_COLS, ResultsIndex
+from universe import load_universe
+
+pd = lazy_import('pandas')
+
+# --- Results Screener ---
+# Command-line front end of results_query.ResultsIndex. Ranks the symbols of
+# an interval from the results store (--results-store runs or eod_updater.py),
+# or from a run's <name>_interval_stats.csv, e.g.
+#
+#     python screen_results.py --interval 10-01,10-15 --min-years 5 --min-win-rate 80 --top 25
+#     python screen_results.py --interval 10-01,10-15 --sort Avg_Volatility_Pct --ascending --series EQ \
+#         --filter "Avg_Pct_Change>=1" --filter "Avg_Volume>=100000"
+#     python screen_results.py --stats data/run_<timestamp>/october_interval_stats.csv --top 10
+
+_FILTER = re.compile(r'^\s*(\w+)\s*(>=|<=)\s*(-?[\d.]+(?:e-?\d+)?)\s*$')
+
+
+def parse_filter(value):
+    """
+    Parses 'Column>=number' or 'Column<=number' into (column, low, high).
+    """
+    match = _FILTER.match(value)
+    if not match or match.group(1) not in NUMERIC_COLS:
+        raise argparse.ArgumentTypeError(
+            f"Expected 'Column>=number' or 'Column<=number' with a column among {', '.join(NUMERIC_COLS)}.")
+    column, op, number = match.group(1), match.group(2), float(match.group(3))
+    return (column, number, None) if op == '>=' else (column, None, number)
+
+
+def _list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def build_screen_parser():
+    parser = argparse.ArgumentParser(description="Rank and filter stored interval results across symbols.")
+    parser.add_argument("--interval", type=parse_interval, help="Interval 'MM-DD,MM-DD' to screen (results store).")
+    parser.add_argument("--results-store", default=DEFAULT_RESULTS_STORE_PATH,
+                        help=f"Results store to read (default: {DEFAULT_RESULTS_STORE_PATH}).")
+    parser.add_argument("--adjust", choices=['yahoo', 'local'], default='yahoo',
+                        help="Price adjustment the stored results were computed with (default: yahoo).")
+    parser.add_argument("--stats", metavar="CSV", help="Screen a run's <name>_interval_stats.csv instead of the store.")
+    parser.add_argument("--years", type=int, help="Only use the last N complete years.")
+    parser.add_argument("--include-current-year", action="store_true",
+                        help="Also use the current, incomplete year (kept current by eod_updater.py).")
+    parser.add_argument("--sort", choices=NUMERIC_COLS, default='Avg_Pct_Change',
+                        help="Column to rank by (default: Avg_Pct_Change).")
+    parser.add_argument("--ascending", action="store_true", help="Rank the lowest values first.")
+    parser.add_argument("--top", type=int, default=20, help="Number of rows to show; 0 for all (default: 20).")
+    parser.add_argument("--min-years", type=int, help="Only symbols with at least this many years of results.")
+    parser.add_argument("--min-win-rate", type=float, help="Only symbols that rose in at least this %% of years.")
+    parser.add_argument("--filter", type=parse_filter, action='append', default=[],
+                        help="Extra 'Column>=number' or 'Column<=number' filter; may be repeated.")
+    parser.add_argument("--exchange", type=_list,
+                        help="Comma-separated exchanges of the ticker: NSE, BSE (results store only).")
+    parser.add_argument("--series", type=_list, help="Comma-separated NSE series, e.g. EQ.")
+    parser.add_argument("--bse-groups", type=_list, help="Comma-separated BSE groups, e.g. A,B.")
+    parser.add_argument("--no-listings", action="store_true",
+                        help="Do not join the NSE/BSE listing attributes (ISIN, name, series, group).")
+    parser.add_argument("--output", metavar="CSV", help="Also save the screened rows to this CSV file.")
+    return parser
+
+
+def main(argv=None):
+    """
+    Builds a ResultsIndex from the store or a stats CSV and prints the screened rows.
+    """
+    parser = build_screen_parser()
+    args = parser.parse_args(argv)
+    if not args.stats and not args.interval:
+        parser.error("Give --interval to screen the results store, or --stats to screen a run's statistics.")
+    if (args.exchange or args.series or args.bse_groups) and args.no_listings:
+        parser.error("--exchange, --series and --bse-groups need the listing attributes; drop --no-listings.")
+    if args.exchange and args.stats:
+        parser.error("--exchange needs the tickers of the results store; a stats CSV is keyed by company name.")
+
+    universe = None if args.no_listings else load_universe()
+    try:
+        if args.stats:
+            index = ResultsIndex.from_stats(pd.read_csv(args.stats), universe=universe)
+        else:
+            if not os.path.exists(args.results_store):
+                raise OSError(f"No results store at '{args.results_store}'. Fill it with --results-store runs "
+                              f"or eod_updater.py.")
+            store = AnalysisStore(args.results_store, adjustment=adjustment_version(args.adjust))
+            index = ResultsIndex.from_store(store, args.interval, args.years, args.include_current_year, universe)
+            store.close()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    ranges = {}
+    for column, low, high in args.filter:
+        current_low, current_high = ranges.get(column, (None, None))
+        ranges[column] = (low if low is not None else current_low, high if high is not None else current_high)
+    try:
+        screened = index.screen(args.sort, args.top or None, args.ascending, args.min_years, args.min_win_rate,
+                                ranges, args.exchange, args.series, args.bse_groups)
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"{len(screened)} of {len(index)} symbols, ranked by {args.sort} "
+          f"({'lowest' if args.ascending else 'highest'} first):\n")
+    print(screened.to_string(index=False, float_format=lambda value: f"{value:.2f}") if len(screened) else "(none)")
+    if args.output:
+        screened.to_csv(args.output, index=False)
+        print(f"\nSaved the screened rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import threading
+
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+yf = lazy_import('yfinance')
+
+# --- Timeframes ---
+# Every timeframe of a ticker is derived from the finest bars already fetched
+# for it: 5m, 15m and 1h bars from 1m bars, weekly and monthly bars from daily
+# bars, and so on. BarSource keeps the fetched bars of each ticker and only
+# goes back to Yahoo when no stored series is fine enough or long enough.
+
+# Timeframe -> pandas resampling rule.
+TIMEFRAMES = {
+    '1m': '1min',
+    '2m': '2min',
+    '5m': '5min',
+    '15m': '15min',
+    '30m': '30min',
+    '1h': '60min',
+    '1d': 'D',
+    '1wk': 'W-MON',
+    '1mo': 'MS',
+}
+INTRADAY = ('1m', '2m', '5m', '15m', '30m', '1h')
+
+# How far back Yahoo serves each intraday granularity, in days.
+MAX_LOOKBACK_DAYS = {'1m': 7, '2m': 60, '5m': 60, '15m': 60, '30m': 60, '1h': 730}
+
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def _minutes(timeframe):
+    return pd.Timedelta(TIMEFRAMES[timeframe]) // pd.Timedelta(minutes=1)
+
+
+def derivable(base, timeframe):
+    """
+    Returns True if `timeframe` bars can be built from `base` bars.
+    """
+    if base == timeframe:
+        return True
+    if base not in INTRADAY:
+        return base == '1d' and timeframe in ('1wk', '1mo')
+    return timeframe not in INTRADAY or _minutes(timeframe) % _minutes(base) == 0
+
+
+def _grouper(timeframe, key=None, first=None):
+    """
+    Returns the pd.Grouper of a timeframe. Intraday bins are anchored on the
+    session open (`first`, e.g. 09:15 on the NSE), so hourly bars run 09:15-10:15
+    as Yahoo's do; weekly bars start on Monday.
+    """
+    rule = TIMEFRAMES[timeframe]
+    if timeframe in INTRADAY and first is not None:
+        offset = (first - first.normalize()) % pd.Timedelta(rule)
+        return pd.Grouper(key=key, freq=rule, origin='start_day', offset=offset)
+    if timeframe == '1wk':
+        return pd.Grouper(key=key, freq=rule, label='left', closed='left')
+    return pd.Grouper(key=key, freq=rule)
+
+
+def resample_ohlcv(bars, timeframe):
+    """
+    Resamples a yfinance history frame (timestamp index, OHLCV columns) to a
+    coarser timeframe: first open, highest high, lowest low, last close and
+    summed volume of every bin. Bins without bars (nights, weekends, holidays) are dropped.
+    """
+    if bars.empty:
+        return bars[[col for col in OHLCV_AGG if col in bars.columns]]
+    agg = {col: how for col, how in OHLCV_AGG.items() if col in bars.columns}
+    resampled = bars.groupby(_grouper(timeframe, first=bars.index[0])).agg(agg)
+    return resampled[resampled['Open'].notna()]
+
+
+def resample_frame(df, timeframe):
+    """
+    Resamples a long Date/Company/Year/OHLCV frame of daily bars per company
+    and year (the rows of an interval window stay within their year). Bars are
+    labelled with the date of their first daily bar rather than the start of
+    their week or month, so a window starting mid-week (or on 01-01) never gets
+    a bar dated before it, or in the previous year.
+    """
+    if timeframe == '1d' or df.empty:
+        return df
+    agg = {col: how for col, how in OHLCV_AGG.items() if col in df.columns}
+    agg['First'] = 'first'
+    grouped = df.assign(First=df['Date']).groupby(['Company', 'Year', _grouper(timeframe, key='Date')],
+                                                  observed=True, sort=True)
+    resampled = grouped.agg(agg)
+    resampled = resampled[resampled['Open'].notna()].reset_index(level=['Company', 'Year'])
+    resampled = resampled.rename(columns={'First': 'Date'}).reset_index(drop=True)
+    return resampled[['Date', 'Company', 'Year'] + list(agg)[:-1]]
+
+
+def period_start(period, now=None):
+    """
+    Returns the first timestamp covered by a calendar period like '1mo', '6mo',
+    '1y', '5y' or 'ytd', or None for 'max'. Day periods ('1d', '5d') count
+    trading sessions instead and are handled by BarSource.
+    """
+    now = now or pd.Timestamp.now()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(now.year, 1, 1)
+    if period.endswith('mo'):
+        return now - pd.DateOffset(months=int(period[:-2]))
+    if period.endswith('y'):
+        return now - pd.DateOffset(years=int(period[:-1]))
+    raise ValueError(f"Unsupported period '{period}'.")
+
+
+def _sessions(period):
+    """
+    Returns the number of trading sessions of a day period like '1d' or '5d', or None.
+    """
+    if period and period.endswith('d') and period[:-1].isdigit():
+        return int(period[:-1])
+    return None
+
+
+def _local(timestamp, tz):
+    timestamp = pd.Timestamp(timestamp)
+    return timestamp.tz_localize(tz) if timestamp.tzinfo is None else timestamp.tz_convert(tz)
+
+
+class BarSource:
+    """
+    history() for any timeframe. Each request is served from the finest bars
+    already fetched for the ticker when they cover it (see derivable()), and
+    otherwise fetched once at the requested granularity and kept for later
+    requests. load() fetches a fine base series up front, e.g. 1m bars of
+    the last 7 days, from which every intraday and daily view is then built.
+    `fetches` counts the requests sent to Yahoo. Safe to share between threads.
+
+    Note that Yahoo does not adjust intraday bars for dividends, so daily bars
+    built from them match history(auto_adjust=False) rather than the adjusted default.
+    """
+
+    def __init__(self, session=None, ticker_factory=None):
+        self.session = session
+        self.ticker_factory = ticker_factory
+        self.fetches = 0
+        self._series = {}  # ticker -> [(base timeframe, covered since, until, bars)]
+        self._lock = threading.Lock()
+
+    def clear(self, ticker=None):
+        """
+        Forgets the stored bars of a ticker (of every ticker if none is given).
+        """
+        with self._lock:
+            if ticker is None:
+                self._series.clear()
+            else:
+                self._series.pop(ticker, None)
+
+    def load(self, ticker, interval='1m', period=None, start=None, end=None):
+        """
+        Fetches the bars of one granularity from Yahoo and stores them as a base
+        series. Without a period or start, the longest history Yahoo serves
+        for that granularity is fetched.
+        """
+        if period is None and start is None:
+            period = f"{MAX_LOOKBACK_DAYS[interval]}d" if interval in INTRADAY else 'max'
+        factory = self.ticker_factory or yf.Ticker
+        bars = factory(ticker, session=self.session).history(period=period, interval=interval, start=start, end=end)
+        if start is not None:
+            since = pd.Timestamp(start)
+        elif _sessions(period) is not None:
+            since = bars.index[0].tz_localize(None).normalize() if not bars.empty else pd.Timestamp.now()
+        else:
+            since = period_start(period)
+        until = pd.Timestamp(end) if end is not None else None
+        with self._lock:
+            self.fetches += 1
+            self._series.setdefault(ticker, []).append((interval, since, until, bars))
+        return bars
+
+    def _covering(self, ticker, interval, period, start, end):
+        """
+        Returns the (base timeframe, bars) of the finest stored series of the
+        ticker that covers the request, or None.
+        """
+        with self._lock:
+            series = list(self._series.get(ticker, []))
+        wanted = pd.Timestamp(start) if start is not None else None
+        if start is None and _sessions(period) is None:
+            wanted = period_start(period)
+        order = list(TIMEFRAMES)
+        found = None
+        for base, since, until, bars in series:
+            if not derivable(base, interval):
+                continue
+            if until is not None and (end is None or until < pd.Timestamp(end)):
+                continue
+            if _sessions(period) is not None:
+                covered = pd.Index(bars.index.date).nunique() >= _sessions(period)
+            else:
+                covered = since is None or (wanted is not None and since <= wanted)
+            if covered and (found is None or order.index(base) < order.index(found[0])):
+                found = (base, bars)
+        return found
+
+    def history(self, ticker, period='1mo', interval='1d', start=None, end=None):
+        """
+        Returns OHLCV bars like yf.Ticker(ticker).history(period, interval, start, end).
+        Bars whose period has not ended yet are partial, as they are on Yahoo.
+        """
+        if interval not in TIMEFRAMES:
+            raise ValueError(f"Unsupported timeframe '{interval}'. Use one of: {', '.join(TIMEFRAMES)}.")
+        if start is not None:
+            period = None
+        found = self._covering(ticker, interval, period, start, end)
+        if found is None:
+            bars = self.load(ticker, interval, period, start, end)
+            base = interval
+        else:
+            base, bars = found
+
+        if not bars.empty:
+            if start is not None:
+                bars = bars[bars.index >= _local(start, bars.index.tz)]
+            elif _sessions(period) is not None:
+                days = pd.Index(bars.index.date)
+                bars = bars[days.isin(days.unique()[-_sessions(period):])]
+            elif period_start(period) is not None:
+                bars = bars[bars.index >= _local(period_start(period), bars.index.tz)]
+            if end is not None:
+                bars = bars[bars.index < _local(end, bars.index.tz)]
+        return bars if base == interval else resample_ohlcv(bars, interval)
@@ -0,0 +1,169 @@
+import csv
+import glob
+import os
+import pickle
+from collections import namedtuple
+from datetime import datetime
+
+# --- Listing Universe ---
+# Builds the fetchable universe from the NSE/BSE equity listing files shipped in
+# data/equity_listings. Both exchanges are merged on ISIN, so a company listed
+# on both is fetched once: from NSE (.NS) first, with BSE (.BO) as the fallback.
+
+LISTINGS_FOLDER = os.path.join("data", "equity_listings")
+UNIVERSE_CACHE_PATH = os.path.join("data", "cache", "universe.pkl")
+_CACHE_VERSION = 1
+
+Listing = namedtuple('Listing', [
+    'isin', 'name',
+    'nse_symbol', 'nse_series', 'listed_on',
+    'bse_code', 'bse_symbol', 'bse_group', 'bse_status', 'bse_instrument',
+])
+
+
+def latest_listing(exchange, folder=LISTINGS_FOLDER):
+    """
+    Returns the newest '<EXCHANGE>_DD_Mon_YYYY.csv' listing file in the folder.
+    """
+    def listing_date(path):
+        stamp = os.path.basename(path)[len(exchange) + 1:-len('.csv')]
+        try:
+            return datetime.strptime(stamp, '%d_%b_%Y')
+        except ValueError:
+            return datetime.min
+
+    paths = glob.glob(os.path.join(folder, f"{exchange}_*.csv"))
+    if not paths:
+        raise FileNotFoundError(f"No {exchange} listing file found in '{folder}'.")
+    return max(paths, key=listing_date)
+
+
+def _read_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        for row in reader:
+            if row:
+                yield dict(zip(header, (value.strip() for value in row)))
+
+
+def parse_listings(nse_path, bse_path):
+    """
+    Parses both listing files into one Listing per ISIN.
+    """
+    listings = {}
+    for row in _read_rows(nse_path):
+        isin = row['ISIN NUMBER']
+        listings[isin] = Listing(
+            isin=isin, name=row['NAME OF COMPANY'],
+            nse_symbol=row['SYMBOL'], nse_series=row['SERIES'], listed_on=row['DATE OF LISTING'],
+            bse_code=None, bse_symbol=None, bse_group=None, bse_status=None, bse_instrument=None,
+        )
+
+    for row in _read_rows(bse_path):
+        isin = row['ISIN No']
+        bse_fields = dict(
+            bse_code=row['Security Code'], bse_symbol=row['Security Id'], bse_group=row['Group'],
+            bse_status=row['Status'], bse_instrument=row['Instrument'],
+        )
+        if isin in listings:
+            listings[isin] = listings[isin]._replace(**bse_fields)
+        else:
+            listings[isin] = Listing(
+                isin=isin, name=row['Issuer Name'],
+                nse_symbol=None, nse_series=None, listed_on=None, **bse_fields
+            )
+    return list(listings.values())
+
+
+class Universe:
+    """
+    In-memory index of listings keyed by ISIN and by NSE/BSE symbol or BSE code.
+    """
+
+    def __init__(self, listings):
+        self.listings = listings
+        self.by_isin = {}
+        self.by_symbol = {}
+        for listing in listings:
+            self.by_isin[listing.isin] = listing
+            for key in (listing.nse_symbol, listing.bse_symbol, listing.bse_code):
+                if key:
+                    self.by_symbol.setdefault(key, listing)
+
+    def __len__(self):
+        return len(self.listings)
+
+    def lookup(self, key):
+        """
+        Finds a listing by ISIN, NSE symbol, BSE symbol or BSE code (with or without .NS/.BO).
+        """
+        key = key.strip().upper()
+        if key.endswith(('.NS', '.BO')):
+            key = key[:-3]
+        return self.by_isin.get(key) or self.by_symbol.get(key)
+
+    def select(self, exchanges=('NSE', 'BSE'), series=('EQ',), groups=None, active_only=True,
+               instruments=('Equity',)):
+        """
+        Returns {company: (ticker, fallback_ticker or None)} for the listings that pass the filters.
+        Each filter only applies to its own exchange: `series` to NSE, and `groups`,
+        `active_only` and `instruments` to BSE. A company whose NSE leg is filtered out
+        can still be fetched through its BSE leg and vice versa.
+        """
+        series = {s.upper() for s in series} if series else None
+        groups = {g.upper() for g in groups} if groups else None
+        instruments = set(instruments) if instruments else None
+
+        selected = {}
+        for listing in self.listings:
+            nse_ok = 'NSE' in exchanges and listing.nse_symbol and \
+                (series is None or listing.nse_series in series)
+            bse_ok = 'BSE' in exchanges and listing.bse_symbol and \
+                (groups is None or listing.bse_group in groups) and \
+                (not active_only or listing.bse_status == 'Active') and \
+                (instruments is None or listing.bse_instrument in instruments)
+
+            if nse_ok:
+                tickers = (f"{listing.nse_symbol}.NS", f"{listing.bse_symbol}.BO" if bse_ok else None)
+            elif bse_ok:
+                tickers = (f"{listing.bse_symbol}.BO", None)
+            else:
+                continue
+
+            name = listing.name
+            if name in selected:
+                name = f"{name} ({listing.nse_symbol or listing.bse_symbol})"
+            selected[name] = tickers
+        return selected
+
+
+def _source_stamp(paths):
+    return [(os.path.abspath(p), os.path.getmtime(p), os.path.getsize(p)) for p in paths]
+
+
+def load_universe(nse_path=None, bse_path=None, cache_path=UNIVERSE_CACHE_PATH):
+    """
+    Loads the merged NSE/BSE universe, reusing the pickled index when the
+    listing files have not changed since it was built.
+    """
+    nse_path = nse_path or latest_listing('NSE')
+    bse_path = bse_path or latest_listing('BSE')
+    stamp = _source_stamp([nse_path, bse_path])
+
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('version') == _CACHE_VERSION and cached.get('stamp') == stamp:
+                return Universe([Listing(*row) for row in cached['rows']])
+        except Exception as e:
+            print(f"Ignoring unreadable universe cache '{cache_path}': {e}")
+
+    listings = parse_listings(nse_path, bse_path)
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        with open(cache_path, 'wb') as f:
+            pickle.dump({'version': _CACHE_VERSION, 'stamp': stamp, 'rows': [tuple(l) for l in listings]},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+    return Universe(listings)